@@ -20,12 +20,15 @@
 from __future__ import annotations
 
 import os
+import threading
+from collections import OrderedDict
 from io import BytesIO
 from typing import TYPE_CHECKING
 from urllib.error import URLError
 from urllib.request import urlopen
 
 import cairocffi
+from cairocffi.pixbuf import ImageLoadingError
 from libqtile.backend.base import Drawer
 from libqtile.images import Img as QtileImg
 from libqtile.images import Loader as QtileLoader
@@ -34,6 +37,8 @@ from libqtile.log_utils import logger
 from libqtile.utils import scan_files
 
 if TYPE_CHECKING:
+    from typing import Any  # noqa: F401
+
     from libqtile.utils import ColorsType
 
 
@@ -48,8 +53,18 @@ class Img(QtileImg):
 
         return cls(BytesIO(raw.read()).read(), path=url)
 
+    def _reset(self):
+        # Surfaces loaded from the image cache may be shared with other images so we
+        # drop our reference rather than finishing the surface
+        if self.__dict__.pop("_shared", False):
+            del self.surface
+            del self.pattern
+            return
+
+        QtileImg._reset(self)
 
-class ImgMask(QtileImg):
+
+class ImgMask(Img):
     """
     Image object that uses the image source as a mask to paint the background.
 
@@ -111,3 +126,144 @@ class Loader(QtileLoader):
             raise LoadingError(msg.format(set_names - seen))
 
         return d
+
+
+class ImageCache:
+    """
+    Cache of images loaded from files, shared by all widgets, decorations and popups.
+
+    Each file is read and decoded once. Images scaled to a particular size are rendered
+    once and the resulting surface is shared by all images requesting that size. Entries
+    are keyed on the file's path and modification time (so edited files are reloaded),
+    the target size and whether the image is used as a mask.
+
+    The least recently used entries are discarded when the surfaces held by the cache
+    exceed ``budget`` bytes. Images that are already loaded keep their surfaces.
+    """
+
+    def __init__(self, budget: int = 32 * 1024 * 1024):
+        self.budget = budget
+        self.used = 0
+        self.decodes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # type: OrderedDict[tuple, tuple[Any, int]]
+        self._bad = set()  # type: set[tuple]
+
+        # Images may also be loaded in an executor (e.g. volume widget icons)
+        self._lock = threading.RLock()
+
+    def _get(self, key: tuple):
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return entry[0]
+
+    def _put(self, key: tuple, value, size: int) -> None:
+        self._entries[key] = (value, size)
+        self.used += size
+
+        # Evict least recently used entries (but keep the one we've just added)
+        while self.used > self.budget and len(self._entries) > 1:
+            _, (_, old_size) = self._entries.popitem(last=False)
+            self.used -= old_size
+
+    @staticmethod
+    def surface_size(surface: cairocffi.ImageSurface) -> int:
+        return surface.get_stride() * surface.get_height()
+
+    @staticmethod
+    def scaled_size(default_size, width, height) -> tuple[int, int]:
+        """Returns the size ``Img.resize`` would give an image of ``default_size``."""
+        width0, height0 = default_size
+        width_factor = width / width0 if width else None
+        height_factor = height / height0 if height else None
+
+        if width_factor and height_factor:
+            size = Img._scale_free(width_factor, height_factor, default_size)
+        else:
+            size = Img._scale_lock(width_factor, height_factor, default_size)
+
+        return max(round(size.width), 1), max(round(size.height), 1)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bad.clear()
+            self.used = 0
+
+    def load(
+        self,
+        filename: str,
+        width: int | None = None,
+        height: int | None = None,
+        mask: bool = False,
+    ) -> Img | None:
+        """
+        Returns an ``Img`` (or ``ImgMask`` if ``mask`` is ``True``) for the file, resized
+        to the given width and/or height. If only one dimension is given then the
+        aspect ratio is preserved.
+
+        Returns ``None`` if the file does not exist or cannot be loaded. It is left to the
+        caller to report the error.
+        """
+        with self._lock:
+            return self._load(filename, width, height, mask)
+
+    def _load(self, filename, width, height, mask):
+        path = os.path.expanduser(filename)
+
+        try:
+            mtime = os.stat(path).st_mtime
+        except OSError:
+            return None
+
+        source_key = (path, mtime)
+        if source_key in self._bad:
+            return None
+
+        source = self._get(source_key)
+        if source is None:
+            try:
+                source = QtileImg.from_path(path)
+                default_surface = source.default_surface
+                self._put(source_key, source, self.surface_size(default_surface))
+            except (OSError, cairocffi.Error, ImageLoadingError):
+                # Remember bad files so we don't try to decode them again
+                self._bad.add(source_key)
+                return None
+
+            self.decodes += 1
+
+        img_class = ImgMask if mask else Img
+        img = img_class(source.bytes_img, name=source.name, path=path)
+        img._default_surface = source.default_surface
+        img._default_size = source.default_size
+
+        if width or height:
+            # Set the size directly as the width and height setters reset the image,
+            # rendering it again each time
+            img._width, img._height = self.scaled_size(source.default_size, width, height)
+
+        key = (path, mtime, img.width, img.height, mask)
+        surface = self._get(key)
+        if surface is None:
+            if (img.width, img.height) == source.default_size:
+                # The decoded image is already held by the cache
+                surface = source.default_surface
+                self._put(key, surface, 0)
+            else:
+                surface = img.surface
+                self._put(key, surface, self.surface_size(surface))
+
+        img._surface = surface
+        img._shared = True
+
+        return img
+
+
+image_cache = ImageCache()
@@ -21,6 +21,7 @@ from libqtile import hook
 from libqtile.log_utils import logger
 
 from qtile_extras.layout.decorations.borders import (  # noqa: F401
+    BorderCache,
     ConditionalBorder,
     ConditionalBorderWidth,
     CustomBorder,
@@ -32,6 +33,14 @@ from qtile_extras.layout.decorations.borders import (  # noqa: F401
 )
 
 
+def set_border_cache_size(size):
+    """
+    Sets the approximate size, in bytes, of rendered borders that are kept so they can be
+    reused by other windows with the same border. Defaults to 16MB.
+    """
+    BorderCache.budget = size
+
+
 # We need to inject code into qtile to allow the windows to render the new
 # decorations. To simplify this, we can use a hook so it's invisible to
 # users.
@@ -76,3 +85,27 @@ def inject_border_width_methods():
         logger.debug("qtile_extras: Injecting x11 border methods.")
         _Window._place = _Window.place
         _Window.place = new_place
+
+
+# Rendered borders are dropped when the config is reloaded as they were drawn for the
+# previous config's styles. Hooks are cleared on reload so we wrap the method that loads
+# the new config instead.
+@hook.subscribe.startup_once
+def inject_border_cache_clear():
+    from libqtile import qtile
+    from libqtile.core.manager import Qtile
+
+    logger.debug("qtile_extras: Running inject_border_cache_clear.")
+
+    if qtile.core.name == "wayland":
+        from qtile_extras.layout.decorations.injections_wayland import border_cache
+    else:
+        from qtile_extras.layout.decorations.injections import border_cache
+
+    load_config = Qtile.load_config
+
+    def new_load_config(self, *args, **kwargs):
+        border_cache.clear()
+        load_config(self, *args, **kwargs)
+
+    Qtile.load_config = new_load_config
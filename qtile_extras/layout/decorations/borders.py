@@ -19,10 +19,13 @@
 # SOFTWARE.
 import inspect
 import math
+import weakref
+from collections import OrderedDict
 
 import cairocffi
 import xcffib.xproto
 from libqtile import qtile
+from libqtile.config import InvertMatch, Match, MatchAll, MatchOnlyOne
 from libqtile.configurable import Configurable
 from libqtile.confreader import ConfigError
 from libqtile.utils import rgb
@@ -36,6 +39,161 @@ except (ImportError, ModuleNotFoundError):
 
 HALF_ROOT_2 = 0.70711
 
+# Number of pixels in the pre-rendered colour ramps used by gradients
+RAMP_SIZE = 256
+
+# Match rules which only depend on properties that don't change or are tracked by
+# _MatchResults. Results for other rules (e.g. ``func``) are never cached.
+STATIC_RULES = {"title", "wm_class", "wm_instance_class", "role", "wm_type", "net_wm_pid", "wid"}
+
+
+def _rule_names(match):
+    """Returns the names of the rules used by ``match`` or ``None`` if they're unknown."""
+    if isinstance(match, Match):
+        return set(match._rules)
+    if isinstance(match, InvertMatch):
+        return _rule_names(match.match)
+    if isinstance(match, MatchAll):
+        matches = match.matches
+    elif isinstance(match, MatchOnlyOne):
+        matches = [match.match1, match.match2]
+    elif isinstance(match, list | tuple):
+        matches = match
+    else:
+        return None
+
+    names = set()
+    for m in matches:
+        m_names = _rule_names(m)
+        if m_names is None:
+            return None
+        names |= m_names
+    return names
+
+
+class _MatchResults:
+    """
+    Caches the index of the first rule in ``rules`` that matches each window.
+
+    Results are kept until the window's title or class (or role, if any rule uses it)
+    changes so regexes are not evaluated on every layout pass. Rules using properties
+    that can change at any time are always evaluated. Results are dropped when the
+    window is garbage collected.
+    """
+
+    def __init__(self, rules, compare):
+        self.rules = rules
+        self.compare = compare
+        names = _rule_names([match for match, _ in rules])
+        self.cacheable = names is not None and names <= STATIC_RULES
+        self.uses_role = self.cacheable and "role" in names
+        self.hits = 0
+        self.misses = 0
+        self._results = weakref.WeakKeyDictionary()  # type: weakref.WeakKeyDictionary
+
+    def revision(self, win):
+        revision = (win.name, tuple(win.get_wm_class() or ()))
+        if self.uses_role:
+            revision += (win.get_wm_role(),)
+        return revision
+
+    def lookup(self, win):
+        """Returns the index of the first matching rule or ``None``."""
+        if not self.cacheable:
+            return self._evaluate(win)
+
+        revision = self.revision(win)
+        cached = self._results.get(win)
+        if cached is not None and cached[0] == revision:
+            self.hits += 1
+            return cached[1]
+
+        self.misses += 1
+        index = self._evaluate(win)
+        self._results[win] = (revision, index)
+        return index
+
+    def _evaluate(self, win):
+        for index, (match, _) in enumerate(self.rules):
+            if self.compare(match, win):
+                return index
+        return None
+
+
+class BorderCache:
+    """
+    Least recently used cache of rendered borders.
+
+    Borders are keyed on the border styles, the window's outer size and the border width
+    (plus anything else the backend needs) so windows with the same borders (e.g. when
+    focus moves between windows) reuse the rendered border instead of drawing it again.
+    ``budget`` is the approximate size, in bytes, of rendered borders to keep (the default
+    can be changed with ``set_border_cache_size``). Backends can override ``release`` to
+    free the rendered border when it's evicted.
+
+    The cache is cleared when the config is reloaded as the borders were drawn for the
+    previous config's styles.
+    """
+
+    budget = 16 * 1024 * 1024
+
+    def __init__(self, budget=None):
+        if budget is not None:
+            self.budget = budget
+        self.used = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    @staticmethod
+    def make_key(win, colors, *args):
+        """Returns the cache key for the border or ``None`` if it can't be cached."""
+        parts = []
+        for colour in colors:
+            if isinstance(colour, _BorderStyle):
+                style_key = colour.cache_key(win)
+                if style_key is None:
+                    return None
+                parts.append((colour, style_key))
+            else:
+                parts.append(colour)
+
+        return (tuple(parts), *args)
+
+    def get(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return entry[0]
+
+    def add(self, key, value, size):
+        self._entries[key] = (value, size)
+        self.used += size
+
+        while self.used > self.budget and len(self._entries) > 1:
+            _, entry = self._entries.popitem(last=False)
+            self._evict(entry)
+
+    def _evict(self, entry):
+        value, size = entry
+        self.release(value)
+        self.used -= size
+
+    def release(self, value):
+        pass
+
+    def clear(self):
+        while self._entries:
+            _, entry = self._entries.popitem()
+            self._evict(entry)
+
 
 class _BorderStyle(Configurable):
     """
@@ -50,6 +208,17 @@ class _BorderStyle(Configurable):
 
     needs_surface = True
 
+    # Visual types looked up for each (connection, depth, visual id)
+    _visual_types: dict = {}
+
+    def cache_key(self, win):
+        """
+        Returns the parts of a key, in addition to the window's size, that identify the
+        rendered border for ``win`` so it can be reused for other windows. Returns ``None``
+        if the border cannot be reused.
+        """
+        return ()
+
     def _check_colours(self):
         for colour in self.colours:
             try:
@@ -57,24 +226,42 @@ class _BorderStyle(Configurable):
             except ValueError:
                 raise ConfigError(f"Invalid colour value in border decoration: {colour}.")
 
-    def _create_xcb_surface(self):
-        root = self.window.conn.conn.get_setup().roots[0]
+    def _find_visual(self):
+        conn = self.window.conn.conn
+        key = (conn, self.depth, self.visual)
+        if key not in self._visual_types:
+            root = conn.get_setup().roots[0]
+            _BorderStyle._visual_types[key] = next(
+                (
+                    v
+                    for d in root.allowed_depths
+                    if d.depth == self.depth
+                    for v in d.visuals
+                    if v.visual_id == self.visual
+                ),
+                None,
+            )
 
-        def find_visual(visual):
-            for d in root.allowed_depths:
-                if d.depth == self.depth:
-                    for v in d.visuals:
-                        if v.visual_id == visual:
-                            return v
+        return self._visual_types[key]
 
+    def _create_xcb_surface(self):
         return cairocffi.XCBSurface(
             self.window.conn.conn,
             self.pixmap,
-            find_visual(self.visual),
+            self._find_visual(),
             self.outer_w,
             self.outer_h,
         )
 
+    @staticmethod
+    def _window_visual(window):
+        # A window's visual can't change so we only need to ask the server once
+        visual = getattr(window, "_qte_visual", None)
+        if visual is None:
+            visual = window.get_attributes().visual
+            window._qte_visual = visual
+        return visual
+
     def _get_edges(self, bw, x, y, width, height):
         return [
             (x, y, width, bw),
@@ -86,7 +273,7 @@ class _BorderStyle(Configurable):
     def _x11_draw(
         self, window, depth, pixmap, gc, outer_w, outer_h, borderwidth, x, y, width, height
     ):
-        self.visual = window.get_attributes().visual
+        self.visual = self._window_visual(window)
         self.window = window
         self.core = window.conn.conn.core
         self.wid = window.wid
@@ -106,7 +293,9 @@ class _BorderStyle(Configurable):
     def x11_draw(self, borderwidth, x, y, width, height, surface):
         self.draw(surface, borderwidth, x, y, width, height)
 
-    def _wayland_draw(self, window, outer_w, outer_h, borderwidth, x, y, width, height):
+    def _wayland_draw(
+        self, window, outer_w, outer_h, borderwidth, x, y, width, height, surface=None
+    ):
         if not HAS_WAYLAND:
             raise ConfigError("Unable to load wayland backend during imports.")
         self.window = window
@@ -115,18 +304,31 @@ class _BorderStyle(Configurable):
         self.outer_h = outer_h
         self.rects = self._get_edges(borderwidth, x, y, width, height)
         if self.needs_surface:
-            surface = cairocffi.ImageSurface(cairocffi.FORMAT_ARGB32, self.outer_w, self.outer_h)
+            if surface is None:
+                surface = cairocffi.ImageSurface(
+                    cairocffi.FORMAT_ARGB32, self.outer_w, self.outer_h
+                )
+            else:
+                # Reuse an existing surface of the same size
+                with cairocffi.Context(surface) as ctx:
+                    ctx.set_operator(cairocffi.OPERATOR_CLEAR)
+                    ctx.paint()
             self.wayland_draw(borderwidth, x, y, width, height, surface)
-            border = ffi.new("struct qw_border *")
-            border.type = lib.QW_BORDER_BUFFER
-            border.width = borderwidth
-            border.buffer.surface = ffi.cast("cairo_surface_t *", surface._pointer)
+            border = self._wayland_buffer(surface, borderwidth)
         else:
             surface = None
             border = self.wayland_draw(borderwidth, x, y, width, height, surface)
 
         return surface, border[0]
 
+    @staticmethod
+    def _wayland_buffer(surface, borderwidth):
+        border = ffi.new("struct qw_border *")
+        border.type = lib.QW_BORDER_BUFFER
+        border.width = borderwidth
+        border.buffer.surface = ffi.cast("cairo_surface_t *", surface._pointer)
+        return border
+
     def wayland_draw(self, borderwidth, x, y, width, height, surface):
         self.draw(surface, borderwidth, x, y, width, height)
 
@@ -134,7 +336,68 @@ class _BorderStyle(Configurable):
         pass
 
 
-class GradientBorder(_BorderStyle):
+class _GradientStyle(_BorderStyle):
+    """
+    Base class for borders drawn with gradients.
+
+    The gradient's colours are rendered once to a 1D colour ramp. Linear gradients are
+    painted by sampling the ramp along the gradient's axis so the colour stops don't need
+    to be rebuilt for every window.
+    """
+
+    _ramp = None
+    _radial = None
+
+    def _add_stops(self, gradient):
+        for offset, c in zip(self.offsets, self.colours):
+            gradient.add_color_stop_rgba(offset, *rgb(c))
+        return gradient
+
+    def _ramp_pattern(self):
+        if self._ramp is None:
+            surface = cairocffi.ImageSurface(cairocffi.FORMAT_ARGB32, RAMP_SIZE, 1)
+            with cairocffi.Context(surface) as ctx:
+                # Stops are placed at the centres of the first and last pixels
+                gradient = cairocffi.LinearGradient(0.5, 0, RAMP_SIZE - 0.5, 0)
+                ctx.set_source(self._add_stops(gradient))
+                ctx.paint()
+
+            self._ramp = cairocffi.SurfacePattern(surface)
+            self._ramp.set_extend(cairocffi.EXTEND_PAD)
+            self._ramp.set_filter(cairocffi.FILTER_BILINEAR)
+
+        return self._ramp
+
+    def _radial_pattern(self):
+        # Radial gradients are defined in a unit space so the pattern can be reused
+        if self._radial is None:
+            self._radial = self._add_stops(cairocffi.RadialGradient(0, 0, 0, 0, 0, HALF_ROOT_2))
+        return self._radial
+
+    def _set_linear_source(self, ctx, start, end):
+        """Sets the context's source to a linear gradient from ``start`` to ``end``."""
+        sx, sy = start
+        dx = end[0] - sx
+        dy = end[1] - sy
+        length2 = dx * dx + dy * dy
+
+        if not length2:
+            ctx.set_source(self._add_stops(cairocffi.LinearGradient(*start, *end)))
+            return
+
+        # Maps user space onto the ramp: x is the distance along the gradient's axis and
+        # y, which is clamped to the ramp's single row, is perpendicular to it.
+        k = (RAMP_SIZE - 1) / length2
+        pattern = self._ramp_pattern()
+        pattern.set_matrix(
+            cairocffi.Matrix(
+                xx=k * dx, yx=-dy, xy=k * dy, yy=dx, x0=0.5 - k * (dx * sx + dy * sy), y0=0
+            )
+        )
+        ctx.set_source(pattern)
+
+
+class GradientBorder(_GradientStyle):
     """
     Renders borders with a gradient.
 
@@ -205,19 +468,15 @@ class GradientBorder(_BorderStyle):
             if self.radial:
                 ctx.translate(width // 2, height // 2)
                 ctx.scale(width, height)
-                gradient = cairocffi.RadialGradient(0, 0, 0, 0, 0, HALF_ROOT_2)
+                ctx.set_source(self._radial_pattern())
             else:
-                gradient = cairocffi.LinearGradient(*pos(self.points[0]), *pos(self.points[1]))
+                self._set_linear_source(ctx, pos(self.points[0]), pos(self.points[1]))
 
-            for offset, c in zip(self.offsets, self.colours):
-                gradient.add_color_stop_rgba(offset, *rgb(c))
-
-            ctx.set_source(gradient)
             ctx.paint()
             ctx.restore()
 
 
-class GradientFrame(_BorderStyle):
+class GradientFrame(_GradientStyle):
     """
     Renders a frame with a gradient. Each edge's gradient is from the outside towards the centre.
     """
@@ -265,10 +524,7 @@ class GradientFrame(_BorderStyle):
                     ctx.line_to(*p)
                 ctx.close_path()
                 ctx.clip()
-                gradient = cairocffi.LinearGradient(*grad_points)
-                for offset, c in zip(self.offsets, self.colours):
-                    gradient.add_color_stop_rgba(offset, *rgb(c))
-                ctx.set_source(gradient)
+                self._set_linear_source(ctx, grad_points[:2], grad_points[2:])
                 ctx.paint()
                 ctx.reset_clip()
             ctx.restore()
@@ -318,6 +574,12 @@ class ScreenGradientBorder(GradientBorder):
         GradientBorder.__init__(self, **config)
         self.add_defaults(ScreenGradientBorder.defaults)
 
+    def cache_key(self, win):
+        # The border depends on where the window is on the screen
+        if win and win.group and win.group.screen:
+            return (win.x, win.y, win.group.screen.width, win.group.screen.height)
+        return ()
+
     def draw(self, surface, bw, x, y, width, height):
         assert qtile is not None
         win = qtile.windows_map.get(self.wid)
@@ -345,17 +607,15 @@ class ScreenGradientBorder(GradientBorder):
             ctx.rectangle(width - bw, bw, -(width - 2 * bw), (height - 2 * bw))
             ctx.clip()
 
+            # The same ramp is used for every window on the screen, offset by the window's
+            # position
             if self.radial:
                 ctx.translate(w // 2 - x - win_x, h // 2 - y - win_y)
                 ctx.scale(w, h)
-                gradient = cairocffi.RadialGradient(0, 0, 0, 0, 0, HALF_ROOT_2)
+                ctx.set_source(self._radial_pattern())
             else:
-                gradient = cairocffi.LinearGradient(*pos(self.points[0]), *pos(self.points[1]))
-
-            for offset, c in zip(self.offsets, self.colours):
-                gradient.add_color_stop_rgba(offset, *rgb(c))
+                self._set_linear_source(ctx, pos(self.points[0]), pos(self.points[1]))
 
-            ctx.set_source(gradient)
             ctx.paint()
             ctx.restore()
 
@@ -457,21 +717,23 @@ class ConditionalBorder(_BorderStyle):
     def __init__(self, **config):
         _BorderStyle.__init__(self, **config)
         self.add_defaults(ConditionalBorder.defaults)
+        self._results = _MatchResults(self.matches, self._compare)
+
+    @staticmethod
+    def _compare(match, win):
+        if isinstance(match, list | str):
+            return any(m.compare(win) for m in match)
+        return match.compare(win)
 
     def compare(self, win):
         if not win:
             return self.fallback
 
-        for match, colour in self.matches:
-            if isinstance(match, list | str):
-                matched = any(m.compare(win) for m in match)
-            else:
-                matched = match.compare(win)
-
-            if matched:
-                return colour
+        index = self._results.lookup(win)
+        if index is None:
+            return self.fallback
 
-        return self.fallback
+        return self.matches[index][1]
 
 
 class CustomBorder(_BorderStyle):
@@ -525,6 +787,12 @@ class CustomBorder(_BorderStyle):
 
     defaults = [
         ("func", None, "Custom function to render border. See docstring for more."),
+        (
+            "cache",
+            True,
+            "Reuse the rendered border for windows with the same size. Set to ``False`` if "
+            "``func`` does not always draw the same border for a given size.",
+        ),
     ]
 
     _screenshots = [
@@ -543,6 +811,9 @@ class CustomBorder(_BorderStyle):
         elif len(inspect.signature(self.func).parameters) != 4:
             raise ConfigError("Draw function must take 4 arguments.")
 
+    def cache_key(self, win):
+        return () if self.cache else None
+
     def draw(self, surface, bw, x, y, width, height):
         with cairocffi.Context(surface) as ctx:
             ctx.translate(x, y)
@@ -634,12 +905,13 @@ class ConditionalBorderWidth(Configurable):
     def __init__(self, **config):
         Configurable.__init__(self, **config)
         self.add_defaults(ConditionalBorderWidth.defaults)
+        self._results = _MatchResults(self.matches, lambda rule, win: rule.compare(win))
 
     def get_border_for_window(self, win):
-        for rule, value in self.matches:
-            if rule.compare(win):
-                return value
-        return self.default
+        index = self._results.lookup(win)
+        if index is None:
+            return self.default
+        return self.matches[index][1]
 
     # Layouts size windows by subtracting the border width so we
     # need to allow the multiplication to work on the custom class
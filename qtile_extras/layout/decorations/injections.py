@@ -23,15 +23,62 @@ from __future__ import annotations
 import xcffib
 from libqtile import qtile
 from libqtile.log_utils import logger
-from xcffib.wrappers import GContextID, PixmapID
 
 from qtile_extras.layout.decorations.borders import (
+    BorderCache,
     ConditionalBorder,
     ConditionalBorderWidth,
     _BorderStyle,
 )
 
 
+class BorderPixmapCache(BorderCache):
+    """
+    Cache of rendered border pixmaps.
+
+    Pixmaps are also keyed on the depth and are freed on the X server when they are evicted.
+    """
+
+    def release(self, value):
+        conn, pixmap, gc = value
+        conn.core.FreeGC(gc)
+        conn.core.FreePixmap(pixmap)
+
+
+border_cache = BorderPixmapCache()
+
+
+def _render_border(window, depth, colors, borderwidth, pixmap, gc, outer_w, outer_h):
+    core = window.conn.conn.core
+    borders = len(colors)
+    borderwidths = [borderwidth // borders] * borders
+    for i in range(borderwidth % borders):
+        borderwidths[i] += 1
+    coord = 0
+    for i in range(borders):
+        if isinstance(colors[i], _BorderStyle):
+            colors[i]._x11_draw(
+                window,
+                depth,
+                pixmap,
+                gc,
+                outer_w,
+                outer_h,
+                borderwidth,
+                coord,
+                coord,
+                outer_w - coord * 2,
+                outer_h - coord * 2,
+            )
+        else:
+            core.ChangeGC(gc, xcffib.xproto.GC.Foreground, [window.conn.color_pixel(colors[i])])
+            rect = xcffib.xproto.RECTANGLE.synthetic(
+                coord, coord, outer_w - coord * 2, outer_h - coord * 2
+            )
+            core.PolyFillRectangle(pixmap, gc, 1, [rect])
+        coord += borderwidths[i]
+
+
 def x11_paint_borders(self, depth, colors, borderwidth, width, height):
     """
     This method is used only by the managing Window class.
@@ -55,44 +102,31 @@ def x11_paint_borders(self, depth, colors, borderwidth, width, height):
 
     colors = [c.compare(win) if isinstance(c, ConditionalBorder) else c for c in colors]
 
-    core = self.conn.conn.core
+    conn = self.conn.conn
+    core = conn.core
     outer_w = width + borderwidth * 2
     outer_h = height + borderwidth * 2
 
-    with PixmapID(self.conn.conn) as pixmap:
-        with GContextID(self.conn.conn) as gc:
-            core.CreatePixmap(depth, pixmap, self.wid, outer_w, outer_h)
-            core.CreateGC(gc, pixmap, 0, None)
-            borders = len(colors)
-            borderwidths = [borderwidth // borders] * borders
-            for i in range(borderwidth % borders):
-                borderwidths[i] += 1
-            coord = 0
-            for i in range(borders):
-                if isinstance(colors[i], _BorderStyle):
-                    colors[i]._x11_draw(
-                        self,
-                        depth,
-                        pixmap,
-                        gc,
-                        outer_w,
-                        outer_h,
-                        borderwidth,
-                        coord,
-                        coord,
-                        outer_w - coord * 2,
-                        outer_h - coord * 2,
-                    )
-                else:
-                    core.ChangeGC(
-                        gc, xcffib.xproto.GC.Foreground, [self.conn.color_pixel(colors[i])]
-                    )
-                    rect = xcffib.xproto.RECTANGLE.synthetic(
-                        coord, coord, outer_w - coord * 2, outer_h - coord * 2
-                    )
-                    core.PolyFillRectangle(pixmap, gc, 1, [rect])
-                coord += borderwidths[i]
-            self._set_borderpixmap(depth, pixmap, gc, borderwidth, width, height)
+    key = border_cache.make_key(win, colors, outer_w, outer_h, borderwidth, depth)
+    cached = border_cache.get(key) if key is not None else None
+    if cached is not None:
+        _, pixmap, gc = cached
+        self._set_borderpixmap(depth, pixmap, gc, borderwidth, width, height)
+        return
+
+    pixmap = conn.generate_id()
+    gc = conn.generate_id()
+    core.CreatePixmap(depth, pixmap, self.wid, outer_w, outer_h)
+    core.CreateGC(gc, pixmap, 0, None)
+    _render_border(self, depth, colors, borderwidth, pixmap, gc, outer_w, outer_h)
+    self._set_borderpixmap(depth, pixmap, gc, borderwidth, width, height)
+
+    if key is not None:
+        # The pixmap is kept on the server until it's evicted from the cache
+        border_cache.add(key, (conn, pixmap, gc), outer_w * outer_h * 4)
+    else:
+        core.FreeGC(gc)
+        core.FreePixmap(pixmap)
 
 
 def new_place(
@@ -28,6 +28,7 @@ from libqtile.log_utils import logger
 from libqtile.utils import rgb
 
 from qtile_extras.layout.decorations.borders import (
+    BorderCache,
     ConditionalBorder,
     ConditionalBorderWidth,
     _BorderStyle,
@@ -41,6 +42,19 @@ if TYPE_CHECKING:
 old_wayland_window_init = Window.__init__
 
 
+class BorderSurfaceCache(BorderCache):
+    """
+    Cache of rendered border surfaces shared by all windows.
+
+    The compositor draws from the surface for as long as a window uses it, so evicted
+    surfaces aren't finished here. Each window keeps a reference to its surfaces and a
+    surface is destroyed once neither the cache nor any window refers to it.
+    """
+
+
+border_cache = BorderSurfaceCache()
+
+
 def wayland_window_init(self, core: Core, qtile: Qtile, surface: S):
     logger.debug("qtile_extras: Running injected wayland window init.")
     old_wayland_window_init(self, core, qtile, surface)
@@ -134,25 +148,41 @@ def wayland_place(
         for i, color in enumerate(bordercolor):
             bw = widths[i]
             if isinstance(color, _BorderStyle):
-                # Tidy up old data
-                if color in self._border_styles:
-                    old_surface = self._border_styles.pop(color)
-                    if old_surface is not None:
-                        old_surface.finish()
-
-                surface, border = color._wayland_draw(
-                    self,
-                    outer_w,
-                    outer_h,
-                    bw,
-                    coord,
-                    coord,
-                    outer_w - coord * 2,
-                    outer_h - coord * 2,
-                )
+                old_surface, old_cached = self._border_styles.pop(color, (None, False))
+                inner_w = outer_w - coord * 2
+                inner_h = outer_h - coord * 2
+                args = (outer_w, outer_h, bw, coord, coord, inner_w, inner_h)
+
+                key = None
+                if color.needs_surface:
+                    key = border_cache.make_key(self, [color], *args)
+
+                surface = border_cache.get(key) if key is not None else None
+                if surface is not None:
+                    buffer = color._wayland_buffer(surface, bw)
+                    border = buffer[0]
+                else:
+                    # Borders that can't be shared reuse the window's surface if the size
+                    # hasn't changed
+                    reuse = None
+                    if key is None and old_surface is not None and not old_cached:
+                        if (old_surface.get_width(), old_surface.get_height()) == (
+                            outer_w,
+                            outer_h,
+                        ):
+                            reuse = old_surface
+
+                    surface, border = color._wayland_draw(self, *args, surface=reuse)
+
+                    if key is not None:
+                        border_cache.add(key, surface, outer_w * outer_h * 4)
+
+                # Tidy up old data. Cached surfaces may be used by other windows.
+                if old_surface is not None and not old_cached and old_surface is not surface:
+                    old_surface.finish()
 
                 # Keep reference to border objects
-                self._border_styles[color] = surface
+                self._border_styles[color] = (surface, key is not None)
                 border_layers[i] = border
 
             else:
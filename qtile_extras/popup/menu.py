@@ -29,7 +29,8 @@ try:
 except ImportError:
     has_xdg = False
 
-from qtile_extras.popup.toolkit import PopupGridLayout, PopupSlider, PopupText
+from qtile_extras.images import image_cache
+from qtile_extras.popup.toolkit import PopupGridLayout, PopupSlider, PopupText, _PopupWidget
 
 
 class PopupMenuItem(PopupText):
@@ -61,13 +62,32 @@ class PopupMenuItem(PopupText):
     def __init__(self, text="", **config):
         PopupText.__init__(self, text, **config)
         self.add_defaults(PopupMenuItem.defaults)
-        if self.menu_icon and not self.toggle_box:
-            self.load_icon(self.menu_icon)
-        else:
-            self.icon = None
+        self.icon = None
+
+        # Icons are loaded when the item is first configured so large menus only load
+        # the icons of items that are displayed
+        self._icon_pending = bool(self.menu_icon and not self.toggle_box)
+
+    @property
+    def layout_key(self):
+        """Items with the same key can share text layouts."""
+        return (self.font, self.fontsize, self.markup, self.wrap, self.h_align)
 
     def _configure(self, qtile, container):
-        PopupText._configure(self, qtile, container)
+        # Scrolling menus hand back the text layouts of items that are no longer visible
+        take_layout = getattr(container, "take_layout", None)
+        layout = take_layout(self.layout_key) if take_layout else None
+        if layout is None:
+            PopupText._configure(self, qtile, container)
+        else:
+            _PopupWidget._configure(self, qtile, container)
+            self.layout = layout
+            self.layout.text = self._text
+
+        if self._icon_pending:
+            self._icon_pending = False
+            self.load_icon(self.menu_icon)
+
         self.layout.width = self.width - self.icon_size - self.icon_gap * 3
         if self.has_submenu and self.enabled:
             self.layout.width -= self.icon_size + self.icon_gap * 3
@@ -78,6 +98,9 @@ class PopupMenuItem(PopupText):
     def load_icon(self, icon):
         if isinstance(icon, bytes):
             img = Img(icon)
+            if img.width != self.icon_size:
+                img.scale(width_factor=(self.icon_size / img.width), lock_aspect_ratio=True)
+
         elif isinstance(icon, str):
             filename = os.path.expanduser(self.menu_icon)
 
@@ -85,14 +108,11 @@ class PopupMenuItem(PopupText):
                 logger.warning("Icon image does not exist: %s", filename)
                 return
 
-            img = Img.from_path(filename)
+            # Icons are shared between menus so they're only decoded once
+            img = image_cache.load(filename, width=self.icon_size)
 
         else:
-            self.icon = None
-            return
-
-        if img.width != self.icon_size:
-            img.scale(width_factor=(self.icon_size / img.width), lock_aspect_ratio=True)
+            img = None
 
         self.icon = img
 
@@ -173,13 +193,163 @@ class PopupMenu(PopupGridLayout):
     """
 
     defaults = [
-        ("hide_on_mouse_leave", True, "Hide the menu if the mouse pointer leaves the menu")
+        ("hide_on_mouse_leave", True, "Hide the menu if the mouse pointer leaves the menu"),
+        (
+            "max_rows",
+            0,
+            "Maximum number of rows to display (0 = no limit). Longer menus can be scrolled "
+            "with the mouse wheel or keyboard and only the visible items are drawn.",
+        ),
     ]
 
     def __init__(self, qtile, controls, **config):
+        self.items = controls
+        self.first = 0
+        self._spare_layouts = {}  # type: dict[tuple, list]
         PopupGridLayout.__init__(self, qtile, controls=controls, **config)
         self.add_defaults(PopupMenu.defaults)
 
+        self.scrollable = self.max_rows > 0 and sum(i.row_span for i in self.items) > self.rows
+        if self.scrollable:
+            # Index of the first item when the menu is scrolled to the end
+            rows = 0
+            self._last_first = len(self.items)
+            while self._last_first > 0:
+                rows += self.items[self._last_first - 1].row_span
+                if rows > self.rows:
+                    break
+                self._last_first -= 1
+
+            self._set_visible(0)
+
+    def _get_focusable_controls(self):
+        PopupGridLayout._get_focusable_controls(self)
+
+        # Hidden items can be scrolled into view
+        if any(item.can_focus for item in self.items):
+            self.keyboard_navigation = True
+
+    def _set_visible(self, first):
+        """Display the items starting at ``first``, releasing those scrolled out of view."""
+        first = max(0, min(first, self._last_first))
+
+        visible = []
+        row = 0
+        for item in self.items[first:]:
+            if row + item.row_span > self.rows:
+                break
+            item.row = row
+            item.placed = False
+            visible.append(item)
+            row += item.row_span
+
+        for item in self.controls:
+            if item not in visible:
+                self._release(item)
+
+        self.first = first
+        self.controls = visible
+        self.focusable_controls = [c for c in visible if c.can_focus]
+        if self._focused not in visible:
+            self._focused = next(iter(self.focusable_controls), None)
+        self.cursor_in = None
+
+        if self.configured:
+            self.place_controls()
+
+    def _release(self, item):
+        if item.configured and isinstance(item, PopupMenuItem):
+            self._spare_layouts.setdefault(item.layout_key, []).append(item.layout)
+            del item.layout
+        item.configured = False
+        item.unfocus()
+
+    def take_layout(self, key):
+        """Return a text layout released by an item scrolled out of view (or None)."""
+        spare = self._spare_layouts.get(key)
+        return spare.pop() if spare else None
+
+    def scroll(self, step):
+        """Scroll the menu by ``step`` items (negative values scroll up)."""
+        if not self.scrollable:
+            return
+
+        first = max(0, min(self.first + step, self._last_first))
+        if first == self.first:
+            return
+
+        self._set_visible(first)
+        self.draw()
+
+    def process_button_click(self, x, y, button):  # noqa: N802
+        if self.scrollable and button in (4, 5):
+            self.scroll(-1 if button == 4 else 1)
+            return
+
+        PopupGridLayout.process_button_click(self, x, y, button)
+
+    def process_key_press(self, keycode):
+        if self.scrollable:
+            if keycode in self.keys["up"]:
+                direction = -1
+            elif keycode in self.keys["down"]:
+                direction = 1
+            else:
+                direction = 0
+
+            # Scroll when there are no more items to move to in that direction
+            if direction and (
+                self._focused is None
+                or self.find_nearest_control("up" if direction < 0 else "down") is None
+            ):
+                if self._scroll_to_item(direction):
+                    return
+
+            # Nothing visible can be focused
+            if not self.focusable_controls and keycode not in self.keys["close"]:
+                return
+
+        PopupGridLayout.process_key_press(self, keycode)
+
+    def _scroll_to_item(self, direction):
+        """Scroll to the next focusable item outside the visible items and focus it."""
+        if direction < 0:
+            hidden = range(self.first - 1, -1, -1)
+        else:
+            hidden = range(self.first + len(self.controls), len(self.items))
+
+        index = next((i for i in hidden if self.items[i].can_focus), None)
+        if index is None:
+            return False
+
+        if direction < 0:
+            first = index
+        else:
+            # Scroll just far enough for the item to be the last visible one
+            first = index + 1
+            rows = 0
+            while first > 0 and rows + self.items[first - 1].row_span <= self.rows:
+                first -= 1
+                rows += self.items[first].row_span
+
+        self._set_visible(first)
+        self.items[index].focus()
+        self.draw()
+        return True
+
+    def finalize(self):
+        PopupGridLayout.finalize(self)
+        for layouts in self._spare_layouts.values():
+            for layout in layouts:
+                layout.finalize()
+        self._spare_layouts.clear()
+
+    def info(self):
+        info = PopupGridLayout.info(self)
+        info["items"] = len(self.items)
+        info["first"] = self.first
+        return info
+
     @staticmethod
     def make_generators(qtile=None, **config):
         """
@@ -281,10 +451,15 @@ class PopupMenu(PopupGridLayout):
         row_height = config.get("row_height", None)
         fontsize = config.get("fontsize", 12)
         menu_width = config.get("menu_width", 200)
+        max_rows = config.get("max_rows", 0)
 
         if row_height is None:
             row_height = fontsize
 
+        # Longer menus scroll and only lay out the items that fit
+        if max_rows:
+            row_count = min(row_count, max_rows)
+
         menu_config = {
             "width": menu_width,
             "height": row_count * row_height,
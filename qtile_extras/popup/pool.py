@@ -0,0 +1,159 @@
+# Copyright (c) 2026 elParaguayo
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+from __future__ import annotations
+
+import time
+from typing import TYPE_CHECKING
+
+from libqtile import pangocffi
+from libqtile.popup import Popup
+
+if TYPE_CHECKING:
+    from typing import Any  # noqa: F401
+
+    from libqtile.core.manager import Qtile
+
+# Attributes that users of a pooled popup may override on its internal window
+WINDOW_HANDLERS = (
+    "info",
+    "process_button_click",
+    "process_button_release",
+    "process_pointer_enter",
+    "process_pointer_leave",
+    "process_pointer_motion",
+    "process_key_press",
+    "process_window_expose",
+)
+
+
+class PopupPool:
+    """
+    Pool of hidden popup windows, shared by tooltips, menus and extended popups.
+
+    Creating an internal window (and its drawer) needs several round-trips to the
+    X server or compositor. Popups returned to the pool are hidden rather than killed
+    and are resized and restyled when they are next acquired. At most ``size``
+    popups are kept and any that have not been used for ``idle_timeout`` seconds are
+    killed.
+    """
+
+    def __init__(self, size: int = 4, idle_timeout: float = 30):
+        self.size = size
+        self.idle_timeout = idle_timeout
+        self.hits = 0
+        self.misses = 0
+        self._idle = []  # type: list[tuple[float, Popup]]
+        self._reaper = None  # type: Any
+
+    def __len__(self) -> int:
+        return len(self._idle)
+
+    def acquire(self, qtile: Qtile, width: int = 256, height: int = 64, **config) -> Popup:
+        """
+        Return a popup of the requested size, reusing a pooled window if possible.
+
+        ``config`` accepts the same settings as ``libqtile.popup.Popup``.
+        """
+        for index, (_, popup) in enumerate(reversed(self._idle)):
+            if popup.qtile is qtile:
+                del self._idle[len(self._idle) - index - 1]
+                break
+        else:
+            self.misses += 1
+            return Popup(qtile, width=width, height=height, **config)
+
+        self.hits += 1
+        self._restyle(popup, config)
+        popup.width = width
+        popup.height = height
+        popup.clear()
+        return popup
+
+    def release(self, popup: Popup) -> None:
+        """Hide the popup and keep it for reuse (or kill it if the pool is full)."""
+        if any(pooled is popup for _, pooled in self._idle):
+            return
+
+        popup.hide()
+
+        # Stop events for the hidden window reaching the previous user
+        for name in WINDOW_HANDLERS:
+            vars(popup.win).pop(name, None)
+        popup.win.process_button_click = popup.process_button_click
+        popup.win.process_window_expose = popup.draw
+
+        if len(self._idle) >= self.size:
+            popup.kill()
+            return
+
+        self._idle.append((time.monotonic(), popup))
+        if self._reaper is None:
+            self._reaper = popup.qtile.call_later(self.idle_timeout, self._reap)
+
+    def _restyle(self, popup: Popup, config: dict[str, Any]) -> None:
+        for name, default, _ in Popup.defaults:
+            setattr(popup, name, config.get(name, default))
+
+        popup.win.opacity = popup.opacity
+
+        # The text layout is cheap to build and carries most of the styling
+        popup.layout.finalize()
+        popup.layout = popup.drawer.textlayout(
+            text="",
+            colour=popup.foreground,
+            font_family=popup.font,
+            font_size=popup.fontsize,
+            font_shadow=popup.fontshadow,
+            wrap=popup.wrap,
+            markup=True,
+        )
+        popup.layout.layout.set_alignment(pangocffi.ALIGNMENTS[popup.text_alignment])
+
+        if popup.border_width and popup.border:
+            popup.win.paint_borders(popup.border, popup.border_width)
+
+    def _reap(self) -> None:
+        self._reaper = None
+        now = time.monotonic()
+        keep = []
+        for released, popup in self._idle:
+            if now - released >= self.idle_timeout:
+                popup.kill()
+            else:
+                keep.append((released, popup))
+        self._idle = keep
+
+        if self._idle:
+            released, popup = self._idle[0]
+            self._reaper = popup.qtile.call_later(
+                max(self.idle_timeout - (now - released), 0), self._reap
+            )
+
+    def clear(self) -> None:
+        """Kill all pooled popups."""
+        if self._reaper is not None:
+            self._reaper.cancel()
+            self._reaper = None
+        for _, popup in self._idle:
+            popup.kill()
+        self._idle.clear()
+
+
+popup_pool = PopupPool()
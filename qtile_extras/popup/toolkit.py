@@ -29,10 +29,10 @@ from libqtile.backend.x11.xkeysyms import keysyms
 from libqtile.command import interface
 from libqtile.lazy import LazyCall
 from libqtile.log_utils import logger
-from libqtile.popup import Popup
 from libqtile.utils import QtileError
 
-from qtile_extras.images import Img, ImgMask
+from qtile_extras.images import Img, ImgMask, image_cache
+from qtile_extras.popup.pool import popup_pool
 
 if TYPE_CHECKING:
     from typing import Any  # noqa: F401
@@ -40,6 +40,154 @@ if TYPE_CHECKING:
     from libqtile.core.manager import Qtile
 
 
+def _merge_rects(rects):
+    """
+    Combine rectangles (x, y, width, height) into a list of non-overlapping rectangles
+    covering the same area. Overlapping rectangles are replaced by their bounding box
+    and coordinates are rounded outwards to whole pixels.
+    """
+    merged = []
+    for x, y, width, height in rects:
+        box = [math.floor(x), math.floor(y), math.ceil(x + width), math.ceil(y + height)]
+        if box[2] <= box[0] or box[3] <= box[1]:
+            continue
+
+        # Keep absorbing overlapping rectangles as the bounding box grows
+        overlapping = True
+        while overlapping:
+            overlapping = False
+            for other in merged:
+                if (
+                    other[0] < box[2]
+                    and box[0] < other[2]
+                    and other[1] < box[3]
+                    and box[1] < other[3]
+                ):
+                    merged.remove(other)
+                    box = [
+                        min(box[0], other[0]),
+                        min(box[1], other[1]),
+                        max(box[2], other[2]),
+                        max(box[3], other[3]),
+                    ]
+                    overlapping = True
+                    break
+
+        merged.append(box)
+
+    return [(x0, y0, x1 - x0, y1 - y0) for x0, y0, x1, y1 in merged]
+
+
+class _ControlIndex:
+    """
+    Uniform grid over the controls in a layout, used to find controls under the pointer,
+    controls in a damaged area and the nearest control when navigating with the keyboard.
+
+    The grid's cells are the size of a typical (median) control. Each control is added
+    to every cell that it covers and, separately, to the cell containing its midpoint.
+    Controls are stored by their position in the layout so results keep the layout's
+    drawing order.
+    """
+
+    def __init__(self, controls):
+        self.controls = controls
+        self._cells = {}  # type: dict[tuple[int, int], list[int]]
+        self._midpoints = {}  # type: dict[tuple[int, int], list[int]]
+
+        widths = sorted(c.width for c in controls)
+        heights = sorted(c.height for c in controls)
+        self.cell_width = max(widths[len(widths) // 2], 1) if controls else 1
+        self.cell_height = max(heights[len(heights) // 2], 1) if controls else 1
+
+        for index, control in enumerate(controls):
+            for cell in self._covered(*control.bounds):
+                self._cells.setdefault(cell, []).append(index)
+
+            x, y = self._midpoint(control)
+            self._midpoints.setdefault(self._cell(x, y), []).append(index)
+
+        cols = [col for col, _ in self._midpoints] or [0]
+        rows = [row for _, row in self._midpoints] or [0]
+        self._extent = (min(cols), min(rows), max(cols), max(rows))
+
+    def _cell(self, x, y):
+        return math.floor(x / self.cell_width), math.floor(y / self.cell_height)
+
+    def _covered(self, x, y, width, height):
+        col0, row0 = self._cell(x, y)
+        col1 = math.ceil((x + width) / self.cell_width)
+        row1 = math.ceil((y + height) / self.cell_height)
+        return [(col, row) for col in range(col0, col1) for row in range(row0, row1)]
+
+    @staticmethod
+    def _midpoint(control):
+        return control.offsetx + control.width / 2, control.offsety + control.height / 2
+
+    def at(self, x, y):
+        """Return the controls under the point (x, y), topmost first."""
+        indices = self._cells.get(self._cell(x, y), [])
+        return [
+            self.controls[i] for i in reversed(indices) if self.controls[i].mouse_in_control(x, y)
+        ]
+
+    def overlapping(self, x, y, width, height):
+        """Return the controls overlapping the rectangle, in drawing order."""
+        indices = set()
+        for cell in self._covered(x, y, width, height):
+            indices.update(self._cells.get(cell, []))
+
+        controls = (self.controls[i] for i in sorted(indices))
+        return [c for c in controls if c.intersects(x, y, width, height)]
+
+    def _ring(self, col, row, ring):
+        """Yield the cells at ``ring`` cells from (col, row) which lie inside the grid."""
+        min_col, min_row, max_col, max_row = self._extent
+        cols = range(max(col - ring, min_col), min(col + ring, max_col) + 1)
+        for r in {row - ring, row + ring}:
+            if min_row <= r <= max_row:
+                for c in cols:
+                    yield c, r
+
+        rows = range(max(row - ring + 1, min_row), min(row + ring - 1, max_row) + 1)
+        for c in {col - ring, col + ring} if ring else ():
+            if min_col <= c <= max_col:
+                for r in rows:
+                    yield c, r
+
+    def nearest(self, control, accept):
+        """
+        Return the control whose midpoint is closest to that of ``control`` and for
+        which ``accept(candidate)`` is True. Cells are searched in rings around the
+        control's midpoint, stopping once no closer controls can remain.
+        """
+        x, y = self._midpoint(control)
+        centre_col, centre_row = self._cell(x, y)
+        cell = min(self.cell_width, self.cell_height)
+
+        min_col, min_row, max_col, max_row = self._extent
+        span = max(
+            centre_col - min_col, max_col - centre_col, centre_row - min_row, max_row - centre_row
+        )
+
+        best = None
+        for ring in range(span + 1):
+            # Every midpoint in this ring is at least (ring - 1) cells away
+            if best is not None and (ring - 1) * cell > best[0]:
+                break
+
+            for c in self._ring(centre_col, centre_row, ring):
+                for index in self._midpoints.get(c, []):
+                    candidate = self.controls[index]
+                    if candidate is control or not accept(candidate):
+                        continue
+
+                    key = (control.distance_to(candidate), index)
+                    if best is None or key < best:
+                        best = key
+
+        return None if best is None else self.controls[best[1]]
+
+
 class _PopupLayout(configurable.Configurable):
     """
     This is the base class for a 2D popup layout that displays additional
@@ -119,13 +267,19 @@ class _PopupLayout(configurable.Configurable):
 
         self._clicked = None
 
+        # Damaged areas collected while updating controls
+        self._damage = None
+
     def _configure(self, qtile: Qtile | None = None):
         """
-        This method creates an instances of a Popup window which serves as the
+        This method takes a Popup window from the shared pool which serves as the
         base for the tooltip.
 
         We also attach handlers for mouse events so that these can be passed to
         the relevant controls.
+
+        A layout that has been killed can be configured again. Its controls keep
+        their text layouts and images and are attached to the new window.
         """
         if self.qtile is None:
             if qtile is None:
@@ -133,7 +287,10 @@ class _PopupLayout(configurable.Configurable):
             else:
                 self.qtile = qtile
 
-        self.popup = Popup(
+        if self._killed:
+            self._reset()
+
+        self.popup = popup_pool.acquire(
             self.qtile,
             width=self.width,
             height=self.height,
@@ -192,7 +349,12 @@ class _PopupLayout(configurable.Configurable):
     def place_controls(self):
         for c in self.controls:
             self._place_control(c)
-            c._configure(self.qtile, self)
+            if c.configured:
+                c._attach(self)
+            else:
+                c._configure(self.qtile, self)
+
+        self._index = _ControlIndex(self.controls)
 
     def _place_control(self, control):
         """
@@ -215,6 +377,42 @@ class _PopupLayout(configurable.Configurable):
             c.draw()
         self.popup.draw()
 
+    def damage(self, *controls):
+        """
+        Redraw the area of the popup covered by ``controls`` and present only that area
+        to the window. Any other controls overlapping the area are also redrawn.
+
+        Controls damaged while ``update_controls`` is running are presented together
+        once all updates have been applied.
+        """
+        rects = [c.bounds for c in controls if c is not None]
+        if self._damage is not None:
+            self._damage.extend(rects)
+            return
+
+        self._redraw(rects)
+
+    def _redraw(self, rects):
+        if not self.configured or self.finalized:
+            return
+
+        ctx = self.popup.drawer.ctx
+        for x, y, width, height in _merge_rects(rects):
+            ctx.save()
+            ctx.rectangle(x, y, width, height)
+            ctx.clip()
+            self.popup.clear()
+            for c in self._index.overlapping(x, y, width, height):
+                c.draw()
+            ctx.restore()
+
+            self.popup.drawer.draw(
+                offsetx=x, offsety=y, width=width, height=height, src_x=x, src_y=y
+            )
+
+            # Drawing resets the drawer's surface
+            ctx = self.popup.drawer.ctx
+
     def show(
         self,
         x: int | float = 0,
@@ -399,13 +597,30 @@ class _PopupLayout(configurable.Configurable):
         self.popup.unhide()
 
     def kill(self):
-        """Kill the popup window."""
+        """Kill the popup window (returning it to the popup pool)."""
+        if self._killed:
+            return
+        for timer in (self._autohide_timer, self._hide_timer):
+            if timer is not None:
+                timer.cancel()
         if self.keyboard_navigation:
             self.unset_hooks()
-        self.popup.kill()
+        popup_pool.release(self.popup)
         self.finalize()
         self.finalized = True
         self._killed = True
+        self.configured = False
+
+    def _reset(self):
+        """Clear the state left by the previous window before the layout is reopened."""
+        self.finalized = False
+        self._killed = False
+        self.cursor_in = None
+        self._clicked = None
+        self._autohide_timer = None
+        self._hide_timer = None
+        self.unfocus()
+        self._get_focusable_controls()
 
     def finalize(self):
         for control in self.controls:
@@ -413,11 +628,7 @@ class _PopupLayout(configurable.Configurable):
 
     # The below methods are lifted from `bar` and adapted
     def get_control_in_position(self, x, y):
-        controls = []
-        for c in self.controls:
-            if c.mouse_in_control(x, y):
-                controls.insert(0, c)
-        return controls
+        return self._index.at(x, y)
 
     def process_button_click(self, x, y, button):  # noqa: N802
         controls = self.get_control_in_position(x, y)
@@ -488,6 +699,7 @@ class _PopupLayout(configurable.Configurable):
         if not self.keyboard_navigation:
             return
 
+        previous = self._focused
         self.unfocus()
 
         if self._focused is None and self.initial_focus is None:
@@ -532,25 +744,23 @@ class _PopupLayout(configurable.Configurable):
         if control:
             control.focus()
 
-            self.draw()
+            self.damage(previous, control)
 
     def fake_key_press(self, keycode):
         self.process_key_press(self.qtile.core.keysym_from_name(keycode))
 
     def find_nearest_control(self, direction):
-        controls = []
-        if direction == "left":
-            controls = [c for c in self.controls if self._focused.is_left(c) and c.can_focus]
-        elif direction == "right":
-            controls = [c for c in self.controls if self._focused.is_right(c) and c.can_focus]
-        elif direction == "up":
-            controls = [c for c in self.controls if self._focused.is_above(c) and c.can_focus]
-        elif direction == "down":
-            controls = [c for c in self.controls if self._focused.is_below(c) and c.can_focus]
-
-        if controls:
-            controls.sort(key=lambda x: self._focused.distance_to(x))
-            return controls[0]
+        checks = {
+            "left": self._focused.is_left,
+            "right": self._focused.is_right,
+            "up": self._focused.is_above,
+            "down": self._focused.is_below,
+        }
+        if direction not in checks:
+            return None
+
+        check = checks[direction]
+        return self._index.nearest(self._focused, lambda c: c.can_focus and check(c))
 
     def unfocus(self):
         for c in self.controls:
@@ -567,8 +777,20 @@ class _PopupLayout(configurable.Configurable):
         filename while passing a tuple of two strings will set the primary and highlight image
         filenames. You should use a value of ``None`` if you wish a value to be unchanged.
 
-        The popup will be redrawn automatically after updating the relevant controls.
+        Only the areas of the popup covered by the updated controls will be redrawn.
         """
+        self._damage = []
+        try:
+            self._update_controls(updates)
+        finally:
+            rects, self._damage = self._damage, None
+
+        self._redraw(rects)
+
+        if self.hide_on_timeout:
+            self._set_autohide()
+
+    def _update_controls(self, updates):
         for name, value in updates.items():
             if name not in self._updateable_controls:
                 continue
@@ -596,12 +818,7 @@ class _PopupLayout(configurable.Configurable):
             elif isinstance(control, PopupSlider):
                 control.value = value
 
-            control.draw()
-
-        self.popup.draw()
-
-        if self.hide_on_timeout:
-            self._set_autohide()
+            self.damage(control)
 
     def bind_callbacks(self, **binds):
         """
@@ -845,6 +1062,11 @@ class _PopupWidget(configurable.Configurable):
         self.drawer = container.popup.drawer
         self.configured = True
 
+    def _attach(self, container):
+        """Draw to the container's current window, e.g. after the layout is reopened."""
+        self.container = container
+        self.drawer = container.popup.drawer
+
     def add_callbacks(self, defaults):
         """
         Add default callbacks with a lower priority than user-specified
@@ -951,6 +1173,25 @@ class _PopupWidget(configurable.Configurable):
         else:
             return self.background or self.container.background
 
+    @property
+    def bounds(self):
+        """The area of the popup (x, y, width, height) covered by the control."""
+        return self.offsetx, self.offsety, self.width, self.height
+
+    def intersects(self, x, y, width, height):
+        """Checks whether the control overlaps the given rectangle."""
+        return (
+            self.offsetx < x + width
+            and x < self.offsetx + self.width
+            and self.offsety < y + height
+            and y < self.offsety + self.height
+        )
+
+    def damage(self):
+        """Redraw the control and present it to the popup window."""
+        if self.configured:
+            self.container.damage(self)
+
     def mouse_in_control(self, x, y):
         """Checks whether the point (x, y) is inside the control."""
         return all(
@@ -980,15 +1221,14 @@ class _PopupWidget(configurable.Configurable):
 
     def mouse_enter(self, x, y):
         if self.can_focus and self.highlight and not self._highlight:
+            previous = self.container._focused
             self.focus()
-            self.draw()
-            self.container.draw()
+            self.container.damage(previous, self)
 
     def mouse_leave(self, x, y):
         if self.can_focus and self._highlight:
             self.unfocus()
-            self.draw()
-            self.container.draw()
+            self.damage()
 
     def pointer_motion(self, x, y):
         pass
@@ -1090,6 +1330,10 @@ class PopupText(_PopupWidget):
         self.layout.layout.set_alignment(pangocffi.ALIGNMENTS[self.h_align])
         self.layout.width = self.width
 
+    def _attach(self, container):
+        _PopupWidget._attach(self, container)
+        self.layout.drawer = self.drawer
+
     def _set_layout_colour(self):
         if self.highlight_method == "text" and self._highlight:
             self.layout.colour = self.highlight
@@ -1122,8 +1366,11 @@ class PopupText(_PopupWidget):
     @text.setter
     def text(self, val):
         self._text = val
-        self.layout.text = self._text
-        self.draw()
+        # Unconfigured controls have no layout (e.g. items scrolled out of a menu). The
+        # text is applied when the control is configured.
+        if self.configured:
+            self.layout.text = self._text
+            self.damage()
 
     def info(self):
         info = _PopupWidget.info(self)
@@ -1260,8 +1507,7 @@ class PopupSlider(_PopupWidget):
     @value.setter
     def value(self, val):
         self._value = self._check_value(val)
-        self.draw()
-        self.container.popup.draw()
+        self.damage()
 
     @property
     def percentage(self):
@@ -1441,21 +1687,27 @@ class PopupImage(_PopupWidget):
         if filename.startswith("http"):
             img = img_class.from_url(filename)
 
+            if (img.width / img.height) >= (self.width / self.height):
+                img.scale(width_factor=(self.width / img.width), lock_aspect_ratio=True)
+            else:
+                img.scale(height_factor=(self.height / img.height), lock_aspect_ratio=True)
+
         else:
             filename = os.path.expanduser(filename)
             if not os.path.exists(filename):
                 logger.warning("Image does not exist: %s", filename)
                 return
 
-            img = img_class.from_path(filename)
-
-        if (img.width / img.height) >= (self.width / self.height):
-            img.scale(width_factor=(self.width / img.width), lock_aspect_ratio=True)
-        else:
-            img.scale(height_factor=(self.height / img.height), lock_aspect_ratio=True)
+            # Images are loaded from the shared cache so the scaled image can be reused
+            # by other popups
+            img = image_cache.load(filename, mask=self.mask)
+            if img is None:
+                return
 
-        if self.mask:
-            img.attach_drawer(self.drawer)
+            if (img.width / img.height) >= (self.width / self.height):
+                img = image_cache.load(filename, width=self.width, mask=self.mask)
+            else:
+                img = image_cache.load(filename, height=self.height, mask=self.mask)
 
         return img
 
@@ -1467,6 +1719,8 @@ class PopupImage(_PopupWidget):
             int((self.width - self.img.width) / 2), int((self.height - self.img.height) / 2)
         )
         if self.mask:
+            # Masks are shared via the image cache so attach our drawer before drawing
+            self.img.attach_drawer(self.drawer)
             self.img.draw(
                 colour=self.highlight
                 if (self._highlight and self.highlight_method == "mask")
@@ -1617,3 +1871,6 @@ class PopupWidget(_PopupWidget):
 
     def finalize(self):
         self.widget.finalize()
+
+        # The widget is configured again if the layout is reopened
+        self.configured = False
@@ -20,138 +20,386 @@
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 # SOFTWARE.
 import argparse
+import json
 import mmap
-from contextlib import contextmanager
+import os
+import struct
+import time
+from contextlib import ExitStack
 from pathlib import Path
-from time import sleep
 
 import cairocffi
 from libqtile.utils import rgb
 
-SHM = "/tmp/shm.mmap"
-LOCK = "/tmp/lock.mmap"
-
-
-def draw_cava(width, height, num_bars, pad, bar_width, spacing, pipe, background, invert):
-    mem_size = width * height * 4
-    init = bytearray(b"\00") * mem_size
-
-    # Both files are opened in write mode so original contents is deleted
-    with open(SHM, "wb+") as shm_file, open(LOCK, "wb+") as lock_file:
-        # Image file is filled with zeroes
-        shm_file.write(init)
-        shm_file.flush()
-
-        # Lock file is set to zero (unlocked)
-        lock_file.write(b"\00")
-        lock_file.flush()
-
-        with (
-            mmap.mmap(shm_file.fileno(), length=mem_size, access=mmap.ACCESS_DEFAULT) as shm,
-            mmap.mmap(lock_file.fileno(), length=1) as lock,
-        ):
-            draw_bars(
-                shm,
-                lock,
-                width,
-                height,
-                num_bars,
-                pad,
-                bar_width,
-                spacing,
-                pipe,
-                background,
-                mem_size,
-                invert,
-            )
+# NumPy is only imported when it's used so the widget can import this module without
+# loading NumPy into qtile's process
+np = None
+
+# Shared memory holds a header followed by a ring of frame buffers. The header contains
+# a sequence number which is incremented each time a frame is completed. The latest
+# complete frame is in buffer ``sequence % BUFFERS`` and the next frame is drawn in the
+# following buffer so the widget can read the latest frame without any locking.
+HEADER = struct.Struct("<Q")
+HEADER_SIZE = 64
+BUFFERS = 3
+
+
+def load_numpy():
+    """Imports NumPy, if it's installed. Returns ``True`` if NumPy can be used."""
+    global np
+    if np is None:
+        try:
+            import numpy
+        except ImportError:
+            return False
+        np = numpy
+    return True
+
+
+def frame_size(width, height):
+    return width * height * 4
+
+
+def shm_size(width, height):
+    return HEADER_SIZE + BUFFERS * frame_size(width, height)
+
+
+def read_sequence(shm):
+    return HEADER.unpack_from(shm, 0)[0]
+
+
+def create_frames(shm, width, height):
+    """Returns cairo surfaces which draw directly to the frame buffers in shared memory."""
+    size = frame_size(width, height)
+    view = memoryview(shm)
+    return [
+        cairocffi.ImageSurface.create_for_data(
+            view[HEADER_SIZE + i * size : HEADER_SIZE + (i + 1) * size],
+            cairocffi.FORMAT_ARGB32,
+            width,
+            height,
+        )
+        for i in range(BUFFERS)
+    ]
+
+
+class Output:
+    """
+    Frames drawn for a single visualiser widget.
+
+    Each output has its own size, bar spacing, colour and shared memory so one cava
+    stream can be drawn for several widgets.
+
+    Where NumPy is available, bars are written straight into the frame buffers rather than
+    drawn with cairo. Set ``vectorised`` to ``False`` to force the cairo renderer.
+    """
+
+    def __init__(
+        self, shm, width, height, num_bars, spacing, background, invert, vectorised=None
+    ):
+        self.path = shm
+        self.width = width
+        self.height = height
+        self.num_bars = num_bars
+        self.spacing = spacing
+        self.background = rgb(background)
+        self.invert = invert
+        self.vectorised = vectorised is not False and load_numpy()
+
+        self.bar_width = width // num_bars
+        self.pad = (width - (self.bar_width * num_bars)) // 2
+        self.bar_width -= spacing
+
+        if self.vectorised:
+            self._setup_arrays()
+
+    def _setup_arrays(self):
+        """Precomputes the arrays used to write bars directly to the frame buffers."""
+        # Index of the bar drawn in each column that's covered by a bar
+        step = self.bar_width + self.spacing
+        columns = []
+        bar_index = []
+        for i in range(self.num_bars):
+            x = self.pad + i * step
+            for col in range(max(x, 0), min(x + self.bar_width, self.width)):
+                columns.append(col)
+                bar_index.append(i)
+
+        self.columns = np.array(columns, dtype=np.intp)
+        self.bar_index = np.array(bar_index, dtype=np.intp)
+
+        # Rows are compared against bar heights to give the mask of pixels to fill
+        rows = np.arange(self.height, dtype=np.int32)[:, None]
+        self.rows = rows if self.invert else self.height - 1 - rows
+
+        # ARGB32 pixels are premultiplied and stored in native endianness
+        r, g, b, a = self.background
+        self.pixel = np.uint32(
+            (round(a * 255) << 24)
+            | (round(r * a * 255) << 16)
+            | (round(g * a * 255) << 8)
+            | round(b * a * 255)
+        )
+        self.heights = np.zeros(self.num_bars, dtype=np.int32)
+
+    def open(self, stack):
+        """Creates the shared memory for the output. ``stack`` closes it on exit."""
+        mem_size = shm_size(self.width, self.height)
+
+        # Existing memory is reused rather than truncated as it may already be mapped by the
+        # widget (e.g. when the drawing process is restarted to draw for another widget).
+        # New memory is filled with zeroes.
+        path = Path(self.path)
+        shm_file = stack.enter_context(open(path, "rb+" if path.is_file() else "wb+"))
+        shm_file.truncate(mem_size)
+
+        self.shm = stack.enter_context(
+            mmap.mmap(shm_file.fileno(), length=mem_size, access=mmap.ACCESS_DEFAULT)
+        )
+        self.frames = create_frames(self.shm, self.width, self.height)
+        self.contexts = [cairocffi.Context(frame) for frame in self.frames]
+        if self.vectorised:
+            size = frame_size(self.width, self.height)
+            self.pixels = [
+                np.frombuffer(
+                    self.shm, dtype=np.uint32, count=size // 4, offset=HEADER_SIZE + i * size
+                ).reshape(self.height, self.width)
+                for i in range(BUFFERS)
+            ]
+        self.sequence = read_sequence(self.shm)
+
+        # Surfaces need to be released before the shared memory can be closed
+        stack.callback(self.close)
+
+    def close(self):
+        for frame in self.frames:
+            frame.finish()
+        self.frames = []
+        self.contexts = []
+        # Arrays also hold references to the shared memory
+        self.pixels = []
+
+    def draw(self, out):
+        index = (self.sequence + 1) % BUFFERS
+
+        if self.vectorised:
+            self._draw_arrays(index, out)
+        else:
+            self._draw_cairo(index, out)
+
+        # Publish the frame
+        self.sequence += 1
+        HEADER.pack_into(self.shm, 0, self.sequence)
+
+    def _draw_arrays(self, index, out):
+        frame = self.frames[index]
+        frame.flush()
+
+        # Bars not included in a short read are left empty
+        heights = self.heights
+        heights[:] = 0
+        count = min(len(out), self.num_bars)
+        heights[:count] = np.frombuffer(out, dtype=np.uint8, count=count)
+        heights *= self.height
+        heights //= 255
+
+        pixels = self.pixels[index]
+        pixels.fill(0)
+        mask = self.rows < heights[self.bar_index]
+        pixels[:, self.columns] = np.where(mask, self.pixel, np.uint32(0))
+
+        frame.mark_dirty()
+
+    def _draw_cairo(self, index, out):
+        ctx = self.contexts[index]
+
+        ctx.set_operator(cairocffi.OPERATOR_CLEAR)
+        ctx.rectangle(0, 0, self.width, self.height)
+        ctx.fill()
+        ctx.set_operator(cairocffi.OPERATOR_SOURCE)
+        ctx.set_source_rgba(*self.background)
+        self.add_bars(ctx, out)
+        ctx.fill()
+        self.frames[index].flush()
+
+    def add_bars(self, ctx, out, y=0):
+        """Adds a rectangle to the context's path for each bar, offset by ``y``."""
+        x = self.pad
+        for bar in out:
+            h = int(bar * self.height / 255)
+            ctx.rectangle(x, y if self.invert else y + self.height - h, self.bar_width, h)
+            x += self.spacing + self.bar_width
+
+
+class Smoother:
+    """
+    Calculates the frames to draw for each frame received from cava.
+
+    ``interpolate`` frames are added between cava's frames so bars move smoothly even
+    when cava's framerate is low. When ``decay`` is set, falling bars drop to no less than
+    that fraction of their previous height for each frame from cava. Set ``vectorised``
+    to ``False`` to calculate frames without NumPy.
+    """
+
+    def __init__(self, num_bars, interpolate=0, decay=0, vectorised=None):
+        self.num_bars = num_bars
+        self.steps = interpolate + 1
+        self.decay = decay
+        self.vectorised = self.active and vectorised is not False and load_numpy()
+        if self.vectorised:
+            self.previous = np.zeros(num_bars, dtype=np.float32)
+        else:
+            self.previous = [0] * num_bars
+
+    @property
+    def active(self):
+        return self.steps > 1 or bool(self.decay)
+
+    def frames(self, out):
+        """Returns a list of frames, ending with the frame for ``out``."""
+        if not self.active:
+            return [out]
+
+        if self.vectorised:
+            return self._frames_arrays(out)
+
+        return self._frames_lists(out)
+
+    def _frames_arrays(self, out):
+        # Bars not included in a short read are treated as empty
+        target = np.zeros(self.num_bars, dtype=np.float32)
+        count = min(len(out), self.num_bars)
+        target[:count] = np.frombuffer(out, dtype=np.uint8, count=count)
+
+        if self.decay:
+            np.maximum(target, self.previous * self.decay, out=target)
+
+        delta = (target - self.previous) / self.steps
+        steps = np.arange(1, self.steps + 1, dtype=np.float32)[:, None]
+        frames = (self.previous + delta * steps).astype(np.uint8)
+        self.previous = target
+
+        return [frame.tobytes() for frame in frames]
+
+    def _frames_lists(self, out):
+        target = [float(bar) for bar in out[: self.num_bars]]
+        target.extend([0.0] * (self.num_bars - len(target)))
+
+        if self.decay:
+            target = [max(t, p * self.decay) for t, p in zip(target, self.previous)]
+
+        previous = self.previous
+        self.previous = target
+
+        return [
+            bytes(int(p + (t - p) * step / self.steps) for t, p in zip(target, previous))
+            for step in range(1, self.steps + 1)
+        ]
+
+
+def remove_stale_files(directory):
+    """Removes shared memory left behind by visualisers in qtile processes that have exited."""
+    for path in Path(directory).glob("qte_visualiser_*"):
+        try:
+            pid = int(path.name.split("_")[2])
+        except (IndexError, ValueError):
+            continue
+
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            path.unlink(missing_ok=True)
+        except PermissionError:
+            # The process exists but belongs to another user
+            pass
+
+
+def draw_cava(num_bars, pipe, outputs, framerate=25, interpolate=0, decay=0):
+    with ExitStack() as stack:
+        # Shared memory is created before waiting for cava's output so widgets can open it
+        for output in outputs:
+            output.open(stack)
+
+        smoother = Smoother(num_bars, interpolate, decay)
+        draw_bars(num_bars, pipe, outputs, smoother, 1 / framerate)
 
         # Files and mmaps are closed when draw_bars exits
 
 
-def draw_bars(
-    shm,
-    lock,
-    width,
-    height,
-    num_bars,
-    pad,
-    bar_width,
-    spacing,
-    pipe,
-    background,
-    mem_size,
-    invert,
-):
-    # Create a context manager to lock access to shared memory to prevent race conditions
-    @contextmanager
-    def lock_memory():
-        while lock[0]:
-            sleep(0.001)
-        lock[0] = 1
-        yield
-        lock[0] = 0
-
-    surface = cairocffi.ImageSurface(cairocffi.FORMAT_ARGB32, width, height)
-    ctx = cairocffi.Context(surface)
+def draw_bars(num_bars, pipe, outputs, smoother=None, interval=0):
+    if smoother is None:
+        smoother = Smoother(num_bars)
+
+    # Interpolated frames are spread over the time until cava's next frame
+    pause = interval / smoother.steps
+    last = None
 
     with open(pipe, "rb") as reader:
         out = reader.read(num_bars)
 
         while out:
-            ctx.set_operator(cairocffi.OPERATOR_CLEAR)
-            ctx.rectangle(0, 0, width, height)
-            ctx.fill()
-            ctx.set_operator(cairocffi.OPERATOR_SOURCE)
-            x = pad
-            ctx.set_source_rgba(*background)
-            for bar in out:
-                h = int(bar * height / 255)
-                ctx.rectangle(x, 0 if invert else height - h, bar_width, h)
-                x += spacing + bar_width
-
-            ctx.fill()
-
-            with lock_memory():
-                shm[:mem_size] = bytearray(surface.get_data())
+            frames = smoother.frames(out)
+            for i, frame in enumerate(frames):
+                if i:
+                    time.sleep(pause)
+
+                # Unchanged frames are not published so widgets can skip redrawing
+                if frame == last:
+                    continue
+
+                for output in outputs:
+                    output.draw(frame)
+
+                last = frame
 
             out = reader.read(num_bars)
 
 
 if __name__ == "__main__":
-    # Tidy up left over shared memory files
-    for shm in ["qte_cava_lock", "qte_cava_visualiser"]:
-        p = Path("/dev/shm") / shm
-        if p.is_file():
-            p.unlink()
-
     parser = argparse.ArgumentParser(description="Script to offload visualiser image generation.")
-    parser.add_argument("--width", dest="width", type=int, help="Image width", required=True)
-    parser.add_argument("--height", dest="height", type=int, help="Image height", required=True)
     parser.add_argument("--bars", dest="num_bars", type=int, help="Number of bars", required=True)
     parser.add_argument(
-        "--spacing", dest="spacing", type=int, help="Spacing between bars", required=True
+        "--pipe", dest="pipe", type=str, help="Pipe for cava output", required=True
     )
-    parser.add_argument("--background", dest="background", type=rgb, help="Background colour")
     parser.add_argument(
-        "--pipe", dest="pipe", type=str, help="Pipe for cava output", required=True
+        "--framerate", dest="framerate", type=int, default=25, help="cava's framerate"
+    )
+    parser.add_argument(
+        "--interpolate",
+        dest="interpolate",
+        type=int,
+        default=0,
+        help="Number of frames to add between cava's frames",
+    )
+    parser.add_argument(
+        "--decay",
+        dest="decay",
+        type=float,
+        default=0,
+        help="Fraction of previous height that falling bars can drop to for each frame",
     )
     parser.add_argument(
-        "--invert", dest="invert", action="store_true", help="Draw bars from top down"
+        "--output",
+        dest="outputs",
+        type=json.loads,
+        action="append",
+        required=True,
+        help=(
+            "JSON object with 'shm', 'width', 'height', 'spacing', 'background' and "
+            "'invert' keys. Can be repeated to draw the same stream for several widgets."
+        ),
     )
     args = parser.parse_args()
 
-    bar_width = args.width // args.num_bars
-    pad = (args.width - (bar_width * args.num_bars)) // 2
-    bar_width -= args.spacing
+    # Tidy up shared memory left by qtile processes that didn't exit cleanly
+    for directory in {Path(output["shm"]).parent for output in args.outputs}:
+        remove_stale_files(directory)
 
     draw_cava(
-        args.width,
-        args.height,
         args.num_bars,
-        pad,
-        bar_width,
-        args.spacing,
         args.pipe,
-        args.background,
-        args.invert,
+        [Output(num_bars=args.num_bars, **output) for output in args.outputs],
+        framerate=args.framerate,
+        interpolate=args.interpolate,
+        decay=args.decay,
     )
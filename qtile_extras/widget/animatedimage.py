@@ -19,13 +19,12 @@
 # SOFTWARE.
 import os
 
-from cairocffi.pixbuf import ImageLoadingError
 from libqtile import bar
 from libqtile.command.base import expose_command
 from libqtile.log_utils import logger
 from libqtile.widget import base
 
-from qtile_extras.images import Img
+from qtile_extras.images import Img, image_cache
 
 
 class AnimatedImage(base._Widget, base.MarginMixin):
@@ -79,29 +78,31 @@ class AnimatedImage(base._Widget, base.MarginMixin):
         self.images_loaded = True
 
     def _load_image(self, filename):
-        img = None
-
         filename = os.path.expanduser(filename)
 
+        size: dict[str, int]
+        if self.scale:
+            if self.bar.horizontal:
+                size = {"height": self.bar.height - (self.margin_y * 2)}
+            else:
+                size = {"width": self.bar.width - (self.margin_x * 2)}
+        else:
+            size = {}
+
         if filename.startswith("http"):
             img = Img.from_url(filename)
+            if img is not None and size:
+                img.resize(**size)
 
         else:
             if not os.path.exists(filename):
                 logger.warning("Image does not exist: %s", filename)
                 return
-            try:
-                img = Img.from_path(filename)
-            except ImageLoadingError:
-                logger.error("Could not load image: %s.", filename)
 
-        if img is not None and self.scale:
-            if self.bar.horizontal:
-                new_height = self.bar.height - (self.margin_y * 2)
-                img.resize(height=new_height)
-            else:
-                new_width = self.bar.width - (self.margin_x * 2)
-                img.resize(width=new_width)
+            # Frames are loaded from the shared cache so each file is only decoded once
+            img = image_cache.load(filename, **size)
+            if img is None:
+                logger.error("Could not load image: %s.", filename)
 
         return img
 
@@ -27,6 +27,7 @@ from libqtile.log_utils import logger
 from libqtile.widget import base
 
 from qtile_extras import hook
+from qtile_extras.images import image_cache
 from qtile_extras.popup.templates.volume import VOLUME_NOTIFICATION
 from qtile_extras.widget.mixins import ExtendedPopupMixin, ProgressBarMixin
 
@@ -273,7 +274,12 @@ class _Volume(base._Widget, ExtendedPopupMixin, ProgressBarMixin):
         self._icon_padding = (self.bar.height - self._icon_size) // 2
 
         for name, img in d_images.items():
-            img.resize(height=self._icon_size)
+            # Icons are loaded from the shared cache so widgets using the same theme only
+            # decode each icon once
+            img = image_cache.load(img.path, height=self._icon_size)
+            if img is None:
+                return False
+
             self.icon_width = img.width
             self.surfaces[name] = img.pattern
 
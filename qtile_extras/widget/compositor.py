@@ -0,0 +1,155 @@
+# Copyright (c) 2026 elParaguayo
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+from __future__ import annotations
+
+from functools import wraps
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from typing import Any  # noqa: F401
+
+
+class BarCompositor:
+    """
+    Tracks the area painted by each widget in a bar so that, when the bar is redrawn,
+    widgets whose contents and position are unchanged are not repainted.
+
+    Only widgets which track their own changes (i.e. widgets using the
+    ``DirtyTrackingMixin``) can be skipped. These widgets must mark themselves as dirty
+    before asking the bar to redraw. All other widgets are always repainted.
+
+    The recorded area includes any extra width added by decorations. The whole bar is
+    repainted after it is exposed or reconfigured, after a widget is hidden or shown
+    or changes its background, and whenever the bar has a border (as the border is
+    painted over the whole bar).
+    """
+
+    def __init__(self, bar):
+        self.bar = bar
+        self.painted = 0
+        self.skipped = 0
+        self._compositing = False
+        self._dirty = set()  # type: set[int]
+        self._regions = {}  # type: dict[int, tuple]
+        self._expose = None
+
+        self._bar_draw = bar._actual_draw
+        bar._actual_draw = self._actual_draw
+
+    @classmethod
+    def get(cls, bar) -> BarCompositor:
+        """Returns the compositor for the bar, creating one if necessary."""
+        compositor = getattr(bar, "_compositor", None)
+        if compositor is None:
+            compositor = cls(bar)
+            bar._compositor = compositor
+        return compositor
+
+    def attach(self) -> None:
+        """Repaints the whole bar when the bar's window is exposed."""
+        window = getattr(self.bar, "window", None)
+        handler = getattr(window, "process_window_expose", None)
+
+        # The window is recreated when the bar is reconfigured so we may need to wrap the
+        # handler again
+        if handler is None or handler == self._on_expose:
+            return
+
+        self._expose = handler
+        window.process_window_expose = self._on_expose
+
+    def _on_expose(self, *args, **kwargs):
+        self.invalidate()
+        if self._expose is not None:
+            self._expose(*args, **kwargs)
+
+    def invalidate(self) -> None:
+        """Forces all widgets to be repainted on the next draw."""
+        self._regions.clear()
+
+    def mark_dirty(self, widget) -> None:
+        self._dirty.add(id(widget))
+
+    @property
+    def has_border(self) -> bool:
+        border_width = getattr(self.bar, "border_width", 0)
+        if isinstance(border_width, int):
+            return bool(border_width)
+        return any(border_width)
+
+    def _actual_draw(self, *args, **kwargs):
+        # Widgets are only skipped when the whole bar is being redrawn
+        self._compositing = not self.has_border
+        try:
+            self._bar_draw(*args, **kwargs)
+        finally:
+            self._compositing = False
+
+    def region(self, widget) -> tuple:
+        """The area painted by the widget and the colours it's painted on."""
+        return (
+            widget.offsetx,
+            widget.offsety,
+            widget.width,
+            widget.height,
+            widget.background,
+            self.bar.background,
+        )
+
+    def should_paint(self, widget) -> bool:
+        if not (self._compositing and getattr(widget, "_qte_dirty_tracking", False)):
+            return True
+
+        # Subclasses which override ``draw`` don't use the composited draw method
+        # so they may only paint part of the widget if we skip the parent's method
+        if not getattr(type(widget).draw, "_composited", False):
+            return True
+
+        if id(widget) in self._dirty:
+            return True
+
+        return self._regions.get(id(widget)) != self.region(widget)
+
+    def record(self, widget) -> None:
+        self._dirty.discard(id(widget))
+        self._regions[id(widget)] = self.region(widget)
+        if self._compositing:
+            self.painted += 1
+
+
+def composited(draw):
+    """Wraps a widget's ``draw`` method so it can be skipped by the bar's compositor."""
+
+    @wraps(draw)
+    def composited_draw(self, *args, **kwargs):
+        compositor = getattr(self, "_compositor", None)
+        if compositor is None:
+            return draw(self, *args, **kwargs)
+
+        if not compositor.should_paint(self):
+            compositor.skipped += 1
+            return
+
+        result = draw(self, *args, **kwargs)
+        compositor.record(self)
+        return result
+
+    composited_draw._composited = True  # type: ignore[attr-defined]
+    return composited_draw
@@ -17,12 +17,11 @@
 # LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 # SOFTWARE.
-import cairocffi
 from libqtile.log_utils import logger
 from libqtile.widget import CurrentLayout as _CurrentLayout
 from libqtile.widget import base
 
-from qtile_extras.images import ImgMask
+from qtile_extras.images import image_cache
 
 
 class CurrentLayout(_CurrentLayout):
@@ -73,22 +72,21 @@ class CurrentLayout(_CurrentLayout):
                 logger.warning('No icon found for layout "%s".', layout_name)
                 icon_file_path = self.find_icon_file_path("unknown")
 
-            try:
-                img = ImgMask.from_path(icon_file_path)
-                img.attach_drawer(self.drawer)
-                # Check if we can create a surface here
-                img.surface
-            except (OSError, cairocffi.Error, cairocffi.pixbuf.ImageLoadingError):
+            # Resize the image to the bar and adjust for any scaling.
+            size = int((self.bar.height - 1) * self.scale)
+
+            # Icons are loaded from the shared cache so they're only decoded once
+            # e.g. when there are bars on multiple screens.
+            img = image_cache.load(icon_file_path, width=size, mask=True)
+            if img is None:
                 # Icon file is guaranteed to exist at this point.
-                # If this exception happens, it means the icon file contains
+                # If this happens, it means the icon file contains
                 # an invalid image or is not readable.
                 self.icons_loaded = False
                 logger.warning('Failed to load icon from file "%s".', icon_file_path)
-                raise
+                return
 
-            # Resize the image to the bar and adjust for any scaling.
-            size = int((self.bar.height - 1) * self.scale)
-            img.resize(size)
+            img.attach_drawer(self.drawer)
 
             if img.width > self.img_length:
                 self.img_length = int(img.width)
@@ -21,6 +21,7 @@ from __future__ import annotations
 
 import copy
 import math
+import weakref
 from functools import partial
 from pathlib import Path
 from typing import TYPE_CHECKING
@@ -29,12 +30,15 @@ import cairocffi
 from cairocffi import Context
 from libqtile import bar
 from libqtile.backend.base import Drawer
+from libqtile.command.base import expose_command
 from libqtile.confreader import ConfigError
 from libqtile.log_utils import logger
 from libqtile.utils import rgb
 from libqtile.widget import Systray, base
 
-from qtile_extras.images import Img
+from qtile_extras.images import image_cache
+from qtile_extras.widget.compositor import BarCompositor, composited
+from qtile_extras.widget.profiler import profiled, profiler
 
 if TYPE_CHECKING:
     from typing import Any  # noqa: F401
@@ -58,18 +62,33 @@ class _Decoration(base.PaddingMixin):
             "Ignores additional width added by decoration. "
             "Useful when stacking decorations on top of a PowerLineDecoration.",
         ),
+        (
+            "cache",
+            False,
+            "Render the decoration once to a cached surface which is reused until the size, "
+            "colours or grouping of the decoration change.",
+        ),
     ]  # type: list[tuple[str, Any, str]]
 
+    # Operator used to paint the cached surface onto the widget
+    _cache_operator = cairocffi.OPERATOR_OVER
+
     def __init__(self, **config):
         base.PaddingMixin.__init__(self, **config)
         self.add_defaults(_Decoration.defaults)
         self._extrawidth = self.extrawidth
+        self._ctx = None  # type: Context | None
+        self._cache = None  # type: cairocffi.ImageSurface | None
+        self._cache_key = None  # type: tuple | None
+        self._cache_misses = 0
 
     def __eq__(self, other):
         return type(self) is type(other) and self._user_config == other._user_config
 
     def _configure(self, parent: base._Widget) -> None:
         self.parent = parent
+        self._cache = None
+        self._cache_key = None
 
     def single_or_four(self, value, name: str):
         if isinstance(value, float | int):
@@ -91,6 +110,54 @@ class _Decoration(base.PaddingMixin):
     def clone(self) -> _Decoration:
         return copy.copy(self)
 
+    def cache_key(self) -> tuple:
+        """
+        Values which determine the appearance of the decoration. The cached surface is
+        redrawn whenever this changes.
+
+        Subclasses should extend this with any additional properties used when drawing.
+        """
+        return (
+            self.parent.width,
+            self.parent.height,
+            self.width,
+            self.height,
+            self.parent.background,
+            self.parent.bar.background,
+        )
+
+    def draw_cached(self) -> None:
+        """
+        Paints the decoration from a cached surface, rendering the surface first if
+        the decoration has changed since it was last drawn.
+        """
+        width = self.parent.width
+        height = self.parent.height
+
+        # Nothing to do if widget is hidden
+        if not (width and height):
+            return
+
+        key = self.cache_key()
+
+        if self._cache is None or key != self._cache_key:
+            self._cache = cairocffi.ImageSurface(cairocffi.FORMAT_ARGB32, width, height)
+            self._ctx = Context(self._cache)
+            try:
+                self.draw()
+            finally:
+                self._ctx = None
+            self._cache_key = key
+            self._cache_misses += 1
+
+        ctx = self.drawer.ctx
+        ctx.save()
+        ctx.set_operator(self._cache_operator)
+        ctx.set_source_surface(self._cache)
+        ctx.rectangle(0, 0, width, height)
+        ctx.fill()
+        ctx.restore()
+
     @property
     def height(self) -> int:
         if self.parent.bar.horizontal:
@@ -118,17 +185,308 @@ class _Decoration(base.PaddingMixin):
 
     @property
     def ctx(self) -> Context:
+        # When rendering to the cache, we draw on the cached surface instead
+        if self._ctx is not None:
+            return self._ctx
         return self.drawer.ctx
 
     def set_source_rgb(self, colour) -> None:
         self.drawer.set_source_rgb(colour, ctx=self.ctx)
 
+    def clear_rect(self, x: float, y: float, width: float, height: float) -> None:
+        self.ctx.save()
+        self.ctx.set_operator(cairocffi.OPERATOR_CLEAR)
+        self.ctx.rectangle(x, y, width, height)
+        self.ctx.fill()
+        self.ctx.restore()
+
+
+class _WidgetGroup:
+    """
+    A run of adjacent widgets in a bar which share a grouped decoration.
+
+    The visibility of each widget is cached so that the first and last visible
+    widgets can be returned without recalculating the length of every widget
+    in the group.
+    """
+
+    def __init__(self, widgets):
+        self.widgets = widgets
+        self.visible = {id(w): w.length > 0 for w in widgets}
+        self._first = None
+        self._last = None
+        self._dirty = True
+
+    def set_visible(self, widget, visible: bool) -> None:
+        if self.visible.get(id(widget)) != visible:
+            self.visible[id(widget)] = visible
+            self._dirty = True
+
+    def _update(self) -> None:
+        visible = [w for w in self.widgets if self.visible[id(w)]]
+        self._first = visible[0] if visible else None
+        self._last = visible[-1] if visible else None
+        self._dirty = False
+
+    def is_first(self, widget) -> bool:
+        if self._dirty:
+            self._update()
+        return widget is self._first
+
+    def is_last(self, widget) -> bool:
+        if self._dirty:
+            self._update()
+        return widget is self._last
+
+
+class _GroupIndex:
+    """
+    Index of the decoration groups in a bar.
+
+    The index is built the first time it is queried and is only rebuilt when
+    widgets are added to or removed from the bar, or when a widget is (re)configured.
+    Changes in widget visibility are reported by the injected ``length`` property
+    so decorations can look up their position in a group without scanning the bar.
+    """
+
+    def __init__(self, bar):
+        self.bar = bar
+        self.builds = 0
+        self._widgets = None
+        self._count = 0
+        self._groups = {}  # type: dict[int, _WidgetGroup]
+        self._positions = {}  # type: dict[int, int]
+
+    @classmethod
+    def get(cls, bar) -> _GroupIndex:
+        """Returns the index for the bar, creating one if necessary."""
+        index = getattr(bar, "_decoration_groups", None)
+        if index is None:
+            index = cls(bar)
+            bar._decoration_groups = index
+        return index
+
+    @staticmethod
+    def is_grouped(widget) -> bool:
+        return any(getattr(dec, "group", False) for dec in getattr(widget, "decorations", list()))
+
+    @staticmethod
+    def in_same_group(w1, w2) -> bool:
+        for dec in getattr(w1, "decorations", list()):
+            if getattr(dec, "group", False) and dec not in getattr(w2, "decorations", list()):
+                return False
+
+        return True
+
+    def invalidate(self) -> None:
+        self._widgets = None
+
+    @property
+    def stale(self) -> bool:
+        widgets = self.bar.widgets
+        return self._widgets is not widgets or self._count != len(widgets)
+
+    def build(self) -> None:
+        widgets = self.bar.widgets
+        self._positions = {id(w): i for i, w in enumerate(widgets)}
+        self._groups = {}
+
+        current = []  # type: list[Any]
+        runs = []
+
+        for i, w in enumerate(widgets):
+            if not self.is_grouped(w):
+                continue
+
+            # If the next grouped widget is not adjacent to the previous grouped widget
+            # (or has a different decoration) then we start a new group.
+            if current and (
+                self._positions[id(current[-1])] != i - 1
+                or not self.in_same_group(w, current[-1])
+            ):
+                runs.append(current)
+                current = []
+
+            current.append(w)
+
+        if current:
+            runs.append(current)
+
+        for run in runs:
+            group = _WidgetGroup(run)
+            for w in run:
+                self._groups[id(w)] = group
+
+        self._widgets = widgets
+        self._count = len(widgets)
+        self.builds += 1
+
+    def group_for(self, widget) -> _WidgetGroup | None:
+        if self.stale:
+            self.build()
+        return self._groups.get(id(widget))
+
+    def position(self, widget) -> int:
+        if self.stale:
+            self.build()
+        try:
+            return self._positions[id(widget)]
+        except KeyError:
+            raise ValueError(f"{widget} is not in bar.")
+
+    def grouped_widgets(self) -> list[Any]:
+        if self.stale:
+            self.build()
+        return [w for w in self.bar.widgets if id(w) in self._groups]
+
+    def set_visible(self, widget, visible: bool) -> None:
+        # We don't trigger a build here as this is called while the bar is
+        # calculating widget lengths.
+        group = self._groups.get(id(widget))
+        if group is not None:
+            group.set_visible(widget, visible)
+
+
+class _NeighbourMap:
+    """
+    Map of the background colour of the next visible widget for each widget in a bar.
+
+    The map is recalculated in a single pass over the bar's widgets when widgets are added
+    or removed, or when a widget is hidden, shown or changes its background. Changes are
+    reported by the injected ``length`` and ``background`` properties.
+    """
+
+    def __init__(self, bar):
+        self.bar = bar
+        self.builds = 0
+        self._widgets = None
+        self._count = 0
+        self._bar_background = None
+        self._dirty = True
+        self._visible = {}  # type: dict[int, bool]
+        self._next = {}  # type: dict[int, Any]
+
+    @classmethod
+    def get(cls, bar) -> _NeighbourMap:
+        """Returns the map for the bar, creating one if necessary."""
+        neighbours = getattr(bar, "_decoration_neighbours", None)
+        if neighbours is None:
+            neighbours = cls(bar)
+            bar._decoration_neighbours = neighbours
+        return neighbours
+
+    def invalidate(self) -> None:
+        self._dirty = True
+
+        # Widgets may need to repaint their decorations with a new colour
+        BarCompositor.get(self.bar).invalidate()
+
+    @property
+    def stale(self) -> bool:
+        widgets = self.bar.widgets
+        return (
+            self._dirty
+            or self._widgets is not widgets
+            or self._count != len(widgets)
+            or self._bar_background != self.bar.background
+        )
+
+    def set_visible(self, widget, visible: bool) -> None:
+        if self._visible.get(id(widget)) != visible:
+            self._visible[id(widget)] = visible
+            self.invalidate()
+
+    def build(self) -> None:
+        widgets = self.bar.widgets
+        next_background = self.bar.background
+
+        visible_widgets = {}
+        self._next = {}
+
+        # Walk the bar backwards so the next visible background is known for each widget
+        for w in reversed(widgets):
+            self._next[id(w)] = next_background
+            visible = bool(getattr(w, "length", 0))
+            visible_widgets[id(w)] = visible
+            if visible:
+                next_background = w.background or self.bar.background
+
+        self._visible = visible_widgets
+        self._widgets = widgets
+        self._count = len(widgets)
+        self._bar_background = self.bar.background
+        self._dirty = False
+        self.builds += 1
+
+    def next_background(self, widget):
+        if self.stale:
+            self.build()
+        return self._next.get(id(widget), self.bar.background)
+
+
+class _BarSurfaces:
+    """
+    Store of surfaces rendered by reference to the whole bar (e.g. by decorations
+    using ``whole_bar=True``).
+
+    Each surface is rendered once per bar geometry and shared by all widgets in the bar,
+    with widgets painting the part of the surface that they cover. Bars with the same
+    geometry (e.g. mirrored bars on identical monitors) also share surfaces.
+    """
+
+    # Surfaces are kept alive by the bars using them
+    _shared = weakref.WeakValueDictionary()  # type: weakref.WeakValueDictionary[tuple, Any]
+
+    def __init__(self):
+        self.size = (0, 0)
+        self.renders = 0
+        self._surfaces = {}  # type: dict[tuple, cairocffi.ImageSurface]
+
+    @classmethod
+    def get(cls, bar) -> _BarSurfaces:
+        """Returns the store for the bar, creating one if necessary."""
+        store = getattr(bar, "_decoration_surfaces", None)
+        if store is None:
+            store = cls()
+            bar._decoration_surfaces = store
+        return store
+
+    def get_surface(self, key: tuple, width: int, height: int, render) -> cairocffi.ImageSurface:
+        """
+        Returns the surface for ``key``. If the surface doesn't exist, it is created and
+        ``render(ctx, width, height)`` is called to draw its contents.
+        """
+        # Surfaces for an old bar size are no longer needed
+        if (width, height) != self.size:
+            self._surfaces.clear()
+            self.size = (width, height)
+
+        surface = self._surfaces.get(key)
+        if surface is None:
+            shared_key = key + (width, height)
+            surface = self._shared.get(shared_key)
+
+            if surface is None:
+                surface = cairocffi.ImageSurface(cairocffi.FORMAT_ARGB32, width, height)
+                with Context(surface) as ctx:
+                    render(ctx, width, height)
+                self._shared[shared_key] = surface
+                self.renders += 1
+
+            self._surfaces[key] = surface
+
+        return surface
+
 
 class GroupMixin:
     """
     This mixin provides some useful methods for decorations to apply grouping.
 
     However, the decoration must still apply the relevant logic when drawing.
+
+    Groups are looked up via an index which is shared by all widgets in the bar so
+    the first/last widgets in a group can be found without rescanning the bar on
+    every draw.
     """
 
     defaults = [
@@ -139,73 +497,39 @@ class GroupMixin:
         ),
     ]
 
-    def _get_parent_group(self):
-        """Finds the group of widgets containing the current widget."""
-
-        def in_same_group(w1, w2):
-            for dec in getattr(w1, "decorations", list()):
-                if dec.group and dec not in getattr(w2, "decorations", list()):
-                    return False
-
-            return True
-
-        widgets = self.parent.bar.widgets
-        grouped = self._get_grouped_widgets()
-
-        groups = []
-        current = [grouped[0]]
-
-        for w in grouped[1:]:
-            # If the next grouped widget is not adjacent to the previous grouped widget...
-            if widgets.index(w) != widgets.index(current[-1]) + 1 or not in_same_group(
-                w, current[-1]
-            ):
-                # Append the current group to the list of groups and start a new group with widget
-                groups.append(current)
-                current = [w]
-            # Otherwise, append the widget to the current group.
-            else:
-                current.append(w)
-
-        groups.append(current)
+    @property
+    def _group_index(self) -> _GroupIndex:
+        return _GroupIndex.get(self.parent.bar)
 
-        # Find the group containing the parent widget
-        parent_group = [g for g in groups if self.parent in g]
+    def _get_group(self) -> _WidgetGroup | None:
+        """Returns the group containing the current widget (if any)."""
+        return self._group_index.group_for(self.parent)
 
-        return parent_group[0]
+    def _get_parent_group(self):
+        """Finds the group of widgets containing the current widget."""
+        group = self._get_group()
+        return group.widgets if group is not None else [self.parent]
 
     def _get_grouped_widgets(self):
-        def is_grouped(widget):
-            for dec in getattr(widget, "decorations", list()):
-                if dec.group:
-                    return True
-
-            return False
-
-        widgets = self.parent.bar.widgets
-        grouped = [w for w in widgets if is_grouped(w)]
-
-        return grouped
+        return self._group_index.grouped_widgets()
 
     @property
     def parent_index(self):
-        return self.parent.bar.widgets.index(self.parent)
+        return self._group_index.position(self.parent)
 
     @property
     def is_first(self):
         if not self.group:
             return True
-        grouped = self._get_parent_group()
-        visible = [w for w in grouped if w.length > 0]
-        return visible and self.parent is visible[0]
+        group = self._get_group()
+        return group is not None and group.is_first(self.parent)
 
     @property
     def is_last(self):
         if not self.group:
             return True
-        grouped = self._get_parent_group()
-        visible = [w for w in grouped if w.length > 0]
-        return visible and self.parent is visible[-1]
+        group = self._get_group()
+        return group is not None and group.is_last(self.parent)
 
 
 class RectDecoration(_Decoration, GroupMixin):
@@ -314,6 +638,25 @@ class RectDecoration(_Decoration, GroupMixin):
         self.add_defaults(RectDecoration.defaults)
         self.corners = self.single_or_four(self.radius, "Corner radius")
 
+    def cache_key(self) -> tuple:
+        return _Decoration.cache_key(self) + (
+            self.colour,
+            self.line_colour,
+            self.line_width,
+            self.is_first,
+            self.is_last,
+        )
+
+    def draw_cached(self) -> None:
+        self.drawer.ctx.reset_clip()
+
+        _Decoration.draw_cached(self)
+
+        # Clipping can't be cached as it's applied to the widget's drawer
+        if self.clip:
+            self._draw_path(clip=True)
+            self.ctx.clip()
+
     def _draw_path(self, clip=False):
         ctx = self.ctx
         ctx.new_path()
@@ -331,7 +674,7 @@ class RectDecoration(_Decoration, GroupMixin):
             ctx.rectangle(self.padding_x, self.padding_y, box_width, box_height)
 
         else:
-            if self.group and self.parent in self.parent.bar.widgets:
+            if self.group and self._get_group() is not None:
                 corners = [0, 0, 0, 0]
 
                 if self.is_first:
@@ -422,7 +765,7 @@ class RectDecoration(_Decoration, GroupMixin):
 
     def draw(self) -> None:
         # The widget may have resized itsef so we should reset any existing clip area
-        self.drawer.ctx.reset_clip()
+        self.ctx.reset_clip()
 
         self._draw_path()
 
@@ -472,6 +815,14 @@ class BorderDecoration(_Decoration, GroupMixin):
         self.add_defaults(BorderDecoration.defaults)
         self.borders = self.single_or_four(self.border_width, "Border width")
 
+    def cache_key(self) -> tuple:
+        return _Decoration.cache_key(self) + (
+            self.colour,
+            tuple(self.borders),
+            self.is_first,
+            self.is_last,
+        )
+
     def draw(self) -> None:
         top, right, bottom, left = self.borders
 
@@ -643,6 +994,9 @@ class PowerLineDecoration(_Decoration):
         ),
     ]
 
+    # The decoration paints the whole widget so the cached surface replaces the contents
+    _cache_operator = cairocffi.OPERATOR_SOURCE
+
     # Pre-defined paths
     paths = {
         "arrow_left": [(0, 0), (1, 0.5), (0, 1)],
@@ -692,18 +1046,16 @@ class PowerLineDecoration(_Decoration):
     def parent_background(self):
         return self.override_colour or self.parent.background or self.parent.bar.background
 
+    def cache_key(self) -> tuple:
+        return _Decoration.cache_key(self) + (
+            self.parent_length,
+            self.parent_background,
+            self.override_next_colour or self.set_next_colour(),
+            self.stroke_colour,
+        )
+
     def set_next_colour(self):
-        try:
-            index = self.parent.bar.widgets.index(self.parent)
-            widgets = self.parent.bar.widgets
-            next_widget = next(
-                w
-                for w in widgets
-                if hasattr(w, "length") and w.length and widgets.index(w) > index
-            )
-            return next_widget.background or self.parent.bar.background
-        except (ValueError, IndexError, StopIteration):
-            return self.parent.bar.background
+        return _NeighbourMap.get(self.parent.bar).next_background(self.parent)
 
     def paint_background(self, background, foreground):
         """
@@ -724,7 +1076,7 @@ class PowerLineDecoration(_Decoration):
             self.ctx.fill()
 
             # We then need to clear the part that will be covered by the decoration
-            self.drawer.clear_rect(
+            self.clear_rect(
                 0, self.padding_y, self.parent.length, self.parent.bar.height - 2 * self.padding_y
             )
 
@@ -939,6 +1291,63 @@ class GradientDecoration(_Decoration):
         elif len(self.offsets) != len(self.colours):
             raise ConfigError("'offsets' must be same length as 'colours'.")
 
+        self._gradient = None  # type: cairocffi.Gradient | None
+        self._gradient_key = None  # type: tuple | None
+
+    def cache_key(self) -> tuple:
+        key = _Decoration.cache_key(self) + (tuple(self.colours), tuple(self.offsets))
+        if self.whole_bar:
+            key += (
+                self.parent.offsetx,
+                self.parent.offsety,
+                self.parent.bar.width,
+                self.parent.bar.height,
+            )
+        return key
+
+    @property
+    def _surface_key(self) -> tuple:
+        return (
+            "gradient",
+            tuple(self.colours),
+            tuple(self.offsets),
+            tuple(tuple(p) for p in self.points),
+            self.radial,
+        )
+
+    def _get_gradient(self, width, height):
+        key = self._surface_key + (width, height)
+        if self._gradient is not None and key == self._gradient_key:
+            return self._gradient
+
+        # Calculates absolute coordinates for gradient
+        def pos(point):
+            return tuple(p * d for p, d in zip(point, (width, height)))
+
+        if self.radial:
+            gradient = cairocffi.RadialGradient(0, 0, 0, 0, 0, HALF_ROOT_2)
+        else:
+            gradient = cairocffi.LinearGradient(*pos(self.points[0]), *pos(self.points[1]))
+
+        for offset, c in zip(self.offsets, self.colours):
+            gradient.add_color_stop_rgba(offset, *rgb(c))
+
+        self._gradient = gradient
+        self._gradient_key = key
+        return gradient
+
+    def _paint_gradient(self, ctx, width, height):
+        gradient = self._get_gradient(width, height)
+
+        ctx.save()
+        if self.radial:
+            ctx.translate(width // 2, height // 2)
+            ctx.scale(width, height)
+
+        ctx.set_source(gradient)
+        ctx.paint()
+        ctx.restore()
+
     def draw(self):
         width = self.parent.bar.width if self.whole_bar else self.width
         height = self.parent.bar.height if self.whole_bar else self.height
@@ -947,30 +1356,21 @@ class GradientDecoration(_Decoration):
         if not (width and height):
             return
 
-        # Calculates absolute coordinates for gradient
-        def pos(point):
-            return tuple(p * d for p, d in zip(point, (width, height)))
-
         self.ctx.save()
         self.ctx.rectangle(0, 0, self.width, self.height)
         self.ctx.clip()
 
-        # If we're using whole_bar then we shift 0, 0 to be top left corner of the bar
+        # If we're using whole_bar then the gradient is rendered once for the bar and
+        # we paint the part covered by this widget
         if self.whole_bar:
-            self.ctx.translate(-self.parent.offsetx, -self.parent.offsety)
-
-        if self.radial:
-            self.ctx.translate(width // 2, height // 2)
-            self.ctx.scale(width, height)
-            gradient = cairocffi.RadialGradient(0, 0, 0, 0, 0, HALF_ROOT_2)
+            surface = _BarSurfaces.get(self.parent.bar).get_surface(
+                self._surface_key, width, height, self._paint_gradient
+            )
+            self.ctx.set_source_surface(surface, -self.parent.offsetx, -self.parent.offsety)
+            self.ctx.paint()
         else:
-            gradient = cairocffi.LinearGradient(*pos(self.points[0]), *pos(self.points[1]))
+            self._paint_gradient(self.ctx, width, height)
 
-        for offset, c in zip(self.offsets, self.colours):
-            gradient.add_color_stop_rgba(offset, *rgb(c))
-
-        self.ctx.set_source(gradient)
-        self.ctx.paint()
         self.ctx.restore()
 
 
@@ -1024,32 +1424,73 @@ class ImageDecoration(_Decoration):
         self._xoffset = 0
         self._yoffset = 0
 
-    def _get_image(self, width, height):
-        if self._surface and self._old_width == width and self._old_height == height:
-            return self._surface
+    def cache_key(self) -> tuple:
+        key = _Decoration.cache_key(self)
+        if self.whole_bar:
+            key += (
+                self.parent.offsetx,
+                self.parent.offsety,
+                self.parent.bar.width,
+                self.parent.bar.height,
+            )
+        return key
+
+    @property
+    def _surface_key(self) -> tuple:
+        return (
+            "image",
+            self._image.as_posix(),
+            self.fill,
+            self.preserve_aspect_ratio,
+            self.center,
+        )
 
-        image = Img.from_path(self._image.as_posix())
+    def _load_image(self, width, height):
+        image = image_cache.load(self._image.as_posix())
+        if image is None:
+            return None
 
         if self.fill:
             if self.preserve_aspect_ratio:
                 if image.width / image.height > width / height:
-                    image.resize(height=height)
+                    image = image_cache.load(self._image.as_posix(), height=height)
                 elif image.width / image.height < width / height:
-                    image.resize(width=width)
+                    image = image_cache.load(self._image.as_posix(), width=width)
                 else:
-                    image.resize(width=width, height=height)
+                    image = image_cache.load(self._image.as_posix(), width=width, height=height)
             else:
-                image.resize(width=width, height=height)
+                image = image_cache.load(self._image.as_posix(), width=width, height=height)
+
+        if image is None:
+            return None
 
         self._xoffset = ((width - image.width) // 2) if self.center else 0
         self._yoffset = ((height - image.height) // 2) if self.center else 0
 
+        return image.pattern
+
+    def _get_image(self, width, height):
+        if self._surface and self._old_width == width and self._old_height == height:
+            return self._surface
+
         self._old_width = width
         self._old_height = height
 
-        self._surface = image.pattern
+        self._surface = self._load_image(width, height)
         return self._surface
 
+    def _paint_image(self, ctx, width, height):
+        # We don't keep a copy of the image as the rendered bar surface is shared
+        image = self._load_image(width, height)
+        if image is None:
+            return
+
+        ctx.save()
+        ctx.translate(self._xoffset, self._yoffset)
+        ctx.set_source(image)
+        ctx.paint()
+        ctx.restore()
+
     def draw(self):
         width = self.parent.bar.width if self.whole_bar else self.width
         height = self.parent.bar.height if self.whole_bar else self.height
@@ -1058,21 +1499,30 @@ class ImageDecoration(_Decoration):
         if not (width and height):
             return
 
-        image = self._get_image(width, height)
-
         self.ctx.save()
         self.ctx.rectangle(0, 0, self.width, self.height)
         self.ctx.clip()
 
-        # If we're using whole_bar then we shift 0, 0 to be top left corner of the bar
+        # If we're using whole_bar then the image is rendered once for the bar and
+        # we paint the part covered by this widget
         if self.whole_bar:
-            self.ctx.translate(-self.parent.offsetx, -self.parent.offsety)
+            surface = _BarSurfaces.get(self.parent.bar).get_surface(
+                self._surface_key, width, height, self._paint_image
+            )
+            self.ctx.set_source_surface(surface, -self.parent.offsetx, -self.parent.offsety)
+            self.ctx.paint()
+        else:
+            image = self._get_image(width, height)
+            if image is None:
+                self.ctx.restore()
+                return
 
-        # Translate the image to position correctly for resizing/centering
-        self.ctx.translate(self._xoffset, self._yoffset)
+            # Translate the image to position correctly for resizing/centering
+            self.ctx.translate(self._xoffset, self._yoffset)
+
+            self.ctx.set_source(image)
+            self.ctx.paint()
 
-        self.ctx.set_source(image)
-        self.ctx.paint()
         self.ctx.restore()
 
 
@@ -1091,7 +1541,11 @@ def inject_decorations(classdef):
 
         # Draw the decorations
         for decoration in self.decorations:
-            decoration.draw()
+            draw = decoration.draw_cached if decoration.cache else decoration.draw
+            if profiler.enabled:
+                profiler.call(self, f"decoration.{decoration.__class__.__name__}", draw)
+            else:
+                draw()
 
     def configure_decorations(self):
         if not hasattr(self, "use_bar_background"):
@@ -1110,6 +1564,17 @@ def inject_decorations(classdef):
             for dec in self.decorations:
                 dec._configure(self)
 
+            # Widgets in the bar may have changed so the grouping needs to be recalculated
+            index = _GroupIndex.get(self.bar)
+            index.invalidate()
+            self._decoration_group_index = index if _GroupIndex.is_grouped(self) else None
+
+            self._decoration_neighbours = _NeighbourMap.get(self.bar)
+            self._decoration_neighbours.invalidate()
+
+            self._compositor = BarCompositor.get(self.bar)
+            self._compositor.attach()
+
             self._pre_clear = self.drawer.clear
             self.drawer.clear = self.new_clear
 
@@ -1144,9 +1609,19 @@ def inject_decorations(classdef):
             # If the widget doesn't have the decorations attribute then we use an empty list
             # max will error with an empty list so the `default` value is returned in this scenario
             extra = max((x._extrawidth for x in getattr(self, "decorations", list())), default=0)
-            return length + extra
+            length += extra
+
+        # Let the bar's group index know if a grouped widget has been hidden or shown
+        index = getattr(self, "_decoration_group_index", None)
+        if index is not None:
+            index.set_visible(self, length > 0)
 
-        return 0
+        # Powerline decorations also need to know if the widget has been hidden or shown
+        neighbours = getattr(self, "_decoration_neighbours", None)
+        if neighbours is not None:
+            neighbours.set_visible(self, length > 0)
+
+        return length
 
     def length_set(self, value):
         # Stretch widgets have their length set by the bar.
@@ -1158,6 +1633,32 @@ def inject_decorations(classdef):
         else:
             self._length = value
 
+    def background_get(self):
+        if "_widget_background" not in self.__dict__:
+            # Background hasn't been set on the instance so we look up the configured value
+            _, self._widget_background = self._find_default("background")
+        return self._widget_background
+
+    def background_set(self, value):
+        self._widget_background = value
+
+        # Powerline decorations use the background of adjacent widgets
+        neighbours = getattr(self, "_decoration_neighbours", None)
+        if neighbours is not None:
+            neighbours.invalidate()
+
+    @expose_command()
+    def widget_stats(self, all_widgets=False):
+        """
+        Returns render times for the widget (or for all widgets if ``all_widgets`` is
+        ``True``).
+
+        Stats are only collected when the profiler is enabled.
+        """
+        if all_widgets:
+            return profiler.stats()
+        return profiler.widget_stats(self)
+
     def create_mirror(self):
         if isinstance(self, Systray):
             return super().create_mirror()
@@ -1173,6 +1674,20 @@ def inject_decorations(classdef):
         classdef._configure = new_configure
         classdef.create_mirror = create_mirror
         classdef.length = property(length_get, length_set)
+        classdef.background = property(background_get, background_set)
+
+        classdef.widget_stats = widget_stats
+
+        # Record render times when the profiler is enabled
+        if not getattr(classdef.draw, "_profiled", False):
+            classdef.draw = profiled("draw")(classdef.draw)
+        calculate_length = getattr(classdef, "calculate_length", None)
+        if calculate_length is not None and not getattr(calculate_length, "_profiled", False):
+            classdef.calculate_length = profiled("calculate_length")(calculate_length)
+
+        # Allows the bar to skip repainting widgets that haven't changed
+        if not getattr(classdef.draw, "_composited", False):
+            classdef.draw = composited(classdef.draw)
 
         classdef.defaults.append(("decorations", [], "Decorations for widgets"))
 
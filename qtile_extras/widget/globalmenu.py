@@ -28,13 +28,13 @@ from libqtile.widget import base
 
 from qtile_extras.resources.dbusmenu import DBusMenu
 from qtile_extras.resources.global_menu import registrar
-from qtile_extras.widget.mixins import DbusMenuMixin
+from qtile_extras.widget.mixins import DbusMenuMixin, HookCoalescingMixin
 
 if TYPE_CHECKING:
     from typing import Any  # noqa: F401
 
 
-class GlobalMenu(base._TextBox, DbusMenuMixin):
+class GlobalMenu(base._TextBox, DbusMenuMixin, HookCoalescingMixin):
     """
     A widget to display a Global Menu (File Edit etc.) in your bar.
 
@@ -56,8 +56,10 @@ class GlobalMenu(base._TextBox, DbusMenuMixin):
     def __init__(self, **config):
         base._TextBox.__init__(self, **config)
         self.add_defaults(DbusMenuMixin.defaults)
+        self.add_defaults(HookCoalescingMixin.defaults)
         self.add_defaults(GlobalMenu.defaults)
         DbusMenuMixin.__init__(self, **config)
+        HookCoalescingMixin.__init__(self, **config)
         self.root = None
         self.items = []
         self.app_menus = {}
@@ -86,11 +88,11 @@ class GlobalMenu(base._TextBox, DbusMenuMixin):
             create_task(self.get_window_menu(wid))
 
     def set_hooks(self):
-        hook.subscribe.focus_change(self.hook_response)
+        hook.subscribe.focus_change(self.coalesce_hook)
         hook.subscribe.client_killed(self.client_killed)
 
     def clear_hooks(self):
-        hook.unsubscribe.focus_change(self.hook_response)
+        hook.unsubscribe.focus_change(self.coalesce_hook)
         hook.unsubscribe.client_killed(self.client_killed)
 
     def hook_response(self, *args, startup=False):
@@ -104,6 +106,9 @@ class GlobalMenu(base._TextBox, DbusMenuMixin):
         elif not startup:
             self.clear()
 
+    def hooks_fired(self):
+        self.hook_response()
+
     def client_killed(self, client):
         wid = client.wid
         pid = client.get_pid()
@@ -234,4 +239,5 @@ class GlobalMenu(base._TextBox, DbusMenuMixin):
             menu.stop()
         self.app_menus.clear()
         self.clear_hooks()
+        self.cancel_coalesced_hooks()
         base._TextBox.finalize(self)
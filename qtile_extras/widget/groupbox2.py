@@ -23,30 +23,28 @@ import itertools
 import math
 from copy import deepcopy
 from enum import Flag, auto
-from pathlib import Path
 from typing import TYPE_CHECKING
 
-from cairocffi.pixbuf import ImageLoadingError
 from libqtile import bar, hook
-from libqtile.images import Img
 from libqtile.log_utils import logger
 from libqtile.scratchpad import ScratchPad
 from libqtile.utils import describe_attributes
 from libqtile.widget import base
 
+from qtile_extras.images import image_cache
+from qtile_extras.widget.mixins import DirtyTrackingMixin, HookCoalescingMixin
+
 if TYPE_CHECKING:
     from collections.abc import Callable
     from typing import Any, Literal
 
+    from qtile_extras.images import Img
+
 
 ColorType = str | tuple[int, int, int] | tuple[int, int, int, float]
 ColorsType = ColorType | list[ColorType]
 
 
-IMAGE_CACHE: dict[str, Img] = {}
-BAD_IMAGES: list[str] = []
-
-
 class Sentinel:
     """
     Custom class that is "falsey" for boolean logic purposes and returns
@@ -246,6 +244,69 @@ class GroupBoxRule:
         return self
 
 
+class GroupBoxRuleTable:
+    """
+    Lookup table of rule formats for each state of a group.
+
+    Rules which only depend on the group's state (screen, focus, occupancy, urgency) and
+    name are matched once per state and their formats merged in order of precedence.
+    Rules with a ``func`` or which are always checked are kept in their place in the
+    list and are matched each time the box's formats are set.
+    """
+
+    def __init__(self, rules: list[GroupBoxRule]):
+        self.rules = rules
+        self.always_check = any(rule.always_check for rule in rules)
+        self.compiles = 0
+        self._table: dict[tuple, list[dict[str, Any] | int]] = {}
+
+    @staticmethod
+    def is_dynamic(rule: GroupBoxRule) -> bool:
+        return bool(rule.func) or rule.always_check
+
+    def lookup(self, box: Box) -> list[dict[str, Any] | int]:
+        """
+        Returns the steps needed to format the box. A step is either a dict of merged
+        formats from matching rules or the index of a rule that must be checked.
+        """
+        key = (box.screen, box.focused, box.occupied, box.urgent, box.group.name)
+        steps = self._table.get(key)
+        if steps is None:
+            steps = self._compile(box)
+            self._table[key] = steps
+        return steps
+
+    def _compile(self, box: Box) -> list[dict[str, Any] | int]:
+        self.compiles += 1
+        steps: list[dict[str, Any] | int] = []
+        merged: dict[str, Any] | None = None
+
+        for index, rule in enumerate(self.rules):
+            if self.is_dynamic(rule):
+                if merged is not None:
+                    steps.append(merged)
+                    merged = None
+                steps.append(index)
+                continue
+
+            if not rule.match(box):
+                continue
+
+            if merged is None:
+                merged = {}
+
+            # Earlier rules have precedence over later ones
+            for attr in GroupBoxRule.attrs:
+                value = getattr(rule, attr)
+                if attr not in merged and value is not SENTINEL:
+                    merged[attr] = value
+
+        if merged is not None:
+            steps.append(merged)
+
+        return steps
+
+
 class Box:
     # Attributes loaded dynamically from widget
     font: str
@@ -255,6 +316,7 @@ class Box:
     padding_x: int
     padding_y: int
     rules: list[GroupBoxRule]
+    rule_table: GroupBoxRuleTable
     margin_x: int
     margin_y: int
 
@@ -286,6 +348,11 @@ class Box:
         for k, v in config.items():
             setattr(self, k, v)
         self.rules = [rule.clone() for rule in self.rules]
+        self.layout_updates = 0
+        self._images: dict[tuple[str, bool], Img | None] = {}
+        self._layout_key: tuple | None = None
+        self._size_key: tuple | None = None
+        self._size = 0
         self.layout = self.drawer.textlayout(
             "",
             "ffffff",
@@ -297,11 +364,9 @@ class Box:
         self._reset_format()
         self._prepare()
 
-    def _prepare(self):
-        """
-        Checks the current state of the group and decides whether rules need to be
-        run or not.
-        """
+    @property
+    def state(self) -> tuple[ScreenRule, bool, bool, bool]:
+        """The screen, focus, occupancy and urgency of the group."""
         if self.group.screen is self.bar.screen:
             screen = ScreenRule.THIS
         elif self.group.screen:
@@ -313,12 +378,21 @@ class Box:
         occupied = bool(self.group.windows)
         urgent = any(w.urgent for w in self.group.windows)
 
+        return screen, focused, occupied, urgent
+
+    def _prepare(self):
+        """
+        Checks the current state of the group and decides whether rules need to be
+        run or not.
+        """
+        screen, focused, occupied, urgent = self.state
+
         if (screen, focused, occupied, urgent) == (
             self.screen,
             self.focused,
             self.occupied,
             self.urgent,
-        ) and not any(rule.always_check for rule in self.rules):
+        ) and not self.rule_table.always_check:
             # Nothing has changed so we don't need to rerun rules
             return
 
@@ -334,11 +408,22 @@ class Box:
         # Clear formatting
         self._reset_format()
 
-        # Get matching rules
-        rules = [rule for rule in self.rules if rule.match(self)]
+        # Apply rule formatting with earlier rules having precedence over later ones.
+        # Formats from rules that don't need to be checked dynamically have already been
+        # merged by the rule table.
+        matched = False
+        for step in self.rule_table.lookup(self):
+            if isinstance(step, int):
+                rule = self.rules[step]
+                if not rule.match(self):
+                    continue
+                self._update_format(rule)
+            else:
+                self._merge_format(step)
+            matched = True
 
         # Warn user if no rules match.
-        if not rules:
+        if not matched:
             attrs = ["screen", "focused", "occupied", "urgent"]
             logger.error(
                 "No matching groupboxrule for condition: %s",
@@ -346,10 +431,6 @@ class Box:
             )
             # Widget will fall back to white text.
 
-        # Apply rule formatting with earlier rules having precedence over later ones
-        for rule in rules:
-            self._update_format(rule)
-
         if not self.text_colour:
             self.text_colour = "ffffff"
 
@@ -371,48 +452,30 @@ class Box:
 
     def _load_image(self, filename: str, scale=True) -> bool:
         """
-        Loads an image file into an ``Img`` object and stores in a cache
-        to prevent image being loaded multiple times.
+        Loads an image file into an ``Img`` object. Images are loaded via the shared
+        image cache so each file is only decoded once for each size.
         """
-        # Image is in cache already so nothing further needed here
-        if filename in IMAGE_CACHE:
-            return True
-
-        # We already know this is a bad file so we stop here
-        if filename in BAD_IMAGES:
-            return False
+        return self.get_image(filename, scale) is not None
 
-        path = Path(filename).expanduser()
-
-        if not path.exists() and path.is_file():
-            # We store bad filenames in the ``BAD_IMAGES`` list so there's only
-            # one warning the first time we try to load a non-existent file.
-            logger.warning("Image file does not exist: %s", path.as_posix())
-            BAD_IMAGES.append(filename)
-            return False
-
-        try:
-            img = Img.from_path(path.as_posix())
-        except ImageLoadingError:
-            logger.warning("Image file cannot be opened: %s.", path.as_posix())
-            BAD_IMAGES.append(filename)
-            return False
-
-        if scale:
-            if self.horizontal:
-                img.resize(height=self.bar.height - 2 * self.margin_y)
+    def get_image(self, filename: str, scale=True) -> Img | None:
+        """Tries to load image from cache and return ``Img`` instance."""
+        key = (filename, scale)
+        if key not in self._images:
+            size: dict[str, int]
+            if not scale:
+                size = {}
+            elif self.horizontal:
+                size = {"height": self.bar.height - 2 * self.margin_y}
             else:
-                img.resize(width=self.bar.width - 2 * self.margin_x)
-        IMAGE_CACHE[filename] = img
+                size = {"width": self.bar.width - 2 * self.margin_x}
 
-        return True
+            img = image_cache.load(filename, **size)
+            if img is None:
+                logger.warning("Image file cannot be opened: %s.", filename)
 
-    def get_image(self, filename: str, scale=True) -> Img | None:
-        """Tries to load image from cache and return ``Img`` instance."""
-        if filename in IMAGE_CACHE or self._load_image(filename, scale):
-            return IMAGE_CACHE[filename]
+            self._images[key] = img
 
-        return None
+        return self._images[key]
 
     @property
     def rule_attrs(self) -> list[str]:
@@ -437,33 +500,69 @@ class Box:
             if getattr(self, attr) is SENTINEL and getattr(rule, attr) is not SENTINEL:
                 setattr(self, attr, getattr(rule, attr))
 
-    @property
-    def size(self) -> int:
-        """Returns the size of the box."""
-        self._prepare()
+    def _merge_format(self, formats: dict[str, Any]) -> None:
+        """Updates box formatting attributes from merged rule formats."""
+        for attr, value in formats.items():
+            if getattr(self, attr) is SENTINEL:
+                setattr(self, attr, value)
+
+    def _update_layout(self) -> None:
+        """Updates the text layout if the text or the available space has changed."""
+        key = (self.text, self.horizontal, self.bar.width)
+        if key == self._layout_key:
+            return
+
+        self.layout_updates += 1
         self.layout.reset_width()
         self.layout.text = self.text
 
         if not self.horizontal:
             self.layout.width = self.bar.width
 
+        self._layout_key = key
+
+    def _calculate_size(self) -> int:
         if self.visible is False:
             return 0
 
         if self.box_size:
             return self.box_size
 
-        elif self.image and self.image in IMAGE_CACHE:
+        elif self.image and (img := self.get_image(self.image)) is not None:
             if self.horizontal:
-                return IMAGE_CACHE[self.image].width + 2 * self.margin_x
+                return img.width + 2 * self.margin_x
             else:
-                return IMAGE_CACHE[self.image].height + 2 * self.margin_y
+                return img.height + 2 * self.margin_y
 
         if self.horizontal:
             return self.layout.width + 2 * self.padding_x
         else:
             return self.layout.height + 2 * self.padding_y
 
+    @property
+    def size(self) -> int:
+        """Returns the size of the box."""
+        self._prepare()
+        self._update_layout()
+
+        # The size is only recalculated when the layout or a format affecting the size
+        # has changed
+        key = (
+            self._layout_key,
+            self.visible,
+            self.box_size,
+            self.image,
+            self.padding_x,
+            self.padding_y,
+            self.margin_x,
+            self.margin_y,
+        )
+        if key != self._size_key:
+            self._size = self._calculate_size()
+            self._size_key = key
+
+        return self._size
+
     @property
     def bottom(self):
         return self.bar.height if self.horizontal else self.size
@@ -621,7 +720,13 @@ class Box:
         self.drawer.ctx.restore()
 
 
-class GroupBox2(base._Widget, base.MarginMixin, base.PaddingMixin):
+class GroupBox2(
+    base._Widget,
+    base.MarginMixin,
+    base.PaddingMixin,
+    DirtyTrackingMixin,
+    HookCoalescingMixin,
+):
     """
     Formatting of the group box is determined by applying user-defined rules to each group.
 
@@ -908,8 +1013,11 @@ class GroupBox2(base._Widget, base.MarginMixin, base.PaddingMixin):
         base._Widget.__init__(self, length=bar.CALCULATED, **config)
         self.add_defaults(base.MarginMixin.defaults)
         self.add_defaults(base.PaddingMixin.defaults)
+        self.add_defaults(HookCoalescingMixin.defaults)
         self.add_defaults(GroupBox2.defaults)
+        HookCoalescingMixin.__init__(self)
         self._box_config = {}
+        self._drawn_states: list[tuple] = []
 
         default_callbacks = {"Button1": self.select_group}
         if self.use_mouse_wheel:
@@ -928,28 +1036,40 @@ class GroupBox2(base._Widget, base.MarginMixin, base.PaddingMixin):
             Box(group, index, bar, qtile, self.drawer, self.box_config)
             for index, group in enumerate(self.groups)
         ]
+
+        # Rules that are always checked can change the widget's contents whenever it's
+        # drawn so the widget must be repainted every time the bar is drawn
+        self._always_check = any(rule.always_check for rule in self.rules)
+        self._qte_dirty_tracking = not self._always_check
+
         self.setup_hooks()
 
     def setup_hooks(self):
-        hook.subscribe.client_managed(self._hook_response)
-        hook.subscribe.client_urgent_hint_changed(self._hook_response)
-        hook.subscribe.client_killed(self._hook_response)
-        hook.subscribe.setgroup(self._hook_response)
-        hook.subscribe.group_window_add(self._hook_response)
-        hook.subscribe.current_screen_change(self._hook_response)
-        hook.subscribe.changegroup(self._hook_response)
+        hook.subscribe.client_managed(self.coalesce_hook)
+        hook.subscribe.client_urgent_hint_changed(self.coalesce_hook)
+        hook.subscribe.client_killed(self.coalesce_hook)
+        hook.subscribe.setgroup(self.coalesce_hook)
+        hook.subscribe.group_window_add(self.coalesce_hook)
+        hook.subscribe.current_screen_change(self.coalesce_hook)
+        hook.subscribe.changegroup(self.coalesce_hook)
 
     def remove_hooks(self):
-        hook.unsubscribe.client_managed(self._hook_response)
-        hook.unsubscribe.client_urgent_hint_changed(self._hook_response)
-        hook.unsubscribe.client_killed(self._hook_response)
-        hook.unsubscribe.setgroup(self._hook_response)
-        hook.unsubscribe.group_window_add(self._hook_response)
-        hook.unsubscribe.current_screen_change(self._hook_response)
-        hook.unsubscribe.changegroup(self._hook_response)
-
-    def _hook_response(self, *args, **kwargs):
-        self.bar.draw()
+        hook.unsubscribe.client_managed(self.coalesce_hook)
+        hook.unsubscribe.client_urgent_hint_changed(self.coalesce_hook)
+        hook.unsubscribe.client_killed(self.coalesce_hook)
+        hook.unsubscribe.setgroup(self.coalesce_hook)
+        hook.unsubscribe.group_window_add(self.coalesce_hook)
+        hook.unsubscribe.current_screen_change(self.coalesce_hook)
+        hook.unsubscribe.changegroup(self.coalesce_hook)
+
+    def _box_states(self) -> list[tuple]:
+        return [(box.state, box.group.label) for box in self.boxes]
+
+    def hooks_fired(self):
+        # Several hooks can be fired by a single event (e.g. opening a window) so these
+        # are combined and the bar is only redrawn if a group has changed.
+        if self._always_check or self._box_states() != self._drawn_states:
+            self.redraw_bar()
 
     def calculate_length(self):
         return sum(box.size for box in self.boxes)
@@ -983,10 +1103,12 @@ class GroupBox2(base._Widget, base.MarginMixin, base.PaddingMixin):
             "margin_y",
         ]
         self._box_config = {k: getattr(self, k) for k in config_vars}
+        self._box_config["rule_table"] = GroupBoxRuleTable(self.rules)
 
         return self._box_config
 
     def draw(self):
+        self._drawn_states = self._box_states()
         self.drawer.clear(self.background or self.bar.background)
         offset = 0
         for box in self.boxes:
@@ -1044,6 +1166,7 @@ class GroupBox2(base._Widget, base.MarginMixin, base.PaddingMixin):
 
     def finalize(self):
         self.remove_hooks()
+        self.cancel_coalesced_hooks()
         base._Widget.finalize(self)
 
     def info(self):
@@ -27,7 +27,7 @@ from libqtile.widget import base
 from qtile_extras import hook
 from qtile_extras.popup.toolkit import PopupRelativeLayout, PopupText
 from qtile_extras.resources.footballscores import FootballMatch, FSConnectionError, League
-from qtile_extras.widget.mixins import ExtendedPopupMixin, MenuMixin
+from qtile_extras.widget.mixins import DirtyTrackingMixin, ExtendedPopupMixin, MenuMixin
 
 if TYPE_CHECKING:
     from typing import Any  # noqa: F401
@@ -122,7 +122,9 @@ class MatchFlags:
         self._reset()
 
 
-class LiveFootballScores(base._Widget, base.MarginMixin, ExtendedPopupMixin, MenuMixin):
+class LiveFootballScores(
+    base._Widget, base.MarginMixin, ExtendedPopupMixin, MenuMixin, DirtyTrackingMixin
+):
     """
     The module uses a module I wrote a number of years ago that parses
     data from the BBC Sport website.
@@ -446,7 +448,7 @@ class LiveFootballScores(base._Widget, base.MarginMixin, ExtendedPopupMixin, Men
         if self.queue_timer:
             self.queue_timer.cancel()
 
-        self.queue_timer = self.timeout_add(self._queue_time, self.bar.draw)
+        self.queue_timer = self.timeout_add(self._queue_time, self.redraw_bar)
 
     def get_match(self):
         if self.match_index >= len(self.matches):
@@ -557,7 +559,7 @@ class LiveFootballScores(base._Widget, base.MarginMixin, ExtendedPopupMixin, Men
         """Show text info on match."""
         self.set_default_timer()
         self.screen_index = (self.screen_index + step) % len(self.screens)
-        self.bar.draw()
+        self.redraw_bar()
 
     def scroll_up(self):
         """Move to next match."""
@@ -571,7 +573,7 @@ class LiveFootballScores(base._Widget, base.MarginMixin, ExtendedPopupMixin, Men
         self.screen_index = 0
         if self.matches:
             self.match_index = (self.match_index + step) % len(self.matches)
-            self.bar.draw()
+            self.redraw_bar()
 
     def set_default_timer(self):
         if self.default_timer:
@@ -582,7 +584,7 @@ class LiveFootballScores(base._Widget, base.MarginMixin, ExtendedPopupMixin, Men
     def show_default(self):
         # Show first screen
         self.screen_index = 0
-        self.bar.draw()
+        self.redraw_bar()
 
     @expose_command()
     def info(self):
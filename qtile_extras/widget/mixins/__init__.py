@@ -28,9 +28,9 @@ from typing import TYPE_CHECKING
 from libqtile.command.base import expose_command
 from libqtile.configurable import Configurable, ExtraFallback
 from libqtile.log_utils import logger
-from libqtile.popup import Popup
 
 from qtile_extras.popup.menu import PopupMenu, PopupMenuItem, PopupMenuSeparator
+from qtile_extras.popup.pool import popup_pool
 from qtile_extras.resources.dbusmenu import DBusMenuItem
 
 if TYPE_CHECKING:
@@ -107,7 +107,7 @@ class TooltipMixin(_BaseMixin):
                 logger.warning("Invalid tooltip padding. Defaulting to [4, 4]")
                 self._tooltip_padding = [4, 4]
 
-        self._tooltip = Popup(
+        self._tooltip = popup_pool.acquire(
             self.qtile,
             font=self.tooltip_font,
             fontsize=self.tooltip_fontsize,
@@ -174,8 +174,7 @@ class TooltipMixin(_BaseMixin):
 
         else:
             if self._tooltip is not None:
-                self._tooltip.hide()
-                self._tooltip.kill()
+                popup_pool.release(self._tooltip)
                 self._tooltip = None
             self._tooltip_timer = None
 
@@ -224,6 +223,11 @@ class MenuMixin(Configurable, _BaseMixin):
             ),
         ),
         ("menu_width", 200, "Context menu width"),
+        (
+            "menu_max_rows",
+            0,
+            "Maximum number of menu rows to display (0 = no limit). Longer menus scroll.",
+        ),
         ("show_menu_icons", True, "Show icons in context menu"),
         ("hide_after", 0.5, "Time in seconds before hiding menu atfer mouse leave"),
         ("opacity", 1, "Menu opacity"),
@@ -246,6 +250,7 @@ class MenuMixin(Configurable, _BaseMixin):
             "highlight_radius": self.highlight_radius,
             "row_height": self.menu_row_height,
             "menu_width": self.menu_width,
+            "max_rows": self.menu_max_rows,
             "show_menu_icons": self.show_menu_icons,
             "hide_after": self.hide_after,
             "opacity": self.opacity,
@@ -440,7 +445,10 @@ class ExtendedPopupMixin(_BaseMixin):
     def show_popup(self):
         """Method to display the popup."""
         if not self.has_popup:
-            self.extended_popup = deepcopy(self.popup_layout)
+            # The template is copied once per widget. Closed popups are reopened so their
+            # controls keep their text layouts and scaled images.
+            if self.extended_popup is None:
+                self.extended_popup = deepcopy(self.popup_layout)
             self.extended_popup._configure(self.qtile)
 
         self.update_popup()
@@ -455,6 +463,83 @@ class ExtendedPopupMixin(_BaseMixin):
             self.show_popup()
 
 
+class DirtyTrackingMixin(_BaseMixin):
+    """
+    Mixin for widgets which keep track of when their contents change.
+
+    When the bar is redrawn, widgets using this mixin are only repainted if
+    they have moved, been resized or been marked as dirty. Widgets must
+    therefore call ``self.mark_dirty()`` whenever their contents change and
+    they are relying on the bar to redraw them. ``self.redraw_bar()`` can be
+    used to mark the widget as dirty and redraw the bar.
+
+    Widgets that redraw themselves (e.g. by calling ``self.draw()``) do not
+    need to mark themselves as dirty.
+    """
+
+    _qte_dirty_tracking = True
+
+    def mark_dirty(self):
+        compositor = getattr(self, "_compositor", None)
+        if compositor is not None:
+            compositor.mark_dirty(self)
+
+    def redraw_bar(self):
+        self.mark_dirty()
+        self.bar.draw()
+
+
+class HookCoalescingMixin(_BaseMixin):
+    """
+    Mixin for widgets which update in response to several qtile hooks.
+
+    Hooks often fire in quick succession (e.g. opening a window fires ``client_managed``,
+    ``group_window_add`` and possibly ``changegroup``). Widgets can subscribe
+    ``self.coalesce_hook`` to these hooks so that all hooks fired within the same
+    iteration of the event loop (or within ``hook_coalesce_interval`` seconds, if set)
+    result in a single call to ``self.hooks_fired()``.
+
+    ``self.hooks_fired()`` redraws the bar by default. Widgets can override this to
+    update their contents or to skip redrawing when nothing has changed.
+    """
+
+    defaults = [
+        (
+            "hook_coalesce_interval",
+            0,
+            "Time (in seconds) to wait for further hooks before updating the widget. "
+            "If 0, hooks fired in the same iteration of the event loop are combined.",
+        ),
+    ]  # type: list[tuple[str, Any, str]]
+
+    def __init__(self, **kwargs):
+        self._hook_timer = None
+
+    def coalesce_hook(self, *args, **kwargs):
+        """Schedules a call to ``self.hooks_fired()`` if one is not already pending."""
+        if self._hook_timer is not None:
+            return
+
+        if self.hook_coalesce_interval:
+            self._hook_timer = self.timeout_add(
+                self.hook_coalesce_interval, self._run_coalesced_hooks
+            )
+        else:
+            self._hook_timer = self.qtile.call_soon(self._run_coalesced_hooks)
+
+    def _run_coalesced_hooks(self):
+        self._hook_timer = None
+        self.hooks_fired()
+
+    def cancel_coalesced_hooks(self):
+        if self._hook_timer is not None:
+            self._hook_timer.cancel()
+            self._hook_timer = None
+
+    def hooks_fired(self):
+        self.bar.draw()
+
+
 class ProgressBarMixin(_BaseMixin):
     """
     Mixin to allow widgets to display progress bars.
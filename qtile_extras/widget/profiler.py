@@ -0,0 +1,199 @@
+# Copyright (c) 2026 elParaguayo
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+from __future__ import annotations
+
+import sys
+import weakref
+from collections import deque
+from functools import wraps
+from time import perf_counter
+
+from libqtile.log_utils import logger
+
+# Number of recent samples kept for each timer when calculating percentiles
+SAMPLE_SIZE = 500
+
+
+class _Histogram:
+    """Render times (in milliseconds) for a single method of a single widget."""
+
+    def __init__(self):
+        self.count = 0
+        self.max = 0.0
+        self.total = 0.0
+        self.allocations = 0
+        self.samples = deque(maxlen=SAMPLE_SIZE)  # type: deque[float]
+
+    def add(self, elapsed: float, allocations: int) -> None:
+        self.count += 1
+        self.total += elapsed
+        self.max = max(self.max, elapsed)
+        self.allocations += max(allocations, 0)
+        self.samples.append(elapsed)
+
+    def percentile(self, pct: int) -> float:
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, (len(ordered) * pct) // 100)]
+
+    def info(self) -> dict:
+        return {
+            "count": self.count,
+            "total": round(self.total, 3),
+            "p50": round(self.percentile(50), 3),
+            "p95": round(self.percentile(95), 3),
+            "max": round(self.max, 3),
+            "allocations": self.allocations,
+        }
+
+
+class WidgetProfiler:
+    """
+    Collects the time taken by widgets to draw themselves, calculate their length and
+    draw their decorations.
+
+    Profiling is disabled by default as it adds a small overhead to every draw. It can
+    be enabled in your config:
+
+    .. code:: python
+
+        from qtile_extras.widget.profiler import profiler
+
+        profiler.enable(interval=60)
+
+    Stats for an individual widget can then be retrieved by calling the widget's
+    ``widget_stats()`` command. Times are in milliseconds and ``allocations`` is the
+    net number of memory blocks allocated during the calls.
+
+    If ``interval`` is set, the slowest widgets are written to the log every
+    ``interval`` seconds.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.interval = 0
+        self.log_count = 5
+        self._stats = weakref.WeakKeyDictionary()  # type: weakref.WeakKeyDictionary
+        self._timer = None
+
+    def enable(self, interval: float = 0, log_count: int = 5) -> None:
+        """Starts collecting stats, optionally logging the slowest widgets periodically."""
+        self.enabled = True
+        self.interval = interval
+        self.log_count = log_count
+
+    def disable(self) -> None:
+        self.enabled = False
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+    def reset(self) -> None:
+        self._stats.clear()
+
+    def call(self, widget, name: str, func, *args, **kwargs):
+        """Calls ``func`` and records its duration against the widget."""
+        if not self.enabled:
+            return func(*args, **kwargs)
+
+        blocks = sys.getallocatedblocks()
+        start = perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            elapsed = (perf_counter() - start) * 1000
+            self.record(widget, name, elapsed, sys.getallocatedblocks() - blocks)
+
+    def record(self, widget, name: str, elapsed: float, allocations: int = 0) -> None:
+        timers = self._stats.setdefault(widget, {})
+        if name not in timers:
+            timers[name] = _Histogram()
+        timers[name].add(elapsed, allocations)
+
+        if self.interval and self._timer is None:
+            self._schedule()
+
+    def widget_stats(self, widget) -> dict:
+        return {name: hist.info() for name, hist in self._stats.get(widget, {}).items()}
+
+    def stats(self) -> dict:
+        """Returns stats for all profiled widgets, keyed by widget name."""
+        return {
+            getattr(widget, "name", repr(widget)): self.widget_stats(widget)
+            for widget in list(self._stats.keys())
+        }
+
+    def slowest(self, count: int = 5) -> list[tuple[str, str, dict]]:
+        """Returns the timers with the highest total time."""
+        timers = [
+            (name, timer, info)
+            for name, widget in self.stats().items()
+            for timer, info in widget.items()
+        ]
+        timers.sort(key=lambda t: t[2]["total"], reverse=True)
+        return timers[:count]
+
+    def _schedule(self) -> None:
+        from libqtile import qtile
+
+        if qtile is None:
+            return
+
+        self._timer = qtile.call_later(self.interval, self._dump)
+
+    def _dump(self) -> None:
+        self._timer = None
+        if not self.enabled:
+            return
+
+        for name, timer, info in self.slowest(self.log_count):
+            logger.info(
+                "Widget profile: %s.%s count=%d p50=%.3fms p95=%.3fms max=%.3fms allocations=%d",
+                name,
+                timer,
+                info["count"],
+                info["p50"],
+                info["p95"],
+                info["max"],
+                info["allocations"],
+            )
+
+        if self.interval:
+            self._schedule()
+
+
+profiler = WidgetProfiler()
+
+
+def profiled(name: str):
+    """Decorator to record the time taken by a widget method in the profiler."""
+
+    def wrapper(func):
+        @wraps(func)
+        def profiled_func(self, *args, **kwargs):
+            if not profiler.enabled:
+                return func(self, *args, **kwargs)
+            return profiler.call(self, name, func, self, *args, **kwargs)
+
+        profiled_func._profiled = True  # type: ignore[attr-defined]
+        return profiled_func
+
+    return wrapper
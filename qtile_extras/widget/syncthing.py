@@ -27,7 +27,7 @@ from libqtile.widget import base
 
 from qtile_extras import hook
 from qtile_extras.images import ImgMask
-from qtile_extras.widget.mixins import ProgressBarMixin
+from qtile_extras.widget.mixins import DirtyTrackingMixin, ProgressBarMixin
 
 ICON_FOLDER = Path(__file__).parent.parent / "resources" / "syncthing"
 ICON_PATH = (ICON_FOLDER / "syncthing.svg").resolve().as_posix()
@@ -35,7 +35,7 @@ ICON_PATH = (ICON_FOLDER / "syncthing.svg").resolve().as_posix()
 API_COMPLETION = "/rest/db/completion"
 
 
-class Syncthing(base._Widget, ProgressBarMixin):
+class Syncthing(base._Widget, ProgressBarMixin, DirtyTrackingMixin):
     """
     A widget to show the sync status of a Syncthing server.
 
@@ -167,7 +167,7 @@ class Syncthing(base._Widget, ProgressBarMixin):
                 hook.fire("st_sync_stopped")
 
         if old_sync != self.is_syncing and (self.hide_on_idle or self.show_bar):
-            self.bar.draw()
+            self.redraw_bar()
         else:
             self.draw()
 
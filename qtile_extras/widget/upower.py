@@ -28,6 +28,7 @@ from libqtile.log_utils import logger
 from libqtile.widget import base
 
 from qtile_extras import hook
+from qtile_extras.widget.mixins import DirtyTrackingMixin
 
 PROPS_IFACE = "org.freedesktop.DBus.Properties"
 UPOWER_SERVICE = "org.freedesktop.UPower"
@@ -44,7 +45,7 @@ class BatteryState(Enum):
     CRITICAL = auto()
 
 
-class UPowerWidget(base._Widget):
+class UPowerWidget(base._Widget, DirtyTrackingMixin):
     """
     A graphical widget to display laptop battery level.
 
@@ -302,6 +303,8 @@ class UPowerWidget(base._Widget):
 
             battery["status"] = status
 
+        self.mark_dirty()
+
         if draw:
             self.qtile.call_soon(self.bar.draw)
 
@@ -408,12 +411,12 @@ class UPowerWidget(base._Widget):
             if self.hide_timer:
                 self.hide_timer.cancel()
 
-        self.bar.draw()
+        self.redraw_bar()
 
     def hide(self):
         # Self-explanatory!
         self.show_text = False
-        self.bar.draw()
+        self.redraw_bar()
 
     def info(self):
         info = base._Widget.info(self)
@@ -17,6 +17,11 @@
 # LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 # SOFTWARE.
+from __future__ import annotations
+
+import asyncio
+import itertools
+import json
 import mmap
 import os
 import shutil
@@ -24,18 +29,22 @@ import signal
 import sys
 import tempfile
 import time
+from collections import deque
 from contextlib import contextmanager
 from pathlib import Path
 from threading import Lock
-from time import sleep
 
-import cairocffi
 from libqtile.command.base import expose_command
 from libqtile.confreader import ConfigError
+from libqtile.log_utils import logger
 from libqtile.widget import base
 
-SHM = "/tmp/shm.mmap"
-LOCK = "/tmp/lock.mmap"
+from qtile_extras.resources.visualiser.cava_draw import (
+    BUFFERS,
+    create_frames,
+    read_sequence,
+    shm_size,
+)
 
 DEFAULT_LENGTH = 100
 CAVA_DRAW = Path(__file__).parent.parent / "resources" / "visualiser" / "cava_draw.py"
@@ -52,7 +61,211 @@ raw_target = {pipe}
 bit_format = 8bit
 """
 
-fps_lock = Lock()
+# Shared memory is kept in /dev/shm where available
+SHM_DIR = Path("/dev/shm") if Path("/dev/shm").is_dir() else Path(tempfile.gettempdir())
+
+_instances = itertools.count()
+
+
+class _CavaStream:
+    """
+    A cava process and a drawing process that can be shared by several visualisers.
+
+    The drawing process draws each frame for every visualiser using the stream at that
+    visualiser's size and writes it to the visualiser's own shared memory. Visualisers
+    read and pace their frames independently.
+
+    In process streams have no drawing process. cava's output is read in the event loop
+    and the newest frame is passed to each visualiser to draw itself.
+    """
+
+    # Settings which must be the same for all visualisers using a stream
+    shared = ("bars", "in_process", "interpolate", "decay")
+
+    streams: dict[str, _CavaStream] = {}
+
+    def __init__(self, name, widget):
+        self.name = name
+        self.qtile = widget.qtile
+        self.cava_path = widget.cava_path
+        for attr in self.shared:
+            setattr(self, attr, getattr(widget, attr))
+        self.framerate = widget.framerate
+        self.smoother = None
+        if self.in_process:
+            from qtile_extras.resources.visualiser.cava_draw import Smoother
+
+            # NumPy is kept out of qtile's process
+            self.smoother = Smoother(self.bars, self.interpolate, self.decay, vectorised=False)
+
+        # Pipes we name ourselves are removed with the stream
+        self.own_pipe = not widget.cava_pipe
+        self.pipe = widget.cava_pipe or os.path.join(
+            tempfile.gettempdir(), f"qte_cava_{os.getpid()}_{name}.pipe"
+        )
+        self.widgets = []
+        self.active = set()
+        self.running = False
+        self.cava_proc = None
+        self.draw_proc = None
+        self.fd = None
+        self.buffer = b""
+
+        config = CONFIG.format(
+            bars=self.bars,
+            framerate=self.framerate,
+            pipe=self.pipe,
+            channels=widget.channels,
+        )
+        with tempfile.NamedTemporaryFile(delete=False) as config_file:
+            config_file.write(config.encode())
+            config_file.flush()
+        self.config_file = config_file.name
+
+    @classmethod
+    def get(cls, name, widget):
+        stream = cls.streams.get(name)
+        if stream is None:
+            stream = cls(name, widget)
+            cls.streams[name] = stream
+        else:
+            for attr in cls.shared:
+                if getattr(widget, attr) != getattr(stream, attr):
+                    logger.warning(
+                        "Visualisers sharing the '%s' stream must use the same '%s' setting. "
+                        "Using %s=%s.",
+                        name,
+                        attr,
+                        attr,
+                        getattr(stream, attr),
+                    )
+
+        stream.add(widget)
+        return stream
+
+    def add(self, widget):
+        if widget in self.widgets:
+            return
+
+        self.widgets.append(widget)
+
+        # Visualisers can join a running stream (e.g. when a screen is added) so the drawing
+        # process needs restarting to draw for the new visualiser too. The old process is
+        # stopped once the new one has had time to start reading cava's output.
+        if self.running and not self.in_process:
+            self.qtile.call_later(1, self._kill, self.draw_proc)
+            self._start_drawing()
+
+    def remove(self, widget):
+        self.deactivate(widget)
+        if widget in self.widgets:
+            self.widgets.remove(widget)
+
+        if not self.widgets:
+            Path(self.config_file).unlink(missing_ok=True)
+            if self.own_pipe:
+                Path(self.pipe).unlink(missing_ok=True)
+            self.streams.pop(self.name, None)
+
+    def activate(self, widget):
+        """Starts the processes if this is the first active visualiser."""
+        self.active.add(widget)
+        if not self.running:
+            self.start()
+
+    def deactivate(self, widget):
+        """Stops the processes once no visualisers are active."""
+        self.active.discard(widget)
+        if self.running and not self.active:
+            self.stop()
+
+    def start(self):
+        if self.in_process:
+            self._open_pipe()
+
+        self.cava_proc = self.qtile.spawn([self.cava_path, "-p", self.config_file])
+        self.running = True
+
+        if not self.in_process:
+            self._start_drawing()
+
+    def _start_drawing(self):
+        cmd = [
+            PYTHON,
+            CAVA_DRAW.resolve().as_posix(),
+            "--bars",
+            f"{self.bars}",
+            "--pipe",
+            f"{self.pipe}",
+            "--framerate",
+            f"{self.framerate}",
+            "--interpolate",
+            f"{self.interpolate}",
+            "--decay",
+            f"{self.decay}",
+        ]
+        for widget in self.widgets:
+            cmd.extend(["--output", json.dumps(widget.output_config)])
+
+        self.draw_proc = self.qtile.spawn(cmd)
+
+    def _open_pipe(self):
+        if not os.path.exists(self.pipe):
+            os.mkfifo(self.pipe)
+
+        # Opening the pipe for reading and writing means it never reaches EOF when cava
+        # closes its end, and opening doesn't block while waiting for cava to start.
+        self.fd = os.open(self.pipe, os.O_RDWR | os.O_NONBLOCK)
+        self.buffer = b""
+        asyncio.get_running_loop().add_reader(self.fd, self._read)
+
+    def _close_pipe(self):
+        if self.fd is None:
+            return
+
+        asyncio.get_running_loop().remove_reader(self.fd)
+        os.close(self.fd)
+        self.fd = None
+
+    def _read(self):
+        data = self.buffer
+        while True:
+            try:
+                chunk = os.read(self.fd, 65536)
+            except BlockingIOError:
+                break
+            if not chunk:
+                break
+            data += chunk
+
+        # Frames that were not drawn before a newer one arrived are dropped
+        complete = len(data) - len(data) % self.bars
+        self.buffer = data[complete:]
+        if not complete:
+            return
+
+        frames = self.smoother.frames(data[complete - self.bars : complete])
+        for widget in self.active:
+            widget.queue_frames(frames)
+
+    def stop(self):
+        self._close_pipe()
+
+        # Try to terminate subprocesses
+        for proc in (self.cava_proc, self.draw_proc):
+            self._kill(proc)
+
+        self.cava_proc = None
+        self.draw_proc = None
+        self.running = False
+
+        for widget in self.widgets:
+            widget.shm_path.unlink(missing_ok=True)
+
+    @staticmethod
+    def _kill(proc):
+        if proc:
+            os.kill(proc, signal.SIGTERM)
 
 
 class Visualiser(base._Widget):
@@ -62,9 +275,17 @@ class Visualiser(base._Widget):
     The widget requires `cava <https://github.com/karlstav/cava>`__ to be installed.
     This may also be packaged by your distro.
 
+    If `numpy <https://numpy.org>`__ is installed, bars are written directly to the image
+    rather than drawn with cairo, which is considerably faster with larger numbers of bars.
+
     cava is configured through the widget. Currently, you can set the number of bars and
     the framerate.
 
+    The visualiser only redraws when the bars change and slows its redraws when the bars
+    have not changed for ``idle_timeout`` seconds (e.g. when no audio is playing). Setting
+    ``interpolate`` adds frames between cava's frames so a lower ``framerate`` can still
+    look smooth.
+
     .. warning::
 
         Rendering the visualiser directly in qtile's bar is almost certainly not an efficient way
@@ -85,13 +306,51 @@ class Visualiser(base._Widget):
         ("width", DEFAULT_LENGTH, "Widget width"),
         ("cava_path", shutil.which("cava"), "Path to cava. Set if file is not in your PATH."),
         ("spacing", 2, "Space between bars"),
-        ("cava_pipe", "/tmp/cava.pipe", "Pipe for cava's output"),
+        (
+            "cava_pipe",
+            None,
+            "Pipe for cava's output. Defaults to a unique file in the temp directory.",
+        ),
         ("bar_height", 20, "Height of visualiser bars"),
         ("bar_colour", "#ffffff", "Colour of visualiser bars"),
         ("autostart", True, "Start visualiser automatically"),
         ("hide", True, "Hide the visualiser when not active"),
         ("channels", "mono", "Visual channels. 'mono' or 'stereo'."),
         ("invert", False, "When True, bars will draw from the top down"),
+        (
+            "in_process",
+            False,
+            "Read cava's output in qtile's event loop and draw the bars in the widget rather "
+            "than in a separate drawing process. This uses less memory but the drawing is "
+            "done in qtile's process.",
+        ),
+        (
+            "interpolate",
+            0,
+            "Number of frames to draw between each of cava's frames. Bars move smoothly "
+            "between cava's values.",
+        ),
+        (
+            "decay",
+            0,
+            "When set (e.g. 0.8), falling bars drop to no less than this fraction of their "
+            "previous height for each of cava's frames. 0 disables.",
+        ),
+        (
+            "idle_timeout",
+            2,
+            "Seconds without any change to the bars before the visualiser slows its redraws.",
+        ),
+        ("idle_framerate", 2, "Framerate used to check for changes when idle."),
+        (
+            "stream",
+            None,
+            "Name of a cava stream to share with other visualisers (e.g. in mirrored bars). "
+            "Visualisers sharing a stream use one cava process and one drawing process "
+            "but can have different sizes, colours and framerates. ``bars``, ``in_process``, "
+            "``interpolate`` and ``decay`` are taken from the first visualiser. ``None`` gives "
+            "the visualiser its own stream.",
+        ),
     ]
 
     _screenshots = [("visualiser.gif", "Default config.")]
@@ -102,11 +361,23 @@ class Visualiser(base._Widget):
         self.add_defaults(Visualiser.defaults)
         self._procs_started = False
         self._shm = None
+        self._frames = []
+        self._output = None
+        self.frame = b""
+        self._pending = deque()
+        self._painted = False
+        self._drawn_at = None
+        self._sequence = None
+        self._idle = False
+        self._last_change = 0
         self._timer = None
         self._draw_count = 0
         self._toggling = False
         self._starting = False
         self._last_time = time.time()
+        self._instance = next(_instances)
+        self._fps_lock = Lock()
+        self.shm_path = SHM_DIR / f"qte_visualiser_{os.getpid()}_{self._instance}"
 
     def _configure(self, qtile, bar):
         if self.cava_path is None:
@@ -115,16 +386,20 @@ class Visualiser(base._Widget):
         base._Widget._configure(self, qtile, bar)
 
         if not self.configured:
-            config = CONFIG.format(
-                bars=self.bars,
-                framerate=self.framerate,
-                pipe=self.cava_pipe,
-                channels=self.channels,
-            )
-            with tempfile.NamedTemporaryFile(delete=False) as self.config_file:
-                self.config_file.write(config.encode())
-                self.config_file.flush()
-            self._interval = 1 / self.framerate
+            name = self.stream if self.stream is not None else f"_visualiser{self._instance}"
+            self._stream = _CavaStream.get(name, self)
+            if self._stream.in_process:
+                from qtile_extras.resources.visualiser.cava_draw import Output
+
+                self._output = Output(
+                    shm=None,
+                    num_bars=self._stream.bars,
+                    vectorised=False,
+                    **{k: v for k, v in self.output_config.items() if k != "shm"},
+                )
+            # Interpolated frames are drawn between cava's frames
+            self._interval = 1 / (self.framerate * (self._stream.interpolate + 1))
+            self._idle_interval = 1 / self.idle_framerate
             self.y_offset = (self.height - self.bar_height) // 2
             if self.autostart:
                 self.timeout_add(1, self._start)
@@ -144,81 +419,92 @@ class Visualiser(base._Widget):
 
         self.length = new
 
+    @property
+    def output_config(self):
+        """Settings passed to the drawing process for this visualiser."""
+        return {
+            "shm": self.shm_path.as_posix(),
+            "width": self._config_length,
+            "height": self.bar_height,
+            "spacing": self.spacing,
+            "background": self.bar_colour,
+            "invert": self.invert,
+        }
+
     def _start(self):
         self._starting = True
-        self.cava_proc = self.qtile.spawn([self.cava_path, "-p", self.config_file.name])
-        cmd = [
-            PYTHON,
-            CAVA_DRAW.resolve().as_posix(),
-            "--width",
-            f"{self._config_length}",
-            "--height",
-            f"{self.bar_height}",
-            "--bars",
-            f"{self.bars}",
-            "--spacing",
-            f"{self.spacing}",
-            "--pipe",
-            f"{self.cava_pipe}",
-            "--background",
-            self.bar_colour,
-        ]
-        if self.invert:
-            cmd.append("--invert")
-
-        self.draw_proc = self.qtile.spawn(cmd)
-        self._timer = self.timeout_add(1, self._open_shm)
+        self._stream.activate(self)
+        self._timer = self.timeout_add(1, self._started)
 
     def _stop(self):
         if self._timer:
             self._timer.cancel()
 
         if not self._procs_started:
+            # Don't leave the processes running if we're stopped while starting
+            if self._starting:
+                self._starting = False
+                self._stream.deactivate(self)
             return
 
-        # Try to terminate subprocesses
-        if hasattr(self, "cava_proc"):
-            os.kill(self.cava_proc, signal.SIGTERM)
+        self._procs_started = False
+        self.frame = b""
+        self._pending.clear()
 
-        if hasattr(self, "draw_proc"):
-            os.kill(self.draw_proc, signal.SIGTERM)
+        if self._shm is not None:
+            self._close_shm()
 
-        self._procs_started = False
+        # Terminates the processes unless they're used by another visualiser
+        self._stream.deactivate(self)
 
-        # Close shared memory objects
-        self._shm.close()
-        self._shmfile.close()
-        self._lock.close()
-        self._lockfile.close()
+        if self._fps_lock.locked():
+            self._fps_lock.release()
 
-        if fps_lock.locked():
-            fps_lock.release()
+        self._set_length()
 
+    def _started(self):
+        if not self._stream.in_process:
+            try:
+                self._open_shm()
+            except FileNotFoundError:
+                # The drawing process hasn't created the shared memory yet
+                self._timer = self.timeout_add(0.5, self._started)
+                return
+
+        # Make sure the first frame is drawn
+        self._painted = False
+        self._sequence = None
+        self._idle = False
+        self._last_change = time.monotonic()
+        self._procs_started = True
+        self._starting = False
         self._set_length()
 
     def _open_shm(self):
-        self._lockfile = open(LOCK, "rb+")
-        self._shmfile = open(SHM, "rb")
-        self._lock = mmap.mmap(self._lockfile.fileno(), length=1, access=mmap.ACCESS_WRITE)
-        self._shm_size = self.bar_height * self._config_length * 4
+        # The memory is mapped with write access as cairo needs a writable buffer for the
+        # surfaces but the widget never writes to it.
+        self._shmfile = open(self.shm_path, "rb+")
         self._shm = mmap.mmap(
-            self._shmfile.fileno(), length=self._shm_size, access=mmap.ACCESS_READ
+            self._shmfile.fileno(),
+            length=shm_size(self._config_length, self.bar_height),
+            access=mmap.ACCESS_WRITE,
         )
 
-        # Context manager to prevent race conditions when accessing shared memory
-        @contextmanager
-        def lock_shm():
-            while self._lock[0]:
-                sleep(0.001)
-
-            self._lock[0] = 1
-            yield
-            self._lock[0] = 0
-
-        self._take_lock = lock_shm
-        self._procs_started = True
-        self._starting = False
-        self._set_length()
+        # Surfaces are created once and read the frames directly from shared memory
+        self._frames = create_frames(self._shm, self._config_length, self.bar_height)
+
+    def _close_shm(self):
+        # The frame surfaces need to be released before the memory map can be closed.
+        for frame in self._frames:
+            frame.finish()
+        self._frames = []
+        try:
+            self._shm.close()
+        except BufferError:
+            # Memory will be unmapped when the remaining references are released
+            pass
+        self._shm = None
+        self._shmfile.close()
 
     @contextmanager
     def lock_state(self):
@@ -238,36 +524,88 @@ class Visualiser(base._Widget):
         # as any call to bar.draw() by another widget will trigger a draw of the widget.
         # We use a non-blocking lock and only allow the widget to draw if the lock was
         # successfully acquired. The lock is only released after the required interval has
-        # elapsed.
-        if not fps_lock.acquire(blocking=False):
+        # elapsed. Each visualiser has its own lock so they can run at different framerates.
+        if not self._fps_lock.acquire(blocking=False):
+            # The bar has been redrawn between frames (e.g. after an expose) so the last
+            # frame needs to be shown again. It's still held by the drawer.
+            if self._painted:
+                self.draw_at_default_position()
+                self._drawn_at = (self.offsetx, self.offsety)
             return
 
         self._draw()
 
+    def queue_frames(self, frames):
+        """Replaces any frames not yet drawn with the frames for cava's newest output."""
+        self._pending.clear()
+        self._pending.extend(frames)
+
+        # Don't wait for the idle timer when the bars start moving again
+        if self._idle and self._procs_started and self._fps_lock.locked():
+            if self._timer:
+                self._timer.cancel()
+            self.loop()
+
+    def _next_frame(self):
+        """Returns True if the bars have changed since they were last drawn."""
+        if self._output is not None:
+            if not self._pending:
+                return False
+            frame = self._pending.popleft()
+            changed = frame != self.frame
+            self.frame = frame
+            return changed
+
+        sequence = read_sequence(self._shm)
+        changed = sequence != self._sequence
+        self._sequence = sequence
+        return changed
+
     def _draw(self):
-        with self._take_lock():
-            surface = cairocffi.ImageSurface.create_for_data(
-                bytearray(self._shm[: self._shm_size]),
-                cairocffi.FORMAT_ARGB32,
-                self._config_length,
-                self.bar_height,
-            )
+        changed = self._next_frame() or not self._painted
+        now = time.monotonic()
+
+        if changed:
+            self._paint()
+            self._last_change = now
+        elif (self.offsetx, self.offsety) != self._drawn_at:
+            # The bar has moved the widget so the last frame needs copying to the new position
+            self.draw_at_default_position()
+            self._drawn_at = (self.offsetx, self.offsety)
+
+        # Redraws are slowed down if nothing has changed for a while
+        self._idle = now - self._last_change >= self.idle_timeout
+        interval = self._idle_interval if self._idle else self._interval
+        self._timer = self.timeout_add(interval, self.loop)
 
+    def _paint(self):
         self.drawer.clear(self.background or self.bar.background)
-        self.drawer.ctx.set_source_surface(surface, 0, self.y_offset)
-        self.drawer.ctx.paint()
-        self.draw_at_default_position()
 
-        self._timer = self.timeout_add(self._interval, self.loop)
+        if self._output is not None:
+            # Only the newest frame received from cava is drawn
+            self.drawer.set_source_rgb(self.bar_colour)
+            self._output.add_bars(self.drawer.ctx, self.frame, self.y_offset)
+            self.drawer.ctx.fill()
+        else:
+            # The latest complete frame is never written to by the drawing process until
+            # two further frames have been completed so we can read it without locking.
+            surface = self._frames[self._sequence % BUFFERS]
+            surface.mark_dirty()
+            self.drawer.ctx.set_source_surface(surface, 0, self.y_offset)
+            self.drawer.ctx.paint()
+
+        self.draw_at_default_position()
+        self._drawn_at = (self.offsetx, self.offsety)
+        self._painted = True
 
     def loop(self):
         # Release the lock and redraw.
-        fps_lock.release()
+        self._fps_lock.release()
         self.draw()
 
     def finalize(self):
         self._stop()
-        Path(self.config_file.name).unlink(missing_ok=True)
+        self._stream.remove(self)
         base._Widget.finalize(self)
 
     @expose_command()
@@ -0,0 +1,104 @@
+# Copyright (c) 2026 elParaguayo
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+import libqtile.config
+import libqtile.layout
+import pytest
+
+from qtile_extras.layout.decorations import (
+    ConditionalBorder,
+    CustomBorder,
+    GradientBorder,
+    GradientFrame,
+    RoundedCorners,
+    ScreenGradientBorder,
+    SolidEdge,
+)
+from test.benchmarks.conftest import qtile_timeit
+
+PLACEMENTS = 20
+BORDER_WIDTH = 4
+
+SIZES = [(200, 150), (800, 600), (1920, 1080)]
+
+
+def stripes(ctx, bw, w, h):
+    ctx.set_source_rgb(1, 0, 0)
+    ctx.set_line_width(2)
+    for y in range(0, h, 10):
+        ctx.move_to(0, y)
+        ctx.line_to(w, y)
+    ctx.stroke()
+
+
+STYLES = {
+    "solid": "00f",
+    "solid_edge": SolidEdge(colours=["f00", "00f", "f00", "00f"]),
+    "gradient": GradientBorder(colours=["f00", "0f0", "00f"]),
+    "gradient_radial": GradientBorder(colours=["f00", "0f0", "00f"], radial=True),
+    "gradient_frame": GradientFrame(colours=["f00", "0f0", "00f"]),
+    "screen_gradient": ScreenGradientBorder(colours=["f00", "0f0", "00f"]),
+    "custom": CustomBorder(func=stripes),
+    "rounded": RoundedCorners(),
+    "conditional": ConditionalBorder(
+        matches=[(libqtile.config.Match(title="one"), GradientBorder())], fallback="00f"
+    ),
+}
+
+
+@pytest.mark.parametrize("size", SIZES, ids=[f"{w}x{h}" for w, h in SIZES])
+@pytest.mark.parametrize("style", STYLES.keys())
+def bench_border_placement(manager_nospawn, minimal_conf_noscreen, benchmark, style, size):
+    config = minimal_conf_noscreen
+    config.layouts = [libqtile.layout.Max(border_focus=STYLES[style], border_width=BORDER_WIDTH)]
+    config.screens = [libqtile.config.Screen()]
+
+    manager_nospawn.start(config)
+    manager_nospawn.test_window("one")
+
+    qtile = manager_nospawn.c
+    backend = manager_nospawn.backend.name
+    module = "injections" if backend == "x11" else "injections_wayland"
+    cache = (
+        "__import__('importlib')"
+        f".import_module('qtile_extras.layout.decorations.{module}').border_cache"
+    )
+
+    width, height = size
+    place = (
+        f"self.current_window.place(0, 0, {width}, {height}, {BORDER_WIDTH}, "
+        "self.current_layout.border_focus)"
+    )
+
+    # Cold placements render the border every time, warm placements can reuse it
+    cold = qtile_timeit(qtile, f"({cache}.clear(), {place})", number=PLACEMENTS)
+    warm = qtile_timeit(qtile, place, number=PLACEMENTS)
+
+    # Memory blocks still allocated after the placements
+    blocks = "__import__('sys').getallocatedblocks()"
+    before = int(qtile.eval(blocks))
+    qtile.eval(f"for _ in range({PLACEMENTS}): {place}")
+    retained = int(qtile.eval(blocks)) - before
+
+    benchmark(
+        f"{backend}, {style}, {width}x{height}",
+        cold=cold,
+        warm=warm,
+        blocks_per_placement=f"{retained / PLACEMENTS:.1f}",
+    )
@@ -0,0 +1,61 @@
+# Copyright (c) 2026 elParaguayo
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+import libqtile.bar
+import libqtile.config
+import pytest
+
+from qtile_extras import widget
+from qtile_extras.widget.decorations import BorderDecoration, RectDecoration
+from test.benchmarks.conftest import qtile_timeit
+
+WIDGET_COUNTS = [10, 20, 40, 80]
+
+
+@pytest.mark.parametrize("count", WIDGET_COUNTS)
+def bench_grouped_decoration_redraw(manager_nospawn, minimal_conf_noscreen, benchmark, count):
+    config = minimal_conf_noscreen
+
+    def decorations(groupid):
+        return [
+            RectDecoration(radius=5, filled=True, group=True, groupid=groupid),
+            BorderDecoration(border_width=[0, 0, 2, 0], group=True, groupid=groupid),
+        ]
+
+    # Split the widgets into groups of 5 so there are several groups in the bar
+    widgets = [
+        widget.TextBox(f"{i}", name=f"tb{i}", decorations=decorations(i // 5))
+        for i in range(count)
+    ]
+
+    config.screens = [libqtile.config.Screen(top=libqtile.bar.Bar(widgets, 20))]
+
+    manager_nospawn.start(config)
+
+    bar = manager_nospawn.c.bar["top"]
+    bar.eval("self.draw()")
+
+    redraw = qtile_timeit(bar, "[w.draw() for w in self.widgets]", number=50)
+    lookup = qtile_timeit(
+        bar,
+        "[(d.is_first, d.is_last) for w in self.widgets for d in w.decorations]",
+        number=50,
+    )
+
+    benchmark(f"{count} widgets", redraw=redraw, per_widget=redraw / count, group_lookup=lookup)
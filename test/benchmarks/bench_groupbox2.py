@@ -0,0 +1,70 @@
+# Copyright (c) 2026 elParaguayo
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+import libqtile.bar
+import libqtile.config
+import pytest
+
+from qtile_extras import widget
+from qtile_extras.widget.groupbox2 import GroupBoxRule
+from test.benchmarks.conftest import qtile_timeit
+
+GROUP_COUNT = 30
+CYCLES = 5
+
+RULES = {
+    "default": None,
+    "text": [
+        GroupBoxRule(text="●").when(focused=True),
+        GroupBoxRule(text_colour="ffffff").when(occupied=True),
+        GroupBoxRule(text_colour="999999").when(occupied=False),
+    ],
+}
+
+
+@pytest.mark.parametrize("rules", RULES.keys())
+def bench_groupbox2_focus_changes(manager_nospawn, minimal_conf_noscreen, benchmark, rules):
+    config = minimal_conf_noscreen
+    config.groups = [libqtile.config.Group(f"{i}") for i in range(GROUP_COUNT)]
+
+    kwargs = {"rules": RULES[rules]} if RULES[rules] else {}
+    config.screens = [
+        libqtile.config.Screen(top=libqtile.bar.Bar([widget.GroupBox2(**kwargs)], 20))
+    ]
+
+    manager_nospawn.start(config)
+
+    gb = manager_nospawn.c.widget["groupbox2"]
+    gb.eval("self.draw()")
+
+    def layout_updates():
+        return int(gb.eval("sum(b.layout_updates for b in self.boxes)"))
+
+    # Focus every group in turn, redrawing the widget after each change
+    stmt = "[(g.toscreen(), self.draw()) for g in self.qtile.groups]"
+
+    start = layout_updates()
+    elapsed = qtile_timeit(gb, stmt, number=CYCLES)
+    redraws = CYCLES * GROUP_COUNT
+
+    benchmark(
+        f"{GROUP_COUNT} groups, {rules} rules",
+        per_redraw=elapsed / GROUP_COUNT,
+        layout_calls_per_redraw=f"{(layout_updates() - start) / redraws:.2f}",
+    )
@@ -0,0 +1,110 @@
+# Copyright (c) 2026 elParaguayo
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+import textwrap
+
+import libqtile.config
+import pytest
+
+from test.benchmarks.conftest import qtile_timeit
+
+UPDATES = 200
+
+TEMPLATES = ["DEFAULT_LAYOUT", "COMPACT_LAYOUT"]
+
+
+@pytest.mark.parametrize("template", TEMPLATES)
+def bench_mpris2_update(manager_nospawn, minimal_conf_noscreen, benchmark, template):
+    config = minimal_conf_noscreen
+    config.screens = [libqtile.config.Screen()]
+
+    manager_nospawn.start(config)
+    qtile = manager_nospawn.c
+
+    qtile.eval(
+        textwrap.dedent(
+            f"""
+            from copy import deepcopy
+            from qtile_extras.popup.templates import mpris2
+            self.popup = deepcopy(mpris2.{template})
+            self.popup._configure(self)
+            self.popup.show(centered=True)
+            self.progress = __import__('itertools').count()
+            """
+        )
+    )
+
+    # The mpris2 widget updates the progress and time once a second while playing
+    update = (
+        "self.popup.update_controls("
+        "progress=(next(self.progress) % 100) / 100, time=str(next(self.progress)))"
+    )
+
+    # Presenting only the damaged controls vs repainting the whole popup after each update
+    partial = qtile_timeit(qtile, update, number=UPDATES)
+    full = qtile_timeit(qtile, f"({update}, self.popup.draw())", number=UPDATES)
+
+    benchmark(
+        f"{manager_nospawn.backend.name}, {template.lower()}",
+        partial=partial,
+        full=full,
+    )
+
+
+SHOWN = 50
+
+
+@pytest.mark.parametrize(
+    "template", ["mpris2.DEFAULT_LAYOUT", "volume.VOLUME_NOTIFICATION"], ids=["mpris2", "volume"]
+)
+def bench_popup_show(manager_nospawn, minimal_conf_noscreen, benchmark, template):
+    config = minimal_conf_noscreen
+    config.screens = [libqtile.config.Screen()]
+
+    manager_nospawn.start(config)
+    qtile = manager_nospawn.c
+
+    qtile.eval(
+        textwrap.dedent(
+            f"""
+            from copy import deepcopy
+            from qtile_extras.popup.templates import mpris2, volume
+            self.template = {template}
+            self.popup = deepcopy(self.template)
+            self.popup._configure(self)
+            self.popup.kill()
+            """
+        )
+    )
+
+    show = "(self.popup._configure(self), self.popup.show(centered=True), self.popup.kill())"
+
+    # Copying the template for every popup vs reopening the widget's copy
+    copied = qtile_timeit(
+        qtile,
+        f"(setattr(self, 'popup', __import__('copy').deepcopy(self.template)), {show})",
+        number=SHOWN,
+    )
+    reopened = qtile_timeit(qtile, show, number=SHOWN)
+
+    benchmark(
+        f"{manager_nospawn.backend.name}, {template.split('.')[0]}",
+        copied=copied,
+        reopened=reopened,
+    )
@@ -0,0 +1,67 @@
+# Copyright (c) 2026 elParaguayo
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+import time
+from contextlib import ExitStack
+
+import pytest
+
+from qtile_extras.resources.visualiser.cava_draw import Output
+
+FRAMES = 500
+WIDTH = 800
+HEIGHT = 30
+
+
+@pytest.mark.parametrize("vectorised", [False, True], ids=["cairo", "numpy"])
+@pytest.mark.parametrize("num_bars", [32, 256])
+def bench_visualiser_draw(tmp_path, benchmark, vectorised, num_bars):
+    if vectorised:
+        pytest.importorskip("numpy")
+
+    output = Output(
+        shm=tmp_path / "shm",
+        width=WIDTH,
+        height=HEIGHT,
+        num_bars=num_bars,
+        spacing=1,
+        background="ffffff",
+        invert=False,
+        vectorised=vectorised,
+    )
+
+    # Vary the bar heights between frames as cava would
+    data = [bytes((i * 7 + j * 13) % 256 for j in range(num_bars)) for i in range(FRAMES)]
+
+    with ExitStack() as stack:
+        output.open(stack)
+
+        start = time.perf_counter()
+        cpu_start = time.process_time()
+        for out in data:
+            output.draw(out)
+        elapsed = time.perf_counter() - start
+        cpu = time.process_time() - cpu_start
+
+    benchmark(
+        f"{num_bars} bars, {'numpy' if vectorised else 'cairo'}",
+        per_frame=elapsed / FRAMES,
+        cpu_per_frame=cpu / FRAMES,
+        fps=f"{FRAMES / elapsed:.0f}",
+    )
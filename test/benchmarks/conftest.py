@@ -0,0 +1,67 @@
+# Copyright (c) 2026 elParaguayo
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+"""
+Benchmarks are not collected as part of the main test suite. They can be run with:
+
+    python3 -m pytest -o python_files="bench_*.py" -o python_functions="bench_*" test/benchmarks
+
+Results are recorded via the ``benchmark`` fixture and displayed at the end of the session.
+"""
+
+import pytest
+
+RESULTS = []
+
+
+def qtile_timeit(obj, stmt, number=100):
+    """
+    Times ``stmt`` inside the qtile process and returns the average time per
+    call in seconds. ``self`` in the statement refers to the command object ``obj``.
+    """
+    code = f"__import__('timeit').timeit({stmt!r}, globals={{'self': self}}, number={number})"
+    return float(obj.eval(code)) / number
+
+
+@pytest.fixture
+def benchmark(request):
+    """
+    Records a benchmark result.
+
+    Usage: ``benchmark(name, **metrics)``. Times should be provided in seconds
+    and are displayed in microseconds.
+    """
+
+    def record(name, **metrics):
+        RESULTS.append((request.node.name, name, metrics))
+
+    yield record
+
+
+def pytest_terminal_summary(terminalreporter):
+    if not RESULTS:
+        return
+
+    terminalreporter.section("benchmark results")
+    for test, name, metrics in RESULTS:
+        values = ", ".join(
+            f"{k}={v * 1e6:.1f}us" if isinstance(v, float) else f"{k}={v}"
+            for k, v in metrics.items()
+        )
+        terminalreporter.write_line(f"{test} [{name}]: {values}")
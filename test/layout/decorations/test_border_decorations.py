@@ -17,6 +17,7 @@
 # LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 # SOFTWARE.
+import cairocffi
 import pytest
 from libqtile.config import Match, Screen
 from libqtile.confreader import Config, ConfigError
@@ -131,3 +132,141 @@ def test_conditional_border_width_matching():
     assert bw.get_border_for_window(True) == 4
     assert bw.get_border_for_window(False) == 0
     assert bw.get_border_for_window("Something else") == 2
+
+
+def border_cache(manager):
+    module = "injections" if manager.backend.name == "x11" else "injections_wayland"
+    return (
+        "__import__('importlib')"
+        f".import_module('qtile_extras.layout.decorations.{module}').border_cache"
+    )
+
+
+@pytest.mark.parametrize("manager", [GradientBorder()], indirect=True)
+def test_border_cache(manager):
+    cache = border_cache(manager)
+
+    manager.test_window("one")
+    manager.test_window("two")
+    manager.c.group.next_window()
+    hits = int(manager.c.eval(f"{cache}.hits"))
+
+    # Windows are the same size so focus changes reuse the rendered borders
+    for _ in range(3):
+        manager.c.group.next_window()
+
+    assert int(manager.c.eval(f"len({cache})")) >= 1
+    assert int(manager.c.eval(f"{cache}.hits")) > hits
+
+
+@pytest.mark.parametrize("manager", [GradientBorder()], indirect=True)
+def test_border_cache_cleared_on_reload(manager):
+    cache = border_cache(manager)
+
+    manager.test_window("one")
+    manager.test_window("two")
+    for _ in range(3):
+        manager.c.group.next_window()
+
+    assert int(manager.c.eval(f"len({cache})")) >= 1
+    misses = int(manager.c.eval(f"{cache}.misses"))
+
+    # The reloaded config uses the same styles so borders are only drawn again if the
+    # cache was cleared
+    manager.c.reload_config()
+    for _ in range(3):
+        manager.c.group.next_window()
+
+    assert int(manager.c.eval(f"{cache}.misses")) > misses
+
+
+class FakeWindow:
+    def __init__(self, wid, name, wm_class):
+        self.wid = wid
+        self.name = name
+        self.wm_class = wm_class
+
+    def get_wm_class(self):
+        return self.wm_class
+
+    def get_wm_role(self):
+        return None
+
+
+def test_conditional_border_match_cache():
+    border = ConditionalBorder(
+        matches=[(Match(title="one"), "f00"), (Match(wm_class="vlc"), "0f0")], fallback="00f"
+    )
+    one = FakeWindow(1, "one", ["firefox", "firefox"])
+    vlc = FakeWindow(2, "video", ["vlc", "vlc"])
+
+    for _ in range(3):
+        assert border.compare(one) == "f00"
+        assert border.compare(vlc) == "0f0"
+
+    assert border._results.misses == 2
+    assert border._results.hits == 4
+
+    # Changing the title invalidates the cached result
+    one.name = "two"
+    assert border.compare(one) == "00f"
+    assert border._results.misses == 3
+
+    # Results are dropped along with the window
+    del vlc
+    assert len(border._results._results) == 1
+
+
+def test_conditional_border_width_match_cache():
+    bw = ConditionalBorderWidth(default=2, matches=[(Match(wm_class="vlc"), 0)])
+    win = FakeWindow(1, "video", ["vlc", "vlc"])
+
+    assert bw.get_border_for_window(win) == 0
+    assert bw.get_border_for_window(win) == 0
+    assert bw._results.hits == 1
+
+    win.wm_class = ["mpv", "mpv"]
+    assert bw.get_border_for_window(win) == 2
+
+    # Rules using functions are always evaluated
+    bw = ConditionalBorderWidth(default=2, matches=[(Match(func=lambda w: True), 4)])
+    assert not bw._results.cacheable
+
+
+def _pixel(surface, x, y):
+    data = surface.get_data()
+    offset = y * surface.get_stride() + x * 4
+    b, g, r, a = data[offset : offset + 4]
+    return r, g, b, a
+
+
+@pytest.mark.parametrize(
+    "decoration",
+    [
+        GradientBorder(colours=["00f", "0ff"]),
+        GradientBorder(colours=["00f", "0ff"], points=[(0, 1), (0, 0)]),
+        GradientFrame(colours=["00f", "0ff"]),
+    ],
+)
+def test_gradient_ramp(decoration):
+    surface = cairocffi.ImageSurface(cairocffi.FORMAT_ARGB32, 41, 41)
+    decoration.draw(surface, 5, 0, 0, 41, 41)
+    surface.flush()
+
+    def close(pixel, expected):
+        return all(abs(p - e) <= 4 for p, e in zip(pixel, expected))
+
+    if isinstance(decoration, GradientFrame):
+        # Each edge goes from the outside of the border to the inside
+        assert close(_pixel(surface, 20, 0), (0, 26, 255, 255))
+        assert close(_pixel(surface, 20, 4), (0, 230, 255, 255))
+        assert close(_pixel(surface, 40, 20), (0, 26, 255, 255))
+    else:
+        # Pixels are sampled at their centres
+        start, end = (3, 252) if decoration.points[0] == (0, 0) else (252, 3)
+        assert close(_pixel(surface, 20, 0), (0, start, 255, 255))
+        assert close(_pixel(surface, 0, 20), (0, 128, 255, 255))
+        assert close(_pixel(surface, 20, 40), (0, end, 255, 255))
+
+    # Nothing is drawn inside the border
+    assert _pixel(surface, 20, 20) == (0, 0, 0, 0)
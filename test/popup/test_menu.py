@@ -108,3 +108,68 @@ def test_popup_menu_from_dbus(manager):
     # Check that correct menu items are created
     item_types = [item["name"] for item in layout["controls"]]
     assert item_types == ["popupmenuitem", "popupmenuseparator", "popupmenuitem", "popupmenuitem"]
+
+
+def test_popup_menu_scrolling(manager):
+    manager.c.eval(
+        textwrap.dedent(
+            """
+        from qtile_extras.popup.menu import PopupMenu, PopupMenuItem
+
+        items = [
+            PopupMenuItem(text=f"Item {i}", mouse_callbacks={"Button1": lambda: None})
+            for i in range(100)
+        ]
+
+        self.menu = PopupMenu.generate(self, items, max_rows=10)
+        self.menu.show(0, 0)
+    """
+        )
+    )
+
+    def menu_info():
+        return eval(manager.c.eval("self.menu.info()"))
+
+    def configured():
+        return int(manager.c.eval("sum(item.configured for item in self.menu.items)"))
+
+    # Only the items that fit in the menu are laid out
+    info = menu_info()
+    assert info["height"] == 120
+    assert info["items"] == 100
+    assert info["first"] == 0
+    assert [c["text"] for c in info["controls"]] == [f"Item {i}" for i in range(5)]
+    assert configured() == 5
+
+    # Scroll down with the mouse wheel
+    manager.c.eval("self.menu.process_button_click(10, 10, 5)")
+    info = menu_info()
+    assert info["first"] == 1
+    assert [c["text"] for c in info["controls"]] == [f"Item {i}" for i in range(1, 6)]
+    assert configured() == 5
+
+    # Text layouts are recycled rather than created for each item
+    assert manager.c.eval("sum(len(v) for v in self.menu._spare_layouts.values())") == "0"
+
+    # Items scrolled out of view can still be updated
+    manager.c.eval("self.menu.items[0].text = 'Updated'")
+    manager.c.eval("self.menu.scroll(-1)")
+    info = menu_info()
+    assert info["first"] == 0
+    assert info["controls"][0]["text"] == "Updated"
+    assert manager.c.eval("self.menu.items[0].layout.text") == "Updated"
+
+    # Scrolling stops at the end of the menu
+    manager.c.eval("self.menu.scroll(1000)")
+    assert menu_info()["first"] == 95
+
+    manager.c.eval("self.menu.process_button_click(10, 10, 4)")
+    assert menu_info()["first"] == 94
+
+    # Moving down from the last visible item scrolls the next item into view
+    manager.c.eval("self.menu.scroll(-1000)")
+    for _ in range(5):
+        manager.c.eval("self.menu.fake_key_press('Down')")
+    info = menu_info()
+    assert info["first"] == 1
+    assert manager.c.eval("self.menu._focused.text") == "Item 5"
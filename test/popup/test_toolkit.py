@@ -26,7 +26,7 @@ import libqtile.layout
 import pytest
 from libqtile.lazy import lazy
 
-from qtile_extras.popup.toolkit import PopupGridLayout, PopupText
+from qtile_extras.popup.toolkit import PopupGridLayout, PopupText, _ControlIndex, _merge_rects
 
 
 class ToolkitConfig(libqtile.confreader.Config):
@@ -238,6 +238,44 @@ def test_initial_focus_index_error():
     assert layout.keyboard_navigation
 
 
+def test_control_index():
+    """The spatial index finds the same controls as checking every control."""
+    callbacks = {"Button1": lambda: None}
+    controls = [
+        PopupText(text=f"{row}{col}", row=row, col=col, mouse_callbacks=callbacks)
+        for row in range(10)
+        for col in range(10)
+    ]
+    # A control covering the whole grid, drawn first
+    controls.insert(0, PopupText(text="Background", row=0, col=0, row_span=10, col_span=10))
+
+    layout = PopupGridLayout(
+        None, width=500, height=500, rows=10, cols=10, margin=0, controls=controls
+    )
+    for control in controls:
+        layout._place_control(control)
+
+    index = _ControlIndex(controls)
+
+    # Topmost control first
+    assert index.at(125, 375) == [controls[1 + 7 * 10 + 2], controls[0]]
+    assert index.at(600, 600) == []
+
+    assert index.overlapping(90, 0, 20, 10) == [controls[0], controls[2], controls[3]]
+
+    def focusable(check):
+        return lambda control: control.can_focus and check(control)
+
+    # The background control's midpoint is near the centre but it cannot be focused
+    centre = controls[1 + 5 * 10 + 5]
+    assert index.nearest(centre, focusable(centre.is_left)) is controls[1 + 5 * 10 + 4]
+    assert index.nearest(centre, focusable(centre.is_above)) is controls[1 + 4 * 10 + 5]
+
+    corner = controls[1]
+    assert index.nearest(corner, focusable(corner.is_below)) is controls[1 + 10]
+    assert index.nearest(corner, focusable(corner.is_left)) is None
+
+
 class TwoScreensConfig(libqtile.confreader.Config):
     fake_screens = [
         libqtile.config.Screen(x=0, y=0, width=400, height=600),
@@ -593,6 +631,63 @@ def test_popup_update_controls(manager):
     assert info["controls"][2]["value"] == 1.0
 
 
+def test_popup_update_controls_damage(manager):
+    layout = textwrap.dedent(
+        """
+        from qtile_extras.popup.toolkit import PopupAbsoluteLayout, PopupSlider, PopupText
+        self.popup = PopupAbsoluteLayout(
+            self,
+            width=200,
+            height=100,
+            controls=[
+                PopupText(text="Text", pos_x=0, pos_y=0, width=200, height=50, name="text"),
+                PopupSlider(pos_x=10, pos_y=60, width=100, height=20, name="slider"),
+                PopupSlider(pos_x=150, pos_y=60, width=40, height=20, name="other"),
+            ],
+            margin=0
+        )
+
+        self.popup.show()
+
+        drawer = self.popup.popup.drawer
+        self.presented = []
+
+        def draw(*args, _draw=drawer.draw, _presented=self.presented, **kwargs):
+            _presented.append(kwargs)
+            _draw(*args, **kwargs)
+
+        drawer.draw = draw
+        """
+    )
+
+    manager.c.eval(layout)
+
+    def presented():
+        areas = eval(manager.c.eval("self.presented"))
+        manager.c.eval("self.presented.clear()")
+        keys = ("offsetx", "offsety", "width", "height")
+        return [tuple(area.get(key) for key in keys) for area in areas]
+
+    # Only the area covered by the slider is presented to the window
+    manager.c.eval("self.popup.update_controls(slider=0.5)")
+    assert presented() == [(10, 60, 100, 20)]
+
+    # Separate controls are presented in the same update
+    manager.c.eval("self.popup.update_controls(slider=0.8, text='New text')")
+    assert sorted(presented()) == [(0, 0, 200, 50), (10, 60, 100, 20)]
+
+    # Redrawing the whole popup presents the full surface
+    manager.c.eval("self.popup.draw()")
+    assert presented() == [(None, None, None, None)]
+
+
+def test_merge_rects():
+    assert _merge_rects([(0, 0, 10, 10), (5, 5, 10, 10)]) == [(0, 0, 15, 15)]
+    assert _merge_rects([(0, 0, 10, 10), (20, 0, 10, 10), (8, 0, 14, 2)]) == [(0, 0, 30, 10)]
+    assert _merge_rects([(0, 0, 10, 10), (10, 0, 10, 10)]) == [(0, 0, 10, 10), (10, 0, 10, 10)]
+    assert _merge_rects([(0.5, 0.5, 2.2, 2.2), (5, 5, 0, 3)]) == [(0, 0, 3, 3)]
+
+
 def test_bind_callbacks_and_overlap(manager):
     """
     Check ability to add callbacks after controls created and
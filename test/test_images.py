@@ -17,15 +17,17 @@
 # LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 # SOFTWARE.
+import os
 from pathlib import Path
 
 import libqtile.config
+import libqtile.images
 import pytest
 from libqtile import bar
 from libqtile.images import Img
 from libqtile.widget.base import _Widget
 
-from qtile_extras.images import ImgMask, Loader
+from qtile_extras.images import ImageCache, ImgMask, Loader
 
 ICON_PATH = Path(__file__).parent / ".." / "qtile_extras" / "resources" / "tvheadend-icons"
 
@@ -67,3 +69,83 @@ def test_draw(minimal_conf_noscreen, manager_nospawn):
 
     assert manager_nospawn.c.widget["maskwidget"]
     assert manager_nospawn.c.widget["maskwidget"].info()["width"] > 0
+
+
+def test_image_cache():
+    cache = ImageCache()
+    path = f"{ICON_PATH}/icon.svg"
+
+    img1 = cache.load(path, height=20)
+    img2 = cache.load(path, height=20)
+
+    # File is only decoded once and the scaled surface is shared
+    assert cache.decodes == 1
+    assert img1 is not img2
+    assert img1.surface is img2.surface
+    assert img1.height == 20
+
+    # Different sizes have their own surfaces
+    img3 = cache.load(path, height=30)
+    assert cache.decodes == 1
+    assert img3.surface is not img1.surface
+
+    # Masked images
+    mask = cache.load(path, height=20, mask=True)
+    assert isinstance(mask, ImgMask)
+
+    # Changing an image doesn't affect the shared surface
+    surface = img1.surface
+    img1.theta = 90
+    assert img2.surface is surface
+    assert surface.get_width() == img2.width
+
+
+def test_image_cache_renders_once(monkeypatch):
+    renders = []
+
+    def get_cairo_surface(*args, _get_cairo_surface=libqtile.images.get_cairo_surface):
+        renders.append(args[1:])
+        return _get_cairo_surface(*args)
+
+    monkeypatch.setattr(libqtile.images, "get_cairo_surface", get_cairo_surface)
+
+    cache = ImageCache()
+    path = f"{ICON_PATH}/icon.svg"
+
+    # The file is decoded and then rendered once at the requested size
+    img = cache.load(path, height=20)
+    assert img.height == 20
+    assert len(renders) == 2
+
+    # Sized images are not rendered again when loaded from the cache
+    img = cache.load(path, height=20)
+    assert img.surface.get_height() == 20
+    assert len(renders) == 2
+
+
+def test_image_cache_missing_file():
+    cache = ImageCache()
+    assert cache.load("/does/not/exist.svg") is None
+
+
+def test_image_cache_modified_file(tmp_path):
+    cache = ImageCache()
+    path = tmp_path / "icon.svg"
+    path.write_bytes(Path(f"{ICON_PATH}/icon.svg").read_bytes())
+
+    cache.load(path.as_posix())
+    os.utime(path, (0, 0))
+    cache.load(path.as_posix())
+
+    assert cache.decodes == 2
+
+
+def test_image_cache_budget():
+    cache = ImageCache(budget=1)
+    path = f"{ICON_PATH}/icon.svg"
+
+    cache.load(path, height=20)
+    cache.load(path, height=30)
+
+    # Only the most recently used entry is kept
+    assert len(cache._entries) == 1
@@ -164,7 +164,8 @@ def camera(manager_nospawn, request, temp_images):
             return
 
         # Build filepath to reference image
-        reference = RESOURCES / f"{name}.png"
+        # Configs can share a reference image if they should render identically
+        reference = RESOURCES / f"{config.get('reference', name)}.png"
 
         # Command line
         cmd = ["compare", "-metric", "MSE", output_file, reference.resolve().as_posix(), "null:"]
@@ -374,6 +374,63 @@ params.append(
     }
 )
 
+# CACHED DECORATIONS
+# These should be identical to the uncached versions
+params.append(
+    {
+        "name": "rect-default-group-filled-cached",
+        "reference": "rect-default-group-filled",
+        "widgets": widgets(
+            [
+                RectDecoration(
+                    colour="770077", filled=True, padding=8, group=True, radius=10, cache=True
+                )
+            ]
+        ),
+    }
+)
+params.append(
+    {
+        "name": "powerline-arrow_left-padding-cached",
+        "reference": "powerline-arrow_left-padding",
+        "widgets": widgets([PowerLineDecoration(path="arrow_left", padding_y=8, cache=True)]),
+    }
+)
+params.append(
+    {
+        "name": "border-default-grouped-cached",
+        "reference": "border-default-grouped",
+        "widgets": widgets([BorderDecoration(group=True, cache=True)]),
+    }
+)
+params.append(
+    {
+        "name": "gradient-decoration-whole-bar-cached",
+        "reference": "gradient-decoration-whole-bar",
+        "widgets": widgets([GradientDecoration(whole_bar=True, cache=True)]),
+    }
+)
+params.append(
+    {
+        "name": "combo-rect-plus-powerline-cached",
+        "reference": "combo-rect-plus-powerline",
+        "widgets": widgets(
+            [
+                RectDecoration(
+                    use_widget_background=True,
+                    padding=5,
+                    filled=True,
+                    radius=10,
+                    clip=True,
+                    group=True,
+                    cache=True,
+                ),
+                PowerLineDecoration(path="arrow_right", padding_y=5, cache=True),
+            ]
+        ),
+    }
+)
+
 
 @pytest.mark.parametrize("camera", params, indirect=True, ids=[x["name"] for x in params])
 def test_decoration_output(camera):
@@ -31,6 +31,7 @@ from libqtile.utils import rgb
 from qtile_extras import widget
 from qtile_extras.widget.decorations import (
     BorderDecoration,
+    GradientDecoration,
     ImageDecoration,
     PowerLineDecoration,
     RectDecoration,
@@ -332,3 +333,203 @@ def test_image_decoration(
     oy = tb.eval("self.decorations[0]._yoffset")
     assert int(ox) == xoffset
     assert int(oy) == yoffset
+
+
+def test_decoration_grouping_index(manager_nospawn, minimal_conf_noscreen):
+    def assert_first_last(widget, first, last):
+        assert widget.eval("self.decorations[0].is_first") == str(first)
+        assert widget.eval("self.decorations[0].is_last") == str(last)
+
+    config = minimal_conf_noscreen
+
+    group_decoration = {"decorations": [RectDecoration(radius=5, group=True)]}
+
+    config.screens = [
+        libqtile.config.Screen(
+            top=libqtile.bar.Bar(
+                [
+                    widget.TextBox("Text 1", name="tb1", **group_decoration),
+                    widget.TextBox("Text 2", name="tb2", **group_decoration),
+                    widget.TextBox("Text 3", name="tb3", **group_decoration),
+                ],
+                10,
+            )
+        )
+    ]
+
+    manager_nospawn.start(config)
+    manager_nospawn.c.bar["top"].eval("self.draw()")
+
+    widget1 = manager_nospawn.c.widget["tb1"]
+    widget3 = manager_nospawn.c.widget["tb3"]
+
+    builds = manager_nospawn.c.bar["top"].eval("self._decoration_groups.builds")
+
+    # Redrawing the bar should not rebuild the group index
+    for _ in range(5):
+        manager_nospawn.c.bar["top"].eval("self.draw()")
+
+    assert manager_nospawn.c.bar["top"].eval("self._decoration_groups.builds") == builds
+
+    # Hiding the first widget makes the second widget the start of the group
+    widget1.update("")
+    manager_nospawn.c.bar["top"].eval("self.draw()")
+    assert_first_last(manager_nospawn.c.widget["tb2"], True, False)
+    assert_first_last(widget3, False, True)
+
+    # Showing it again restores the original grouping
+    widget1.update("Text 1")
+    manager_nospawn.c.bar["top"].eval("self.draw()")
+    assert_first_last(widget1, True, False)
+    assert_first_last(manager_nospawn.c.widget["tb2"], False, False)
+
+    # Visibility changes don't require the index to be rebuilt
+    assert manager_nospawn.c.bar["top"].eval("self._decoration_groups.builds") == builds
+
+
+def test_decoration_cache(manager_nospawn, minimal_conf_noscreen):
+    config = minimal_conf_noscreen
+
+    config.screens = [
+        libqtile.config.Screen(
+            top=libqtile.bar.Bar(
+                [
+                    widget.TextBox(
+                        "Text 1",
+                        name="tb1",
+                        decorations=[RectDecoration(radius=5, filled=True, cache=True)],
+                    ),
+                    widget.TextBox(
+                        "Text 2",
+                        name="tb2",
+                        decorations=[RectDecoration(radius=5, filled=True)],
+                    ),
+                ],
+                10,
+            )
+        )
+    ]
+
+    manager_nospawn.start(config)
+
+    tb1 = manager_nospawn.c.widget["tb1"]
+    tb2 = manager_nospawn.c.widget["tb2"]
+
+    def misses(widget):
+        return int(widget.eval("self.decorations[0]._cache_misses"))
+
+    tb1.eval("self.draw()")
+    rendered = misses(tb1)
+    assert rendered > 0
+
+    # Decoration is not re-rendered while nothing changes
+    for _ in range(3):
+        tb1.eval("self.draw()")
+
+    assert misses(tb1) == rendered
+
+    # Uncached decorations don't use the cache
+    assert misses(tb2) == 0
+
+    # Changing the colour invalidates the cache
+    tb1.eval("self.decorations[0].colour = '00ff00'")
+    tb1.eval("self.draw()")
+    assert misses(tb1) == rendered + 1
+
+    # As does resizing the widget
+    tb1.update("Some longer text")
+    tb1.eval("self.draw()")
+    assert misses(tb1) > rendered + 1
+
+
+@pytest.mark.parametrize("dec_class", [GradientDecoration, ImageDecoration])
+def test_whole_bar_shared_surface(
+    manager_nospawn, minimal_conf_noscreen, image_background, dec_class
+):
+    config = minimal_conf_noscreen
+
+    if dec_class is ImageDecoration:
+        dec_config = {"image": image_background}
+    else:
+        dec_config = {"colours": ["f00", "0f0", "00f"]}
+
+    config.screens = [
+        libqtile.config.Screen(
+            top=libqtile.bar.Bar(
+                [
+                    widget.TextBox(
+                        f"Text {i}",
+                        name=f"tb{i}",
+                        decorations=[dec_class(whole_bar=True, **dec_config)],
+                    )
+                    for i in range(5)
+                ],
+                10,
+            )
+        )
+    ]
+
+    manager_nospawn.start(config)
+
+    bar = manager_nospawn.c.bar["top"]
+    for _ in range(3):
+        bar.eval("self.draw()")
+
+    # The whole bar surface is only rendered once and shared by all widgets
+    assert bar.eval("self._decoration_surfaces.renders") == "1"
+
+
+def test_powerline_next_colour_updates(manager_nospawn, minimal_conf_noscreen):
+    config = minimal_conf_noscreen
+    config.screens = [
+        libqtile.config.Screen(
+            top=libqtile.bar.Bar(
+                [
+                    widget.TextBox(
+                        "One",
+                        name="one",
+                        background="ff0000",
+                        decorations=[PowerLineDecoration(size=10)],
+                    ),
+                    widget.TextBox(
+                        "Two",
+                        name="two",
+                        background="00ff00",
+                        decorations=[PowerLineDecoration(size=10)],
+                    ),
+                    widget.TextBox(
+                        "Three",
+                        name="three",
+                        background="0000ff",
+                        decorations=[PowerLineDecoration(size=10)],
+                    ),
+                ],
+                10,
+                background="000000",
+            )
+        )
+    ]
+
+    manager_nospawn.start(config)
+
+    bar = manager_nospawn.c.bar["top"]
+    one = manager_nospawn.c.widget["one"]
+    two = manager_nospawn.c.widget["two"]
+
+    def next_colour():
+        bar.eval("self.draw()")
+        return one.eval("self.decorations[0].bg")
+
+    assert next_colour() == "00ff00"
+
+    # Hiding the next widget means the decoration uses the following visible widget
+    two.update("")
+    assert next_colour() == "0000ff"
+
+    # Showing the widget restores the colour
+    two.update("Two")
+    assert next_colour() == "00ff00"
+
+    # Changing the next widget's background is also picked up
+    two.eval("self.background = 'ffff00'")
+    assert next_colour() == "ffff00"
@@ -0,0 +1,107 @@
+# Copyright (c) 2026 elParaguayo
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+import libqtile.bar
+import libqtile.config
+import pytest
+from libqtile.widget import base
+
+from qtile_extras import widget
+from qtile_extras.widget import add_decoration_support
+from qtile_extras.widget.mixins import DirtyTrackingMixin
+
+
+@add_decoration_support
+class TrackedWidget(base._Widget, DirtyTrackingMixin):
+    def __init__(self, **config):
+        base._Widget.__init__(self, 50, **config)
+        self.draws = 0
+
+    def draw(self):
+        self.draws += 1
+        self.drawer.clear(self.background or self.bar.background)
+        self.draw_at_default_position()
+
+
+@pytest.fixture
+def compositor_manager(manager_nospawn, minimal_conf_noscreen):
+    config = minimal_conf_noscreen
+    config.screens = [
+        libqtile.config.Screen(
+            top=libqtile.bar.Bar(
+                [
+                    TrackedWidget(name="tracked"),
+                    widget.TextBox("Untracked", name="untracked"),
+                ],
+                10,
+            )
+        )
+    ]
+
+    manager_nospawn.start(config)
+    yield manager_nospawn
+
+
+def test_compositor_skips_unchanged_widgets(compositor_manager):
+    bar = compositor_manager.c.bar["top"]
+    tracked = compositor_manager.c.widget["tracked"]
+
+    def draws():
+        return int(tracked.eval("self.draws"))
+
+    def skipped():
+        return int(bar.eval("self._compositor.skipped"))
+
+    bar.eval("self.draw()")
+    start_draws = draws()
+    start_skipped = skipped()
+
+    # Nothing has changed so the tracked widget is not repainted
+    bar.eval("self.draw()")
+    assert draws() == start_draws
+    assert skipped() == start_skipped + 1
+
+    # Marking the widget as dirty means it gets repainted
+    tracked.eval("self.redraw_bar()")
+    assert draws() == start_draws + 1
+    assert skipped() == start_skipped + 1
+
+    # Changing the size of the widget means it's repainted
+    tracked.eval("self.length = 60")
+    bar.eval("self.draw()")
+    assert draws() == start_draws + 2
+
+    # Invalidating the compositor (e.g. when bar is exposed) forces a repaint
+    bar.eval("self._compositor.invalidate()")
+    bar.eval("self.draw()")
+    assert draws() == start_draws + 3
+
+    # Widgets can still redraw themselves
+    tracked.eval("self.draw()")
+    assert draws() == start_draws + 4
+
+
+def test_compositor_repaints_untracked_widgets(compositor_manager):
+    bar = compositor_manager.c.bar["top"]
+
+    painted = int(bar.eval("self._compositor.painted"))
+    bar.eval("self.draw()")
+
+    # Untracked widget is always painted
+    assert int(bar.eval("self._compositor.painted")) == painted + 1
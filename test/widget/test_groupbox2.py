@@ -448,3 +448,100 @@ def test_box_visibility(gbmanager):
     gbmanager.c.window.kill()
     gbmanager.c.group["d"].toscreen()
     assert text() == "d"
+
+
+@pytest.mark.parametrize(
+    "gbmanager",
+    [
+        {
+            "rules": [
+                GroupBoxRule(text_colour="ff0000").when(focused=True),
+                GroupBoxRule().when(func=set_text),
+                GroupBoxRule(text_colour="00ff00", text="ignored"),
+            ]
+        }
+    ],
+    indirect=True,
+)
+def test_rule_table(gbmanager):
+    widget = gbmanager.c.widget["groupbox2"]
+
+    def compiles():
+        return int(widget.eval("self.boxes[0].rule_table.compiles"))
+
+    info = widget.info()
+
+    # Dynamic rule has precedence over the later static rule
+    assert info["text"] == "0|1|2|3"
+    assert info["boxes"][0]["text_colour"] == "ff0000"
+    assert info["boxes"][1]["text_colour"] == "00ff00"
+
+    # Redrawing the bar doesn't recompile the table
+    count = compiles()
+    gbmanager.c.bar["top"].eval("self.draw()")
+    assert compiles() == count
+
+    # New states are compiled once
+    gbmanager.c.group["b"].toscreen()
+    gbmanager.c.group["a"].toscreen()
+    count = compiles()
+    gbmanager.c.group["b"].toscreen()
+    gbmanager.c.group["a"].toscreen()
+    assert compiles() == count
+
+    info = widget.info()
+    assert info["boxes"][0]["text_colour"] == "ff0000"
+    assert info["boxes"][1]["text_colour"] == "00ff00"
+
+
+@pytest.mark.parametrize(
+    "gbmanager",
+    [
+        {
+            "rules": [
+                GroupBoxRule(text="focused").when(focused=True),
+                GroupBoxRule(text_colour="ff0000").when(occupied=True),
+            ]
+        }
+    ],
+    indirect=True,
+)
+def test_box_layout_cache(gbmanager):
+    widget = gbmanager.c.widget["groupbox2"]
+
+    def layout_updates():
+        updates = widget.eval("','.join(str(b.layout_updates) for b in self.boxes)")
+        return [int(x) for x in updates.split(",")]
+
+    start = layout_updates()
+
+    # Redrawing doesn't update text layouts
+    widget.eval("self.bar.draw()")
+    assert layout_updates() == start
+
+    # Only boxes whose text changes update their layout
+    gbmanager.c.group["b"].toscreen()
+    updates = layout_updates()
+    assert updates[0] == start[0] + 1
+    assert updates[1] == start[1] + 1
+    assert updates[2:] == start[2:]
+    assert widget.info()["text"] == "a|focused|c|d"
+
+
+def test_hook_coalescing(gbmanager):
+    widget = gbmanager.c.widget["groupbox2"]
+    widget.eval("self.redraws = []; self.redraw_bar = lambda r=self.redraws: r.append(1)")
+
+    def redraws():
+        return int(widget.eval("len(self.redraws)"))
+
+    # Hooks fired without any change to the groups don't redraw the bar
+    widget.eval("from libqtile import hook; [hook.fire('changegroup') for _ in range(3)]")
+    assert redraws() == 0
+
+    # Multiple hooks fired by a single change result in one redraw
+    widget.eval(
+        "from libqtile import hook; self.qtile.groups[1].toscreen(); "
+        "[hook.fire('changegroup') for _ in range(3)]"
+    )
+    assert redraws() == 1
@@ -31,6 +31,11 @@ def assert_window_count(manager, number):
     assert len(manager.c.internal_windows()) == number
 
 
+@Retry(ignore_exceptions=(AssertionError,))
+def assert_popup_closed(widget):
+    assert widget.eval("self.has_popup") == "False"
+
+
 class ModdedWidget(widget.TextBox, ExtendedPopupMixin):
     def __init__(self, text, **config):
         widget.TextBox.__init__(self, text, **config)
@@ -69,7 +74,7 @@ class PopupConfig(libqtile.confreader.Config):
 
 
 @pytest.mark.parametrize("manager", [PopupConfig], indirect=True)
-def test_popup_mixin(manager, backend_name):
+def test_popup_mixin(manager):
     number = len(manager.c.internal_windows())
     widget = manager.c.widget["moddedwidget"]
     assert not widget.info()["text"]
@@ -80,11 +85,24 @@ def test_popup_mixin(manager, backend_name):
     assert_window_count(manager, number + 1)
     assert widget.info()["text"] == "Text set ok"
 
-    if backend_name == "x11":
-        pytest.xfail("X11 fails last check.")
+    popup = widget.eval("id(self.extended_popup)")
+    layout = widget.eval("id(self.extended_popup.controls[0].layout)")
+
+    # Popup should close automatically. Its window is hidden and kept in the popup pool.
+    assert_popup_closed(widget)
+    assert_window_count(manager, number + 1)
+
+    # Showing the popup again reuses the pooled window
+    widget.eval("self.show_popup()")
+    assert widget.eval("self.has_popup") == "True"
+    assert_window_count(manager, number + 1)
 
-    # Popup should close automatically
-    assert_window_count(manager, number)
+    # The widget's copy of the template is reopened and its controls are not rebuilt
+    assert widget.eval("id(self.extended_popup)") == popup
+    assert widget.eval("id(self.extended_popup.controls[0].layout)") == layout
+    drawer = "self.extended_popup.controls[0].drawer is self.extended_popup.popup.drawer"
+    assert widget.eval(drawer) == "True"
+    assert widget.info()["text"] == "Text set ok"
 
 
 def test_popup_missing_method():
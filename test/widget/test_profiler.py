@@ -0,0 +1,70 @@
+# Copyright (c) 2026 elParaguayo
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+import libqtile.bar
+import libqtile.config
+import pytest
+
+from qtile_extras import widget
+from qtile_extras.widget.decorations import RectDecoration
+
+
+@pytest.fixture
+def profiler_manager(manager_nospawn, minimal_conf_noscreen):
+    config = minimal_conf_noscreen
+    config.screens = [
+        libqtile.config.Screen(
+            top=libqtile.bar.Bar(
+                [
+                    widget.TextBox(
+                        "Profiled",
+                        name="profiled",
+                        decorations=[RectDecoration(colour="ff0000")],
+                    ),
+                ],
+                10,
+            )
+        )
+    ]
+
+    manager_nospawn.start(config)
+    yield manager_nospawn
+
+
+def test_widget_stats(profiler_manager):
+    widget = profiler_manager.c.widget["profiled"]
+
+    # No stats are collected by default
+    widget.eval("self.draw()")
+    assert widget.widget_stats() == {}
+
+    widget.eval("from qtile_extras.widget.profiler import profiler;profiler.enable()")
+    widget.eval("self.draw()")
+    widget.eval("self.length")
+
+    stats = widget.widget_stats()
+    assert stats["draw"]["count"] == 1
+    assert stats["decoration.RectDecoration"]["count"] == 1
+    assert stats["calculate_length"]["count"] >= 1
+    assert set(stats["draw"]) == {"count", "total", "p50", "p95", "max", "allocations"}
+    assert stats["draw"]["max"] >= stats["draw"]["p50"]
+
+    assert widget.widget_stats(all_widgets=True)["profiled"] == stats
+
+    widget.eval("from qtile_extras.widget.profiler import profiler;profiler.disable()")
@@ -24,6 +24,7 @@ import libqtile.layout
 import pytest
 from libqtile import widget
 
+from qtile_extras.popup.pool import popup_pool  # noqa: F401
 from qtile_extras.widget.mixins import TooltipMixin
 from test.helpers import Retry
 
@@ -58,6 +59,11 @@ def assert_window_count(manager, number):
     assert len(manager.c.internal_windows()) == number
 
 
+@Retry(ignore_exceptions=(AssertionError,))
+def assert_pool_hits(widget, number):
+    assert widget.eval("popup_pool.hits") == str(number)
+
+
 @pytest.fixture
 def bar_position(request):
     yield getattr(request, "param", "top")
@@ -93,7 +99,7 @@ def tooltip_manager(request, bar_position, manager_nospawn):
     yield manager_nospawn
 
 
-def test_tooltip_display(tooltip_manager, backend_name):
+def test_tooltip_display(tooltip_manager):
     widget = tooltip_manager.c.widget["tooltipwidget"]
 
     number = len(tooltip_manager.c.internal_windows())
@@ -107,11 +113,18 @@ def test_tooltip_display(tooltip_manager, backend_name):
     widget.eval("self.mouse_enter(0, 0)")
     assert_window_count(tooltip_manager, number + 1)
 
-    if backend_name == "x11":
-        pytest.xfail("Last test fails on X11.")
-
+    # The window is hidden and returned to the popup pool rather than killed
     widget.eval("self.mouse_leave(100, 100)")
-    assert_window_count(tooltip_manager, number)
+    assert widget.eval("self._tooltip") == "None"
+    assert widget.eval("len(popup_pool)") == "1"
+    assert_window_count(tooltip_manager, number + 1)
+
+    # Showing the tooltip again reuses the pooled window
+    hits = int(widget.eval("popup_pool.hits"))
+    widget.eval("self.mouse_enter(0, 0)")
+    assert_pool_hits(widget, hits + 1)
+    assert widget.eval("len(popup_pool)") == "0"
+    assert_window_count(tooltip_manager, number + 1)
 
 
 @pytest.mark.parametrize(
@@ -17,14 +17,37 @@
 # LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 # SOFTWARE.
+import mmap
+import os
+import subprocess
+import sys
+import textwrap
+from contextlib import ExitStack
 from importlib import reload
+from pathlib import Path
+from types import SimpleNamespace
 
+import cairocffi
 import pytest
 from libqtile.bar import Bar
 from libqtile.config import Screen
 from libqtile.confreader import Config
 
 import qtile_extras
+from qtile_extras.resources.visualiser.cava_draw import (
+    BUFFERS,
+    HEADER,
+    HEADER_SIZE,
+    Output,
+    Smoother,
+    create_frames,
+    draw_bars,
+    frame_size,
+    read_sequence,
+    remove_stale_files,
+    shm_size,
+)
+from qtile_extras.widget.visualiser import _CavaStream
 from test.helpers import Retry
 
 
@@ -69,3 +92,305 @@ def test_visualiser(manager_nospawn, visualiser):
 
     manager_nospawn.c.widget["visualiser"].toggle()
     assert_length(manager_nospawn, 100)
+
+
+def test_visualiser_frame_ring():
+    width, height = 10, 4
+    shm = mmap.mmap(-1, shm_size(width, height))
+    frames = create_frames(shm, width, height)
+
+    assert len(frames) == BUFFERS
+    assert read_sequence(shm) == 0
+
+    # Drawing to a frame writes directly to the shared memory
+    ctx = cairocffi.Context(frames[1])
+    ctx.set_source_rgba(1, 1, 1, 1)
+    ctx.paint()
+    frames[1].flush()
+    HEADER.pack_into(shm, 0, 1)
+
+    assert read_sequence(shm) % BUFFERS == 1
+    offset = HEADER_SIZE + frame_size(width, height)
+    assert shm[offset : offset + 4] == b"\xff" * 4
+    assert shm[HEADER_SIZE : HEADER_SIZE + 4] == b"\x00" * 4
+
+    for frame in frames:
+        frame.finish()
+
+
+def test_visualiser_shared_stream(manager_nospawn, monkeypatch):
+    monkeypatch.setattr("qtile_extras.widget.visualiser.os.kill", lambda *args: True)
+    reload(qtile_extras)
+
+    class SharedConfig(Config):
+        screens = [
+            Screen(
+                top=Bar(
+                    [
+                        qtile_extras.widget.Visualiser(
+                            name="vis1", cava_path="/not/installed", stream="main"
+                        ),
+                        qtile_extras.widget.Visualiser(
+                            name="vis2",
+                            cava_path="/not/installed",
+                            stream="main",
+                            framerate=60,
+                        ),
+                    ],
+                    50,
+                ),
+            )
+        ]
+
+    manager_nospawn.start(SharedConfig)
+
+    vis1 = manager_nospawn.c.widget["vis1"]
+    vis2 = manager_nospawn.c.widget["vis2"]
+
+    # Each visualiser has its own shared memory but they share a stream
+    assert vis1.eval("self.shm_path") != vis2.eval("self.shm_path")
+    assert vis1.eval("id(self._stream)") == vis2.eval("id(self._stream)")
+    assert vis2.eval("len(self._stream.widgets)") == "2"
+
+    # Frames are smoothed by the drawing process rather than in qtile
+    assert vis1.eval("self._stream.smoother") == "None"
+    assert vis1.eval("self._fps_lock is not self._stream.widgets[1]._fps_lock") == "True"
+
+
+@Retry(ignore_exceptions=(AssertionError,))
+def assert_started(widget, target="self"):
+    assert widget.eval(f"{target}._procs_started") == "True"
+
+
+def test_visualiser_join_running_stream(manager_nospawn, monkeypatch):
+    monkeypatch.setattr("qtile_extras.widget.visualiser.os.kill", lambda *args: True)
+    reload(qtile_extras)
+
+    class StreamConfig(Config):
+        screens = [
+            Screen(
+                top=Bar(
+                    [
+                        qtile_extras.widget.Visualiser(
+                            name="vis1", cava_path="/not/installed", stream="main"
+                        )
+                    ],
+                    50,
+                ),
+            )
+        ]
+
+    manager_nospawn.start(StreamConfig)
+
+    vis1 = manager_nospawn.c.widget["vis1"]
+    assert_started(vis1)
+    draw_proc = vis1.eval("self._stream.draw_proc")
+
+    # A visualiser configured once the stream is running (e.g. on a new screen) restarts
+    # the drawing process so it draws for both visualisers
+    vis1.eval(
+        "self.vis2 = Visualiser(cava_path='/not/installed', stream='main'); "
+        "self.vis2._configure(self.qtile, self.bar)"
+    )
+    assert_started(vis1, "self.vis2")
+    assert vis1.eval("len(self._stream.widgets)") == "2"
+    assert vis1.eval("self._stream.draw_proc") != draw_proc
+
+
+@pytest.mark.parametrize("invert", [False, True])
+def test_visualiser_vectorised_output(tmp_path, invert):
+    pytest.importorskip("numpy")
+
+    frames = {}
+    for vectorised in (True, False):
+        output = Output(
+            shm=tmp_path / f"shm_{vectorised}",
+            width=53,
+            height=20,
+            num_bars=8,
+            spacing=2,
+            background="ff0000",
+            invert=invert,
+            vectorised=vectorised,
+        )
+        with ExitStack() as stack:
+            output.open(stack)
+            output.draw(bytes([0, 255, 128, 64, 1, 200, 17]))
+            frames[vectorised] = output.shm[HEADER_SIZE:]
+
+    # Writing pixels directly gives the same frame as drawing with cairo
+    assert frames[True] == frames[False]
+
+
+@Retry(ignore_exceptions=(AssertionError,))
+def assert_frame(widget, frame):
+    assert widget.eval("self.frame") == repr(frame)
+
+
+def test_visualiser_in_process(manager_nospawn, monkeypatch, tmp_path):
+    monkeypatch.setattr("qtile_extras.widget.visualiser.os.kill", lambda *args: True)
+    reload(qtile_extras)
+
+    pipe = tmp_path / "cava.pipe"
+
+    class InProcessConfig(Config):
+        screens = [
+            Screen(
+                top=Bar(
+                    [
+                        qtile_extras.widget.Visualiser(
+                            cava_path="/not/installed", cava_pipe=pipe.as_posix(), in_process=True
+                        )
+                    ],
+                    50,
+                ),
+            )
+        ]
+
+    manager_nospawn.start(InProcessConfig)
+    assert_length(manager_nospawn, 100)
+
+    widget = manager_nospawn.c.widget["visualiser"]
+
+    # No drawing process or shared memory is used
+    assert widget.eval("self._stream.draw_proc") == "None"
+    assert widget.eval("self._shm") == "None"
+
+    # Stale frames are dropped and incomplete frames are kept until the rest arrives
+    fd = os.open(pipe, os.O_WRONLY | os.O_NONBLOCK)
+    os.write(fd, bytes(range(8)) + bytes(range(8, 16)) + bytes(range(16, 20)))
+    assert_frame(widget, bytes(range(8, 16)))
+
+    os.write(fd, bytes(range(20, 24)))
+    assert_frame(widget, bytes(range(16, 24)))
+    os.close(fd)
+
+    # The last frame is shown again when the bar is redrawn between frames
+    widget.eval(
+        "self.presented = []; "
+        "self.draw_at_default_position = "
+        "lambda p=self.presented, d=self.draw_at_default_position: (p.append(1), d())"
+    )
+    manager_nospawn.c.bar["top"].eval("self._actual_draw()")
+    assert widget.eval("len(self.presented)") == "1"
+
+    widget.stop()
+    assert_length(manager_nospawn, 0)
+    assert widget.eval("self._stream.fd") == "None"
+
+
+@pytest.mark.parametrize("user_pipe", [False, True])
+def test_visualiser_stream_removes_pipe(tmp_path, monkeypatch, user_pipe):
+    monkeypatch.setattr(
+        "qtile_extras.widget.visualiser.tempfile.gettempdir", lambda: tmp_path.as_posix()
+    )
+    widget = SimpleNamespace(
+        qtile=None,
+        cava_path="/not/installed",
+        cava_pipe=(tmp_path / "user.pipe").as_posix() if user_pipe else None,
+        bars=8,
+        in_process=False,
+        interpolate=0,
+        decay=0,
+        framerate=25,
+        channels="mono",
+    )
+
+    stream = _CavaStream.get("pipe_test", widget)
+    pipe = Path(stream.pipe)
+    pipe.touch()
+
+    # The default pipe is removed with the stream but the user's pipe is left alone
+    stream.remove(widget)
+    assert pipe.exists() is user_pipe
+
+
+def test_visualiser_remove_stale_files(tmp_path):
+    # A pid that is no longer running
+    proc = subprocess.Popen([sys.executable, "-c", ""])
+    proc.wait()
+
+    stale = tmp_path / f"qte_visualiser_{proc.pid}_0"
+    live = tmp_path / f"qte_visualiser_{os.getpid()}_0"
+    other = tmp_path / "qte_visualiser_other"
+    for path in (stale, live, other):
+        path.touch()
+
+    remove_stale_files(tmp_path)
+    assert not stale.exists()
+    assert live.exists()
+    assert other.exists()
+
+
+def test_visualiser_numpy_not_imported():
+    # NumPy is only needed by the drawing process so the widget shouldn't load it in qtile
+    code = "import sys, qtile_extras.widget.visualiser; print('numpy' in sys.modules)"
+    assert subprocess.check_output([sys.executable, "-c", code]).strip() == b"False"
+
+    # In process streams smooth frames in qtile's process
+    code = textwrap.dedent(
+        """
+        import sys
+        from types import SimpleNamespace
+
+        from qtile_extras.widget.visualiser import _CavaStream
+
+        widget = SimpleNamespace(
+            qtile=None,
+            cava_path="/not/installed",
+            cava_pipe=None,
+            bars=8,
+            in_process=True,
+            interpolate=1,
+            decay=0,
+            framerate=25,
+            channels="mono",
+        )
+        stream = _CavaStream("numpy_test", widget)
+        assert stream.smoother.active
+        stream.smoother.frames(bytes(8))
+        stream.remove(widget)
+        print("numpy" in sys.modules)
+        """
+    )
+    assert subprocess.check_output([sys.executable, "-c", code]).strip() == b"False"
+
+
+def test_visualiser_smoother():
+    smoother = Smoother(4, interpolate=1, decay=0.5)
+
+    # Interpolated frames are added before the frame from cava
+    assert smoother.frames(bytes([200, 100, 0, 20])) == [
+        bytes([100, 50, 0, 10]),
+        bytes([200, 100, 0, 20]),
+    ]
+
+    # Falling bars decay towards the new height
+    assert smoother.frames(bytes([0, 150, 0, 20])) == [
+        bytes([150, 125, 0, 20]),
+        bytes([100, 150, 0, 20]),
+    ]
+
+    # Without interpolation or decay, frames are unchanged
+    assert Smoother(4).frames(b"abcd") == [b"abcd"]
+
+
+def test_visualiser_skips_unchanged_frames(tmp_path):
+    pipe = tmp_path / "cava.pipe"
+    pipe.write_bytes(bytes(4) * 3 + bytes([255]) * 4 + bytes([255]) * 4)
+
+    output = Output(
+        shm=tmp_path / "shm",
+        width=8,
+        height=4,
+        num_bars=4,
+        spacing=0,
+        background="ffffff",
+        invert=False,
+    )
+    with ExitStack() as stack:
+        output.open(stack)
+        draw_bars(4, pipe, [output])
+
+        # Only two frames differ from the frame before
+        assert read_sequence(output.shm) == 2